@@ -0,0 +1,86 @@
+from fastapi import APIRouter, Body, HTTPException, Query, Response
+from typing import Optional
+from time import perf_counter
+from app.schemas.flight import ConflictIn, ConflictPairOut, ConflictOut
+from app.api.predict import (
+    RAW_MEDIA_TYPE, _by_length, _cached_hybrid_predict, _deadline, _get_model, _hybrid_rollout, _json_response,
+    _points_error, _read_raw_windows, registry,
+)
+from app.core.config import settings
+from app.core.conflicts import find_conflicts
+from app.core.logs import sampled
+from app.core import metrics
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+CONFLICT_REQUESTS, CONFLICT_ERRORS = metrics.endpoint_counters("conflicts")
+CONFLICT_SECONDS = metrics.registry.histogram(
+    "predictor_conflict_search_seconds", "Время поиска конфликтов по предсказанным точкам"
+)
+
+def _conflicts(windows: list, separation: float, horizon: int, model: Optional[str], deadline) -> Response:
+    """windows - окна (seq_len, 3) или массив окон одной длины (N, seq_len, 3)"""
+    if len(windows) > settings.CONFLICT_MAX_DRONES:
+        raise HTTPException(400, f"Не больше {settings.CONFLICT_MAX_DRONES} траекторий в запросе")
+    if not all(np.isfinite(window).all() for window in windows):
+        raise HTTPException(400, "Координаты должны быть конечными числами")
+    predictor = _get_model(model)
+    if len(windows) < 2:
+        return _json_response(ConflictOut(conflicts=[]))
+
+    try:
+        if horizon == 1:
+            paths, degraded = _by_length(_cached_hybrid_predict, windows, predictor, model or registry.default, deadline)
+        else:
+            paths, degraded = _by_length(_hybrid_rollout, windows, predictor, horizon, deadline)
+
+        start = perf_counter()
+        i, j, distance, step, t = find_conflicts(paths, separation)
+        CONFLICT_SECONDS.observe(perf_counter() - start)
+    except Exception as e:
+        CONFLICT_ERRORS.inc()
+        logger.error(f"Ошибка при поиске конфликтов: {e}")
+        raise HTTPException(500, f"Ошибка при поиске конфликтов: {str(e)}")
+
+    if sampled(logger):
+        logger.info("conflicts", extra={"payload": {"drones": len(windows), "horizon": horizon, "conflicts": len(i)}})
+    conflicts = [
+        ConflictPairOut(i=a, j=b, distance=d, step=h, t=tt)
+        for a, b, d, h, tt in zip(i.tolist(), j.tolist(), distance.tolist(), step.tolist(), t.tolist())
+    ]
+    return _json_response(ConflictOut(conflicts=conflicts, degraded=degraded))
+
+@router.post("/conflicts", response_model=ConflictOut)
+def predict_conflicts(request: ConflictIn):
+    """Пары дронов, которые по предсказанию сблизятся на separation и меньше.
+
+    Для всех траекторий считается гибридное предсказание (следующая точка или horizon шагов),
+    точки каждого шага индексируются равномерной сеткой с ячейкой separation, и расстояния
+    считаются только для точек соседних ячеек.
+    """
+    CONFLICT_REQUESTS.inc()
+    deadline = _deadline(request.deadline_ms)
+    for index, seq in enumerate(request.items):
+        error = _points_error(len(seq.points))
+        if error is not None:
+            raise HTTPException(400, f"Траектория {index}: {error}")
+    windows = [np.array([[p.x, p.y, p.t] for p in seq.points], dtype=float) for seq in request.items]
+    return _conflicts(windows, request.separation, request.horizon, request.model, deadline)
+
+@router.post("/conflicts/raw", response_model=ConflictOut)
+def predict_conflicts_raw(
+    body: bytes = Body(..., media_type=RAW_MEDIA_TYPE),
+    separation: float = Query(..., gt=0),
+    horizon: int = Query(1, ge=1, le=10),
+    model: Optional[str] = None,
+    deadline_ms: Optional[float] = Query(None, gt=0),
+    points: int = 5,
+):
+    """Бинарный вариант POST /predict/conflicts: окна по points точек как float32 little-endian, ответ - JSON"""
+    CONFLICT_REQUESTS.inc()
+    deadline = _deadline(deadline_ms)
+    return _conflicts(_read_raw_windows(body, points), separation, horizon, model, deadline)
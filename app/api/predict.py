@@ -1,101 +1,512 @@
-from fastapi import APIRouter, HTTPException
-from app.schemas.flight import SequenceIn, PointOut
-from app.core.utils import normalize, denormalize
-from app.models.predictor import Predictor, load_model
+from fastapi import APIRouter, Body, HTTPException, Query, Response
+from pydantic import BaseModel
+from time import monotonic, perf_counter
+from typing import Optional
+from app.schemas.flight import (
+    SequenceIn, PointOut, BatchSequenceIn, BatchItemOut, BatchPointOut, HorizonIn, TrajectoryOut
+)
+from app.core.cache import PredictionCache
+from app.core.capture import TrafficRecorder
+from app.core.config import settings
+from app.core.kinematics import kinematic_predict, kinematic_rollout
+from app.core.logs import sampled
+from app.core import metrics
+from app.core.utils import normalize, denormalize, blend
+from app.models.registry import create_registry
+from app.models.scheduler import DeadlineExceeded, InferenceLimiter, InferenceScheduler
 import numpy as np
 import logging
+import os
+import threading
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Модели загружаются лениво; модель по умолчанию - сразу при старте
+registry = create_registry()
+
 try:
-    model = load_model()
+    model = registry.get()
     logger.info("Модель успешно загружена")
 except Exception as e:
     logger.error(f"Ошибка загрузки модели: {e}")
     model = None
 
+# Общее ограничение одновременных проходов модели для планировщика и прямых вызовов
+limiter = InferenceLimiter(settings.MAX_CONCURRENT_INFERENCES)
+
+# Одиночные запросы объединяются планировщиком в общие батчи (отдельно по моделям)
+scheduler = None
+if settings.SCHEDULER_ENABLED:
+    scheduler = InferenceScheduler(
+        model,
+        max_batch=settings.SCHEDULER_MAX_BATCH,
+        max_wait_ms=settings.SCHEDULER_MAX_WAIT_MS,
+        limiter=limiter,
+    )
+
+# Кэш предсказаний для почти одинаковых окон (висящие и равномерно летящие дроны)
+cache = None
+if settings.CACHE_ENABLED:
+    cache = PredictionCache(
+        max_size=settings.CACHE_MAX_SIZE,
+        ttl_s=settings.CACHE_TTL_S,
+        tolerance=settings.CACHE_TOLERANCE,
+    )
+
+# Запись трафика; файл открывается при первом запросе, т. е. уже в процессе воркера
+recorder = None
+_recorder_lock = threading.Lock()
+
+# Счетчики запросов и ошибок создаются один раз, без словарей меток на запрос
+PREDICT_REQUESTS, PREDICT_ERRORS = metrics.endpoint_counters("predict")
+BATCH_REQUESTS, BATCH_ERRORS = metrics.endpoint_counters("batch")
+HORIZON_REQUESTS, HORIZON_ERRORS = metrics.endpoint_counters("horizon")
+RAW_REQUESTS, RAW_ERRORS = metrics.endpoint_counters("predict_raw")
+BATCH_RAW_REQUESTS, BATCH_RAW_ERRORS = metrics.endpoint_counters("batch_raw")
+
+# Бинарный формат: окна по points точек (x, y, t) little-endian float32 подряд, без заголовков
+RAW_MEDIA_TYPE = "application/octet-stream"
+RAW_DTYPE = np.dtype("<f4")
+RAW_POINT_BYTES = 3 * RAW_DTYPE.itemsize
+
+def _json_response(body: BaseModel) -> Response:
+    """Сериализация ответа в обработчике, чтобы ее время попало в метрики"""
+    start = perf_counter()
+    response = Response(body.model_dump_json(), media_type="application/json")
+    metrics.SERIALIZE_SECONDS.observe(perf_counter() - start)
+    return response
+
+def _deadline(deadline_ms: float = None):
+    """Срок ответа по time.monotonic() из запроса или DEADLINE_MS; None - без срока"""
+    deadline_ms = deadline_ms or settings.DEADLINE_MS
+    return None if deadline_ms is None else monotonic() + deadline_ms / 1000.0
+
+def _capture(endpoint: str, windows, predictions: np.ndarray, model_name: str, degraded: bool = False):
+    """Записать окна и предсказания запроса, если включена запись трафика (CAPTURE_PATH)"""
+    global recorder
+    if not settings.CAPTURE_PATH:
+        return
+    if recorder is None:
+        with _recorder_lock:
+            if recorder is None:
+                try:
+                    recorder = TrafficRecorder(
+                        settings.CAPTURE_PATH.format(pid=os.getpid()),
+                        settings.CAPTURE_MAX_RECORDS,
+                        settings.WINDOW_MAX_POINTS,
+                        registry.names(),
+                    )
+                except (OSError, ValueError) as e:
+                    logger.error(f"Запись трафика отключена: {e}")
+                    recorder = False
+    if recorder:
+        try:
+            recorder.record(endpoint, windows, predictions, model_name, degraded)
+        except ValueError as e:
+            # Модель не влезла в заголовок файла: теряем запись, а не ответ
+            logger.error(f"Запрос не записан: {e}")
+
+def _points_error(count: int) -> Optional[str]:
+    """Причина отказа для окна из count точек или None, если длина допустима"""
+    low, high = settings.WINDOW_MIN_POINTS, settings.WINDOW_MAX_POINTS
+    if low <= count <= high:
+        return None
+    return f"Нужно ровно {low} точек" if low == high else f"Нужно от {low} до {high} точек"
+
+def _by_length(fn, windows: list, *args):
+    """fn(окна одной длины (n, seq_len, 3), *args) -> (результат (n, ...), degraded) по группам длины.
+
+    Окна разной длины не дополняются до общей: каждая длина - отдельный батч модели.
+    Возвращает результаты в исходном порядке окон и degraded, если деградировала хоть одна группа.
+    """
+    if isinstance(windows, np.ndarray):
+        return fn(windows, *args)
+    lengths = np.array([len(w) for w in windows])
+    out = None
+    degraded = False
+    for length in np.unique(lengths):
+        index = np.flatnonzero(lengths == length)
+        group = np.array([windows[i] for i in index], dtype=float)
+        part, group_degraded = fn(group, *args)
+        if out is None:
+            out = np.empty((len(windows),) + part.shape[1:])
+        out[index] = part
+        degraded = degraded or group_degraded
+    return out, degraded
+
+def _get_model(name: str = None):
+    """Модель по имени из запроса; None - модель недоступна, работаем на кинематике"""
+    if name is None:
+        return model
+    if name not in registry.paths:
+        raise HTTPException(400, f"Неизвестная модель: {name}, доступны: {registry.names()}")
+    try:
+        return registry.get(name)
+    except Exception as e:
+        logger.error(f"Ошибка загрузки модели {name}: {e}")
+        return None
+
+def _count_call():
+    metrics.NEURAL_CALLS.inc()
+    limiter.count_call()
+
+def _count_shed(e: DeadlineExceeded):
+    """Пропуск прохода по сроку: в метрики и в счетчики limiter для /predict/health"""
+    (metrics.SHED_TIMEOUT if e.waited else metrics.SHED_PREDICTED).inc()
+    limiter.count_shed(e)
+
+def _neural_predict(windows: np.ndarray, predictor, batched: bool = False, deadline: float = None):
+    """Предсказание нейросети для батча окон (batch_size, seq_len, 3).
+
+    batched=True - окна уже собраны в батч и идут в модель напрямую, минуя планировщик.
+    Возвращает (batch_size, 3) или None, если модель недоступна или упала.
+    Если проход не успевает к сроку deadline - DeadlineExceeded.
+    """
+    if predictor is None:
+        return None
+    _count_call()
+    try:
+        start = perf_counter()
+        normed = normalize(windows)
+        metrics.NORMALIZE_SECONDS.observe(perf_counter() - start)
+
+        # Через планировщик сюда входит и ожидание в очереди
+        start = perf_counter()
+        if batched or scheduler is None:
+            metrics.BATCH_SIZE.observe(len(normed))
+            pred = limiter.run(predictor.predict, normed, deadline=deadline)  # shape: (batch_size, 3)
+        else:
+            pred = scheduler.predict(normed, predictor, deadline=deadline)
+        metrics.FORWARD_SECONDS.observe(perf_counter() - start)
+
+        start = perf_counter()
+        denormed = denormalize(pred)
+        metrics.DENORMALIZE_SECONDS.observe(perf_counter() - start)
+        return denormed
+    except DeadlineExceeded as e:
+        _count_shed(e)
+        raise
+    except Exception as e:
+        metrics.NEURAL_FALLBACKS.inc()
+        logger.warning(f"Ошибка нейронной сети, используем кинематику: {e}")
+        return None
+
+def _hybrid_predict(windows: np.ndarray, predictor, deadline: float = None):
+    """Гибридное предсказание (кинематика + GRU) для батча окон (batch_size, seq_len, 3).
+
+    Возвращает (предсказания (batch_size, 3), degraded, blended): degraded=True - проход GRU
+    пропущен из-за срока и отдана кинематика; blended (batch_size,) - окна, где выход GRU
+    действительно смешан с кинематикой (в остальных - только кинематика).
+    """
+    start = perf_counter()
+    kinematic_prediction = kinematic_predict(windows)
+    metrics.KINEMATIC_SECONDS.observe(perf_counter() - start)
+    blended = np.zeros(len(windows), dtype=bool)
+    try:
+        neural_prediction = _neural_predict(windows, predictor, batched=True, deadline=deadline)
+    except DeadlineExceeded:
+        return kinematic_prediction, True, blended
+    if neural_prediction is None:
+        return kinematic_prediction, False, blended
+
+    # Там, где нейросеть выдала нечисловой результат, оставляем только кинематику
+    blended = np.isfinite(neural_prediction).all(axis=1)
+    combined = blend(kinematic_prediction, neural_prediction, windows)
+    return np.where(blended[:, None], combined, kinematic_prediction), False, blended
+
+def _cached_hybrid_predict(windows: np.ndarray, predictor, model_name: str, deadline: float = None):
+    """Гибридное предсказание через кэш: в модель идут только промахи. Возвращает (final, degraded)"""
+    if cache is None or predictor is None:
+        return _hybrid_predict(windows, predictor, deadline)[:2]
+
+    keys = cache.keys(windows, model_name)
+    final, hit = cache.lookup(keys, windows)
+    miss = ~hit
+    degraded = False
+    if miss.any():
+        fresh, degraded, blended = _hybrid_predict(windows[miss], predictor, deadline)
+        final[miss] = fresh
+        # В кэш попадают только окна со смешанным выходом GRU: кинематика вместо пропущенного
+        # или упавшего прохода иначе отдавалась бы повторам окна и после восстановления модели
+        if blended.any():
+            index = np.flatnonzero(miss)[blended]
+            cache.store([keys[i] for i in index], windows[index], fresh[blended])
+    return final, degraded
+
+def _hybrid_rollout(windows: np.ndarray, predictor, horizon: int, deadline: float = None):
+    """Гибридная траектория на horizon шагов для батча окон (batch_size, seq_len, 3).
+
+    Шаг k декодера объединяется с шагом k кинематической экстраполяции. Это не та же пара,
+    что в _hybrid_predict: там следующая точка кинематики объединяется с последним (10-м)
+    шагом декодера, как в исходном /predict/, поэтому первый шаг траектории с ним не совпадает.
+    Возвращает (траектории (batch_size, horizon, 3), degraded).
+    """
+    start = perf_counter()
+    kinematic_paths = kinematic_rollout(windows, horizon)
+    metrics.KINEMATIC_SECONDS.observe(perf_counter() - start)
+    if predictor is None:
+        return kinematic_paths, False
+
+    _count_call()
+    try:
+        normed = normalize(windows)
+        start = perf_counter()
+        pred = limiter.run(predictor.predict_sequence, normed, horizon, deadline=deadline)
+        metrics.FORWARD_SECONDS.observe(perf_counter() - start)
+        neural_paths = denormalize(pred)
+    except DeadlineExceeded as e:
+        _count_shed(e)
+        return kinematic_paths, True
+    except Exception as e:
+        metrics.NEURAL_FALLBACKS.inc()
+        logger.warning(f"Ошибка нейронной сети, используем кинематику: {e}")
+        return kinematic_paths, False
+
+    # Траектории с нечисловым выходом нейросети - только кинематика
+    valid = np.isfinite(neural_paths).all(axis=(1, 2), keepdims=True)
+    return np.where(valid, blend(kinematic_paths, neural_paths, windows), kinematic_paths), False
+
+def _predict_window(arr: np.ndarray, predictor, model_name: str, deadline: float = None):
+    """Гибридное предсказание одного окна (1, seq_len, 3) через кэш и планировщик.
+
+    Возвращает (final (3,), neural (3,) или None, mode); mode="degraded" - проход GRU
+    пропущен из-за срока.
+    """
+    # Почти такое же окно (с точностью до сдвига) уже считалось - берем из кэша
+    keys = None
+    if cache is not None and predictor is not None:
+        keys = cache.keys(arr, model_name)
+        cached, hit = cache.lookup(keys, arr)
+        if hit[0]:
+            return cached[0], None, "cached"
+
+    # Кинематический подход для предсказания
+    start = perf_counter()
+    kinematic_prediction = kinematic_predict(arr)[0]
+    metrics.KINEMATIC_SECONDS.observe(perf_counter() - start)
+
+    # Если модель загружена, попытаемся получить её предсказание
+    try:
+        neural_prediction = _neural_predict(arr, predictor, deadline=deadline)
+    except DeadlineExceeded:
+        return kinematic_prediction, None, "degraded"
+    if neural_prediction is not None:
+        neural_prediction = neural_prediction[0]
+
+    # Используем комбинированный подход или только кинематику
+    if neural_prediction is not None and np.isfinite(neural_prediction).all():
+        # Комбинируем предсказания (больше веса кинематике)
+        final_prediction = blend(kinematic_prediction, neural_prediction, arr)
+        if keys is not None:
+            cache.store(keys, arr, final_prediction[None])
+        return final_prediction, neural_prediction, "combined"
+    # Используем только кинематическое предсказание
+    return kinematic_prediction, neural_prediction, "kinematic"
+
+def _read_raw_windows(body: bytes, points: int = 5) -> np.ndarray:
+    """Окна (N, points, 3) из тела little-endian float32 без промежуточных объектов"""
+    start = perf_counter()
+    error = _points_error(points)
+    if error is not None:
+        raise HTTPException(400, error)
+    window_bytes = points * RAW_POINT_BYTES
+    if not body or len(body) % window_bytes:
+        raise HTTPException(400, f"Тело должно содержать окна по {points} точек (x, y, t) float32, {window_bytes} байт на окно")
+    windows = np.frombuffer(body, dtype=RAW_DTYPE).reshape(-1, points, 3).astype(np.float64)
+    metrics.PARSE_SECONDS.observe(perf_counter() - start)
+    return windows
+
+def _raw_response(predictions: np.ndarray, degraded: bool = False) -> Response:
+    """Предсказания (N, 3) как little-endian float32; degraded - в заголовке X-Degraded"""
+    start = perf_counter()
+    headers = {"X-Degraded": "1"} if degraded else None
+    response = Response(predictions.astype(RAW_DTYPE).tobytes(), media_type=RAW_MEDIA_TYPE, headers=headers)
+    metrics.SERIALIZE_SECONDS.observe(perf_counter() - start)
+    return response
+
 @router.post("/", response_model=PointOut)
 def predict(seq: SequenceIn):
-    """Предсказание следующей точки траектории по 5 предыдущим точкам"""
-    if len(seq.points) != 5:
-        raise HTTPException(400, "Нужно ровно 5 точек")
+    """Предсказание следующей точки траектории по WINDOW_MIN_POINTS..WINDOW_MAX_POINTS предыдущим точкам"""
+    PREDICT_REQUESTS.inc()
+    deadline = _deadline(seq.deadline_ms)
+    error = _points_error(len(seq.points))
+    if error is not None:
+        raise HTTPException(400, error)
+    predictor = _get_model(seq.model)
     
     try:
-        # Преобразуем входные данные в список точек
-        points = []
-        for point in seq.points:
-            points.append([point.x, point.y, point.t])
-        
-        points = np.array(points)  # shape: (5, 3)
+        arr = seq.to_numpy()  # shape: (1, seq_len, 3)
+        model_name = seq.model or registry.default
+        final_prediction, neural_prediction, mode = _predict_window(arr, predictor, model_name, deadline)
+        _capture("predict", arr, final_prediction, model_name, mode == "degraded")
         
-        # Кинематический подход для предсказания
-        if len(points) >= 3:
-            # Берем последние 3 точки для анализа ускорения
-            p1, p2, p3 = points[-3], points[-2], points[-1]
-            
-            # Вычисляем скорости между точками
-            v1 = p2 - p1  # скорость между p1 и p2
-            v2 = p3 - p2  # скорость между p2 и p3
-            
-            # Вычисляем ускорение
-            acceleration = v2 - v1
-            
-            # Предсказываем следующую точку с учетом ускорения
-            # Формула: next = current + velocity + 0.5 * acceleration
-            kinematic_prediction = p3 + v2 + 0.5 * acceleration
-            
-        elif len(points) >= 2:
-            # Если только 2 точки, используем линейную экстраполяцию
-            p1, p2 = points[-2], points[-1]
-            velocity = p2 - p1
-            kinematic_prediction = p2 + velocity
-            
-        else:
-            # Если только 1 точка, просто копируем её
-            kinematic_prediction = points[-1].copy()
-            kinematic_prediction[2] += 1.0  # увеличиваем время на 1
-        
-        # Если модель загружена, попытаемся получить её предсказание
-        neural_prediction = None
-        if model is not None:
-            try:
-                # Нормализуем входные данные для нейронной сети
-                arr = seq.to_numpy()  # shape: (1, 5, 3)
-                normed = normalize(arr)
-                
-                # Получаем предсказание от модели
-                pred = model.predict(normed)  # shape: (1, 3)
-                denormed = denormalize(pred)
-                neural_prediction = denormed[0]
-                
-                logger.info(f"Neural prediction: {neural_prediction}")
-                
-            except Exception as e:
-                logger.warning(f"Ошибка нейронной сети, используем кинематику: {e}")
-        
-        # Используем комбинированный подход или только кинематику
-        if neural_prediction is not None:
-            # Комбинируем предсказания (больше веса кинематике)
-            final_prediction = 0.7 * kinematic_prediction + 0.3 * neural_prediction
-            logger.info(f"Combined prediction used")
-        else:
-            # Используем только кинематическое предсказание
-            final_prediction = kinematic_prediction
-            logger.info(f"Kinematic-only prediction used")
-        
-        logger.info(f"Input points: {points.tolist()}")
-        logger.info(f"Final prediction: {final_prediction.tolist()}")
+        # Одна структурная запись на запрос; массивы форматируются в фоновом потоке записи
+        if sampled(logger):
+            logger.info("prediction", extra={"payload": {
+                "mode": mode,
+                "input": arr[0],
+                "neural": neural_prediction,
+                "final": final_prediction,
+            }})
         
         # Возвращаем результат как PointOut
-        return PointOut(
-            x=float(final_prediction[0]),
-            y=float(final_prediction[1]),
-            t=float(final_prediction[2])
-        )
+        return _json_response(PointOut.from_array(final_prediction, degraded=mode == "degraded"))
     
     except Exception as e:
+        PREDICT_ERRORS.inc()
+        logger.error(f"Ошибка при предсказании: {e}")
+        raise HTTPException(500, f"Ошибка при предсказании: {str(e)}")
+
+@router.post("/raw", response_class=Response, responses={200: {"content": {RAW_MEDIA_TYPE: {}}}})
+def predict_raw(
+    body: bytes = Body(..., media_type=RAW_MEDIA_TYPE),
+    model: Optional[str] = None,
+    deadline_ms: Optional[float] = Query(None, gt=0),
+    points: int = 5,
+):
+    """Бинарный вариант POST /predict/: points точек (x, y, t) как 3 * points float32 little-endian.
+
+    Ответ - 3 float32 (x, y, t) предсказанной точки.
+    """
+    RAW_REQUESTS.inc()
+    deadline = _deadline(deadline_ms)
+    arr = _read_raw_windows(body, points)
+    if len(arr) != 1:
+        raise HTTPException(400, f"Нужно ровно одно окно из {points} точек")
+    if not np.isfinite(arr).all():
+        raise HTTPException(400, "Координаты должны быть конечными числами")
+    predictor = _get_model(model)
+
+    try:
+        model_name = model or registry.default
+        final_prediction, neural_prediction, mode = _predict_window(arr, predictor, model_name, deadline)
+        _capture("predict_raw", arr, final_prediction, model_name, mode == "degraded")
+        if sampled(logger):
+            logger.info("prediction", extra={"payload": {
+                "mode": mode,
+                "input": arr[0],
+                "neural": neural_prediction,
+                "final": final_prediction,
+            }})
+        return _raw_response(final_prediction, degraded=mode == "degraded")
+
+    except Exception as e:
+        RAW_ERRORS.inc()
+        logger.error(f"Ошибка при предсказании: {e}")
+        raise HTTPException(500, f"Ошибка при предсказании: {str(e)}")
+
+@router.post("/batch", response_model=BatchPointOut)
+def predict_batch(batch: BatchSequenceIn):
+    """Пакетное предсказание: одна кинематика и один проход GRU на траектории одной длины.
+
+    Траектории разной длины группируются по длине, по проходу GRU на группу.
+    Ошибки отдельных траекторий возвращаются в поле error и не валят весь запрос.
+    """
+    BATCH_REQUESTS.inc()
+    deadline = _deadline(batch.deadline_ms)
+    if len(batch.items) > settings.MAX_BATCH_SIZE:
+        raise HTTPException(400, f"Не больше {settings.MAX_BATCH_SIZE} траекторий в запросе")
+
+    predictor = _get_model(batch.model)
+    results = [BatchItemOut() for _ in batch.items]
+    degraded = False
+
+    # Отбираем корректные окна, ошибочные сразу помечаем
+    valid_idx = []
+    windows = []
+    for i, seq in enumerate(batch.items):
+        error = _points_error(len(seq.points))
+        if error is not None:
+            results[i].error = error
+            continue
+        window = [[p.x, p.y, p.t] for p in seq.points]
+        if not np.isfinite(window).all():
+            results[i].error = "Координаты должны быть конечными числами"
+            continue
+        valid_idx.append(i)
+        windows.append(window)
+
+    if windows:
+        try:
+            final, degraded = _by_length(
+                _cached_hybrid_predict, windows, predictor, batch.model or registry.default, deadline
+            )  # shape: (N, 3)
+        except Exception as e:
+            BATCH_ERRORS.inc()
+            logger.error(f"Ошибка при пакетном предсказании: {e}")
+            raise HTTPException(500, f"Ошибка при предсказании: {str(e)}")
+
+        _capture("batch", windows, final, batch.model or registry.default, degraded)
+        for i, row in zip(valid_idx, final.tolist()):
+            results[i] = BatchItemOut(x=row[0], y=row[1], t=row[2])
+
+    if sampled(logger):
+        logger.info("batch_prediction", extra={"payload": {"valid": len(valid_idx), "total": len(batch.items)}})
+    return _json_response(BatchPointOut(results=results, degraded=degraded))
+
+@router.post("/batch/raw", response_class=Response, responses={200: {"content": {RAW_MEDIA_TYPE: {}}}})
+def predict_batch_raw(
+    body: bytes = Body(..., media_type=RAW_MEDIA_TYPE),
+    model: Optional[str] = None,
+    deadline_ms: Optional[float] = Query(None, gt=0),
+    points: int = 5,
+):
+    """Бинарный вариант POST /predict/batch: N окон по points точек (3 * points float32) подряд.
+
+    Все окна запроса одной длины. Ответ - N x 3 float32; для окон с нечисловыми
+    координатами строка заполнена NaN.
+    """
+    BATCH_RAW_REQUESTS.inc()
+    deadline = _deadline(deadline_ms)
+    windows = _read_raw_windows(body, points)
+    if len(windows) > settings.MAX_BATCH_SIZE:
+        raise HTTPException(400, f"Не больше {settings.MAX_BATCH_SIZE} траекторий в запросе")
+    predictor = _get_model(model)
+
+    final = np.full((len(windows), 3), np.nan)
+    valid = np.isfinite(windows).all(axis=(1, 2))
+    degraded = False
+    if valid.any():
+        try:
+            final[valid], degraded = _cached_hybrid_predict(windows[valid], predictor, model or registry.default, deadline)
+        except Exception as e:
+            BATCH_RAW_ERRORS.inc()
+            logger.error(f"Ошибка при пакетном предсказании: {e}")
+            raise HTTPException(500, f"Ошибка при предсказании: {str(e)}")
+        _capture("batch_raw", windows[valid], final[valid], model or registry.default, degraded)
+
+    if sampled(logger):
+        logger.info("batch_prediction", extra={"payload": {"valid": int(valid.sum()), "total": len(windows)}})
+    return _raw_response(final, degraded)
+
+@router.post("/horizon", response_model=TrajectoryOut)
+def predict_horizon(seq: HorizonIn):
+    """Предсказание траектории на horizon шагов вперед за один проход GRU.
+
+    Шаг k декодера объединяется с шагом k кинематической экстраполяции. /predict/ объединяет
+    следующую точку кинематики с последним шагом декодера, поэтому первая точка траектории
+    отличается от ответа /predict/ для того же окна.
+    """
+    HORIZON_REQUESTS.inc()
+    deadline = _deadline(seq.deadline_ms)
+    error = _points_error(len(seq.points))
+    if error is not None:
+        raise HTTPException(400, error)
+    predictor = _get_model(seq.model)
+
+    try:
+        arr = seq.to_numpy()  # shape: (1, seq_len, 3)
+        paths, degraded = _hybrid_rollout(arr, predictor, seq.horizon, deadline)
+        final_path = paths[0]  # shape: (horizon, 3)
+
+        if sampled(logger):
+            logger.info("horizon_prediction", extra={"payload": {"horizon": seq.horizon, "input": arr[0], "final": final_path}})
+        return _json_response(TrajectoryOut.from_array(final_path, degraded=degraded))
+
+    except Exception as e:
+        HORIZON_ERRORS.inc()
         logger.error(f"Ошибка при предсказании: {e}")
         raise HTTPException(500, f"Ошибка при предсказании: {str(e)}")
 
@@ -104,5 +515,17 @@ def health_check():
     """Проверка состояния сервиса"""
     return {
         "status": "healthy" if model is not None else "unhealthy",
-        "model_loaded": model is not None
+        "model_loaded": model is not None,
+        "scheduler": scheduler.stats() if scheduler is not None else None,
+        "models": registry.stats(),
+        "cache": cache.stats() if cache is not None else None,
+        "shedding": _shedding_stats(),
+    }
+
+def _shedding_stats() -> dict:
+    # Счетчики limiter, а не метрик: с METRICS_ENABLED=False метрики не считаются
+    return {
+        "deadline_ms": settings.DEADLINE_MS,
+        "max_concurrent_inferences": settings.MAX_CONCURRENT_INFERENCES,
+        **limiter.stats(),
     }
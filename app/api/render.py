@@ -0,0 +1,84 @@
+from fastapi import APIRouter, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
+from time import perf_counter
+from app.schemas.flight import RenderIn
+from app.api.predict import _deadline, _get_model, _hybrid_rollout, _points_error, registry
+from app.core.config import settings
+from app.core.render import ImageCache, Renderer, render_key
+from app.core import metrics
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+RENDER_REQUESTS, RENDER_ERRORS = metrics.endpoint_counters("render")
+RENDER_SECONDS = metrics.registry.histogram(
+    "predictor_render_seconds", "Время отрисовки картинки траектории (промахи кэша)"
+)
+
+# Пул процессов создается при первой отрисовке, кэш общий для всех запросов процесса
+renderer = Renderer(settings.RENDER_PROCESSES, ImageCache(settings.RENDER_CACHE_MAX_BYTES))
+
+def _predict_path(track: np.ndarray, model: str, horizon: int, deadline: float = None):
+    """Гибридная траектория (horizon, 3) по последним WINDOW_MAX_POINTS точкам трека и degraded"""
+    predictor = _get_model(model)
+    paths, degraded = _hybrid_rollout(track[None, -settings.WINDOW_MAX_POINTS:], predictor, horizon, deadline)
+    return paths[0], degraded
+
+@router.post("/render", response_class=Response, responses={200: {"content": {"image/png": {}}}})
+async def render_trajectory(request: RenderIn):
+    """PNG с треком дрона и предсказанием (как examples/visualize_prediction.py).
+
+    Предсказание берется из запроса, а без него считается моделью по концу трека.
+    Картинки кэшируются по хэшу содержимого запроса: повторный запрос того же трека
+    (обновление дашборда) отдается из кэша без отрисовки и без прохода модели.
+    Отрисовка идет в пуле процессов и не блокирует цикл событий.
+    """
+    RENDER_REQUESTS.inc()
+    if not request.points:
+        raise HTTPException(400, "Нужна хотя бы одна точка трека")
+    if len(request.points) > settings.RENDER_MAX_TRACK_POINTS:
+        raise HTTPException(400, f"Не больше {settings.RENDER_MAX_TRACK_POINTS} точек трека")
+    track = np.array([[p.x, p.y, p.t] for p in request.points], dtype=float)
+    prediction = None
+    if request.prediction is not None:
+        if not request.prediction:
+            raise HTTPException(400, "Пустое предсказание")
+        prediction = np.array([[p.x, p.y, p.t] for p in request.prediction], dtype=float)
+    if not np.isfinite(track).all() or (prediction is not None and not np.isfinite(prediction).all()):
+        raise HTTPException(400, "Координаты должны быть конечными числами")
+
+    options = {"title": request.title, "dpi": settings.RENDER_DPI, "max_points": settings.RENDER_MAX_POINTS}
+    if prediction is not None:
+        key = render_key(track, prediction, **options)
+    else:
+        error = _points_error(min(len(track), settings.WINDOW_MAX_POINTS))
+        if error is not None:
+            raise HTTPException(400, error)
+        # Модель детерминирована, поэтому ключ - трек, модель и горизонт, без прохода модели
+        key = render_key(track, {"model": request.model or registry.default, "horizon": request.horizon}, **options)
+
+    png = renderer.cached(key)
+    if png is not None:
+        return Response(png, media_type="image/png", headers={"X-Render-Cache": "hit"})
+
+    degraded = False
+    if prediction is None:
+        deadline = _deadline(request.deadline_ms)
+        prediction, degraded = await run_in_threadpool(_predict_path, track, request.model, request.horizon, deadline)
+
+    start = perf_counter()
+    try:
+        # Кинематика вместо пропущенного по сроку прохода GRU в кэш не попадает
+        png = await renderer.render(key, track, prediction, store=not degraded, **options)
+    except Exception as e:
+        RENDER_ERRORS.inc()
+        logger.error(f"Ошибка при отрисовке траектории: {e}")
+        raise HTTPException(500, f"Ошибка при отрисовке: {str(e)}")
+    RENDER_SECONDS.observe(perf_counter() - start)
+    headers = {"X-Render-Cache": "miss"}
+    if degraded:
+        headers["X-Degraded"] = "1"
+    return Response(png, media_type="image/png", headers=headers)
@@ -0,0 +1,66 @@
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from app.schemas.flight import StreamTickIn, StreamPredictionOut, StreamTickOut
+from app.core.config import settings
+from app.core.sessions import StreamSessions
+from app.api.predict import model
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+sessions = StreamSessions(
+    model,
+    max_sessions=settings.STREAM_MAX_SESSIONS,
+    idle_timeout_s=settings.STREAM_IDLE_TIMEOUT_S,
+)
+
+def _process_tick(tick: StreamTickIn) -> StreamTickOut:
+    """Продвинуть сессии дронов на одну точку и собрать предсказания"""
+    drone_ids = [p.drone_id for p in tick.points]
+    points = np.array([[p.x, p.y, p.t] for p in tick.points], dtype=float)
+    predictions, counts = sessions.update(drone_ids, points)
+
+    out = []
+    for drone_id, row, count in zip(drone_ids, predictions.tolist(), counts.tolist()):
+        if np.isnan(row[0]):
+            out.append(StreamPredictionOut(drone_id=drone_id, count=count))
+        else:
+            out.append(StreamPredictionOut(drone_id=drone_id, x=row[0], y=row[1], t=row[2], count=count))
+    return StreamTickOut(predictions=out)
+
+@router.websocket("/stream")
+async def predict_stream(websocket: WebSocket):
+    """Потоковое предсказание: клиент шлет новые точки дронов, сервер отвечает предсказаниями.
+
+    Сообщение клиента: {"points": [{"drone_id": "a1", "x": 0.0, "y": 0.0, "t": 0.0}, ...]}
+    """
+    await websocket.accept()
+    try:
+        while True:
+            message = await websocket.receive_text()
+            try:
+                tick = StreamTickIn.model_validate_json(message)
+            except ValidationError as e:
+                await websocket.send_json({"error": str(e)})
+                continue
+            if not tick.points:
+                continue
+            try:
+                result = await run_in_threadpool(_process_tick, tick)
+            except Exception as e:
+                # Ошибка одного сообщения не рвет соединение: сессии дронов сохраняются
+                logger.error(f"Ошибка при потоковом предсказании: {e}")
+                await websocket.send_json({"error": f"Ошибка при предсказании: {str(e)}"})
+                continue
+            await websocket.send_text(result.model_dump_json())
+    except WebSocketDisconnect:
+        logger.info("Потоковый клиент отключился")
+
+@router.get("/stream/stats")
+def stream_stats():
+    """Состояние потоковых сессий: число активных дронов, память, вытеснения"""
+    return sessions.stats()
@@ -0,0 +1,80 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+class PredictionCache:
+    """Кэш предсказаний, инвариантный к сдвигу траектории.
+
+    Ключ - окно относительно его последней точки, квантованное с шагом tolerance
+    (плюс имя модели). Значение - предсказание относительно последней точки,
+    при попадании оно сдвигается обратно в абсолютные координаты.
+    Размер ограничен max_size (LRU), записи старше ttl_s считаются промахом.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_s: float = 60.0, tolerance: float = 1e-3):
+        self.max_size = max_size
+        self.ttl_s = ttl_s
+        self.tolerance = tolerance
+        self._lock = threading.Lock()
+        self._data = OrderedDict()  # key -> (expires_at, relative prediction)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def keys(self, windows: np.ndarray, model: str) -> list:
+        """Ключи для батча окон (batch_size, seq_len, 3)"""
+        relative = windows - windows[:, -1:, :]
+        quantized = np.round(relative / self.tolerance).astype(np.int64)
+        prefix = model.encode() + b"\0"
+        return [prefix + row.tobytes() for row in quantized.reshape(len(windows), -1)]
+
+    def lookup(self, keys: list, windows: np.ndarray):
+        """Вернуть (predictions (batch_size, 3), hit mask); промахи заполнены NaN"""
+        now = time.monotonic()
+        relative = np.full((len(keys), 3), np.nan)
+        hit = np.zeros(len(keys), dtype=bool)
+        with self._lock:
+            for i, key in enumerate(keys):
+                entry = self._data.get(key)
+                if entry is None:
+                    continue
+                if entry[0] < now:
+                    del self._data[key]
+                    continue
+                self._data.move_to_end(key)
+                relative[i] = entry[1]
+                hit[i] = True
+            self.hits += int(hit.sum())
+            self.misses += len(keys) - int(hit.sum())
+        return relative + windows[:, -1, :], hit
+
+    def store(self, keys: list, windows: np.ndarray, predictions: np.ndarray):
+        """Сохранить предсказания (batch_size, 3) для окон с ключами keys"""
+        expires_at = time.monotonic() + self.ttl_s
+        relative = predictions - windows[:, -1, :]
+        with self._lock:
+            for key, row in zip(keys, relative):
+                self._data[key] = (expires_at, row)
+                self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,153 @@
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+# Коды эндпоинтов в записях
+ENDPOINTS = ("predict", "predict_raw", "batch", "batch_raw")
+
+_MAGIC = b"DFPCAP01"
+HEADER_SIZE = 512
+_HEADER = np.dtype([
+    ("magic", "S8"),
+    ("max_points", "<u4"),
+    ("capacity", "<u8"),
+    ("written", "<u8"),  # всего записано (позиция следующей записи - written % capacity)
+    ("models", "S480"),  # JSON-список имен моделей, индекс в нем - поле model записи
+])
+assert _HEADER.itemsize <= HEADER_SIZE
+
+# Флаги записи
+DEGRADED = 1
+
+
+def record_dtype(max_points: int) -> np.dtype:
+    """Запись фиксированного размера: окно дополняется NaN до max_points точек"""
+    return np.dtype([
+        ("ts", "<f8"),  # time.time() запроса
+        ("request", "<u4"),  # номер запроса: окна одного пакетного запроса идут подряд с одним номером
+        ("endpoint", "u1"),
+        ("model", "u1"),
+        ("points", "u1"),
+        ("flags", "u1"),
+        ("window", "<f4", (max_points, 3)),
+        ("prediction", "<f4", (3,)),
+    ])
+
+
+def _encode_models(models) -> bytes:
+    """JSON-список имен моделей для заголовка; ValueError, если он не влезает в поле models"""
+    data = json.dumps(list(models)).encode()
+    if len(data) > _HEADER["models"].itemsize:
+        raise ValueError(f"Список моделей не влезает в заголовок записи трафика: "
+                         f"{len(data)} > {_HEADER['models'].itemsize} байт")
+    return data
+
+
+class TrafficRecorder:
+    """Запись входящих окон и предсказаний в кольцевой файл с отображением в память (mmap).
+
+    Файл - заголовок и capacity записей фиксированного размера; при заполнении новые
+    записи затирают самые старые. Запись - одно присваивание в отображенный массив под
+    блокировкой, без системных вызовов: данные сбрасывает на диск ядро.
+    """
+
+    def __init__(self, path: str, capacity: int = 100000, max_points: int = 30, models=()):
+        self.path = path
+        self._lock = threading.Lock()
+        self._models = list(models)
+        self._requests = 0
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        dtype = record_dtype(max_points)
+        _encode_models(self._models)
+        if os.path.exists(path):
+            header = np.memmap(path, dtype=_HEADER, mode="r+", shape=(1,))
+            if header["magic"][0] != _MAGIC or int(header["max_points"][0]) != max_points:
+                raise ValueError(f"{path}: не файл записи трафика или другая длина окна")
+            capacity = int(header["capacity"][0])
+            self._models = json.loads(header["models"][0].decode())
+        else:
+            with open(path, "wb") as f:
+                f.truncate(HEADER_SIZE + capacity * dtype.itemsize)
+            header = np.memmap(path, dtype=_HEADER, mode="r+", shape=(1,))
+            header["magic"] = _MAGIC
+            header["max_points"] = max_points
+            header["capacity"] = capacity
+            header["written"] = 0
+        self._header = header
+        self._save_models()
+        self.records = np.memmap(path, dtype=dtype, mode="r+", offset=HEADER_SIZE, shape=(capacity,))
+        self.capacity = capacity
+        self.max_points = max_points
+        if self.written:
+            # Продолжаем нумерацию запросов после перезапуска
+            self._requests = int(self.records["request"][(self.written - 1) % capacity]) + 1
+
+    @property
+    def written(self) -> int:
+        return int(self._header["written"][0])
+
+    def record(self, endpoint: str, windows, predictions: np.ndarray, model: str, degraded: bool = False):
+        """Записать окна одного запроса: массив (n, seq_len, 3) или список окон (seq_len, 3)"""
+        count = len(windows)
+        if not count:
+            return
+        if count > self.capacity:
+            windows, predictions, count = windows[-self.capacity:], predictions[-self.capacity:], self.capacity
+        batch = np.zeros(count, dtype=self.records.dtype)
+        batch["ts"] = time.time()
+        batch["endpoint"] = ENDPOINTS.index(endpoint)
+        batch["flags"] = DEGRADED if degraded else 0
+        batch["window"] = np.nan
+        if isinstance(windows, np.ndarray):
+            batch["points"] = windows.shape[1]
+            batch["window"][:, :windows.shape[1]] = windows
+        else:
+            for i, window in enumerate(windows):
+                batch["points"][i] = len(window)
+                batch["window"][i, :len(window)] = window
+        batch["prediction"] = np.reshape(predictions, (count, 3))
+
+        with self._lock:
+            if model not in self._models:
+                self._save_models(self._models + [model])
+            batch["model"] = self._models.index(model)
+            batch["request"] = self._requests
+            self._requests += 1
+            start = self.written % self.capacity
+            head = min(count, self.capacity - start)
+            self.records[start:start + head] = batch[:head]
+            if head < count:
+                # Перенос через конец кольца
+                self.records[:count - head] = batch[head:]
+            self._header["written"] += count
+
+    def flush(self):
+        self.records.flush()
+        self._header.flush()
+
+    def _save_models(self, models=None):
+        """Сохранить список моделей в заголовок; не влезающий список не меняет ни заголовок, ни self._models"""
+        models = self._models if models is None else models
+        self._header["models"] = _encode_models(models)
+        self._models = models
+
+
+def read_capture(path: str):
+    """Записи файла в порядке записи (самые старые первыми) и имена моделей"""
+    header = np.memmap(path, dtype=_HEADER, mode="r", shape=(1,))
+    if header["magic"][0] != _MAGIC:
+        raise ValueError(f"{path}: не файл записи трафика")
+    capacity, written = int(header["capacity"][0]), int(header["written"][0])
+    records = np.memmap(path, dtype=record_dtype(int(header["max_points"][0])), mode="r",
+                        offset=HEADER_SIZE, shape=(capacity,))
+    if written <= capacity:
+        records = np.array(records[:written])
+    else:
+        start = written % capacity
+        records = np.concatenate([records[start:], records[:start]])
+    return records, json.loads(header["models"][0].decode())
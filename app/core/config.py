@@ -1,7 +1,16 @@
-from pydantic_settings import BaseSettings
-from typing import List, Union
+from functools import lru_cache
+from pydantic import model_validator
+from pydantic_settings import BaseSettings, JsonConfigSettingsSource
+from typing import List, Optional, Union
 import numpy as np
 import ast
+import os
+
+# Корень проекта: путь по умолчанию не зависит от каталога, из которого запущен сервис или скрипт
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Подобранные веса смешивания (пишет scripts/evaluate.py); переменные окружения важнее файла
+BLEND_CONFIG = os.environ.get("BLEND_CONFIG", os.path.join(ROOT, "configs", "blend.json"))
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "drone-flight-predictor"
@@ -12,31 +21,131 @@ class Settings(BaseSettings):
     STD: Union[str, List[float]] = "[1.0, 1.0, 1.0]"
     HIDDEN_SIZE: int = 64
     NUM_LAYERS: int = 2
+    # Реестр моделей: каталог с чекпоинтами, модель по умолчанию и бюджет памяти на веса
+    MODELS_DIR: str = "app/models/GRU_With_Mix_Dataset_MaxNorm"
+    DEFAULT_MODEL: str = "default"
+    MODEL_MEMORY_BUDGET_MB: float = 64.0
+    MODEL_WARMUP_BATCH: int = 8
+    # Ансамбль "ensemble": модели реестра одного размера (pos_* и vel_*) и их веса (пусто - поровну);
+    # батчи до ENSEMBLE_FUSED_MAX_BATCH окон считаются одним проходом объединенной модели
+    ENSEMBLE_MODELS: List[str] = ["pos_64", "vel_64"]
+    ENSEMBLE_WEIGHTS: List[float] = []
+    ENSEMBLE_FUSED_MAX_BATCH: int = 8
+    # Бэкенд инференса: torch, numpy (без импорта torch), torchscript, quantized, onnx
+    BACKEND: str = "torch"
+    # Веса для numpy-бэкенда; по умолчанию MODEL_PATH с расширением .npz
+    NPZ_PATH: Optional[str] = None
+    # Проверка точности оптимизированного бэкенда против eager при загрузке
+    BACKEND_VERIFY: bool = True
+    # Допуск проверки; по умолчанию свой для каждого бэкенда (TOLERANCES)
+    BACKEND_TOLERANCE: Optional[float] = None
+    # Кинематическая часть: finite_difference (по 3 последним точкам) или kalman
+    KINEMATIC_MODEL: str = "finite_difference"
+    # Интенсивность шума рывка и СКО измерения позиции для фильтра Калмана
+    KALMAN_PROCESS_NOISE: float = 1.0
+    KALMAN_MEASUREMENT_NOISE: float = 0.5
+    # Вес кинематики в гибридном предсказании (остальное - нейросеть)
+    KINEMATIC_WEIGHT: float = 0.7
+    # Вес кинематики по режимам скорости: границы скоростей и по весу на режим (границ + 1)
+    BLEND_SPEED_BINS: List[float] = []
+    BLEND_SPEED_WEIGHTS: List[float] = []
+    # Допустимая длина окна истории, точек; кинематика берет последние точки окна,
+    # окна разной длины идут в GRU отдельными батчами (по длине)
+    WINDOW_MIN_POINTS: int = 5
+    WINDOW_MAX_POINTS: int = 30
+    # Максимальное число траекторий в одном batch-запросе
+    MAX_BATCH_SIZE: int = 1024
+    # Максимальное число траекторий в запросе поиска конфликтов
+    CONFLICT_MAX_DRONES: int = 20000
+    # Micro-batching одиночных запросов в один проход GRU
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_MAX_BATCH: int = 64
+    SCHEDULER_MAX_WAIT_MS: float = 2.0
+    # Срок ответа по умолчанию, мс: если GRU не успевает, отдается кинематика (None - без срока)
+    DEADLINE_MS: Optional[float] = None
+    # Не больше стольких одновременных проходов модели (0 - без ограничения)
+    MAX_CONCURRENT_INFERENCES: int = 0
+    # Потоков torch/ONNX Runtime на проход (None - по умолчанию библиотеки)
+    TORCH_NUM_THREADS: Optional[int] = None
+    # Запуск через python -m app.serve: воркеров, потоков torch/OpenMP на воркер
+    # (None - ядра поровну между воркерами) и привязка каждого воркера к своему ядру
+    WORKERS: int = 1
+    WORKER_THREADS: Optional[int] = None
+    WORKER_AFFINITY: bool = False
+    # Кэш предсказаний по окнам относительно последней точки, квантованным с шагом CACHE_TOLERANCE
+    CACHE_ENABLED: bool = False
+    CACHE_MAX_SIZE: int = 100000
+    CACHE_TTL_S: float = 60.0
+    CACHE_TOLERANCE: float = 1e-3
+    # Запись трафика в кольцевой файл для воспроизведения (scripts/replay_capture.py);
+    # None - выключена, {pid} в пути заменяется на номер процесса (свой файл на воркер).
+    # Один файл на несколько процессов не поддерживается (блокировка и номера запросов у каждого
+    # свои): app.serve с WORKERS > 1 сам добавляет к пути без {pid} суффикс .{pid}
+    CAPTURE_PATH: Optional[str] = None
+    CAPTURE_MAX_RECORDS: int = 100000
+    # Отрисовка траекторий (/predict/render): процессы пула (0 - в потоке), кэш картинок в байтах,
+    # прореживание длинных треков и ограничение длины трека в запросе
+    RENDER_PROCESSES: int = 2
+    RENDER_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    RENDER_MAX_POINTS: int = 500
+    RENDER_MAX_TRACK_POINTS: int = 100000
+    RENDER_DPI: int = 100
+    # Логирование: JSON-строки, фоновый поток записи, ротация файла и выборка записей о запросах
+    LOG_LEVEL: str = "INFO"
+    LOG_FILE: str = "logs/app.log"
+    LOG_MAX_BYTES: int = 10 * 1024 * 1024
+    LOG_BACKUP_COUNT: int = 5
+    LOG_ASYNC: bool = True
+    LOG_JSON: bool = True
+    LOG_SAMPLE_RATE: float = 1.0
+    # Метрики стадий и счетчики запросов для /metrics
+    METRICS_ENABLED: bool = True
+    # Потоковые сессии по WebSocket: одна сессия на дрон
+    STREAM_MAX_SESSIONS: int = 4096
+    STREAM_IDLE_TIMEOUT_S: float = 300.0
+
+    model_config = {"env_file": ".env", "json_file": BLEND_CONFIG}
+
+    @classmethod
+    def settings_customise_sources(cls, settings_cls, init_settings, env_settings, dotenv_settings, file_secret_settings):
+        # Файл конфигурации - после окружения и .env, но перед значениями по умолчанию
+        return init_settings, env_settings, dotenv_settings, JsonConfigSettingsSource(settings_cls), file_secret_settings
 
-    model_config = {"env_file": ".env"}
+    @model_validator(mode="after")
+    def _check_blend_regimes(self):
+        # Ошибка в вручную исправленном blend.json должна остановить старт, а не ронять каждый запрос
+        if self.BLEND_SPEED_BINS or self.BLEND_SPEED_WEIGHTS:
+            if len(self.BLEND_SPEED_WEIGHTS) != len(self.BLEND_SPEED_BINS) + 1:
+                raise ValueError(
+                    f"BLEND_SPEED_WEIGHTS: нужно {len(self.BLEND_SPEED_BINS) + 1} весов на "
+                    f"{len(self.BLEND_SPEED_BINS)} границ BLEND_SPEED_BINS, задано {len(self.BLEND_SPEED_WEIGHTS)}"
+                )
+            if list(self.BLEND_SPEED_BINS) != sorted(self.BLEND_SPEED_BINS):
+                raise ValueError("BLEND_SPEED_BINS должны идти по возрастанию")
+        return self
     
     @property
     def mean_array(self) -> np.ndarray:
-        if isinstance(self.MEAN, str):
-            # Парсим строку как список
-            try:
-                mean_list = ast.literal_eval(self.MEAN)
-            except:
-                mean_list = [0.0, 0.0, 0.0]
-        else:
-            mean_list = self.MEAN
-        return np.array(mean_list, dtype=np.float32)
-    
+        return _vector(_hashable(self.MEAN), (0.0, 0.0, 0.0))
+
     @property
     def std_array(self) -> np.ndarray:
-        if isinstance(self.STD, str):
-            # Парсим строку как список
-            try:
-                std_list = ast.literal_eval(self.STD)
-            except:
-                std_list = [1.0, 1.0, 1.0]
-        else:
-            std_list = self.STD
-        return np.array(std_list, dtype=np.float32)
+        return _vector(_hashable(self.STD), (1.0, 1.0, 1.0))
+
+def _hashable(value):
+    return value if isinstance(value, str) else tuple(value)
+
+@lru_cache(maxsize=16)
+def _vector(value, default) -> np.ndarray:
+    """MEAN/STD как float32-массив; разбирается один раз на значение, массив только для чтения"""
+    if isinstance(value, str):
+        # Парсим строку как список
+        try:
+            value = ast.literal_eval(value)
+        except:
+            value = default
+    array = np.array(value, dtype=np.float32)
+    array.flags.writeable = False
+    return array
 
 settings = Settings()
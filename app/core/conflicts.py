@@ -0,0 +1,119 @@
+import numpy as np
+
+# Соседние ячейки сетки: своя и половина соседей, чтобы каждая пара ячеек проверялась один раз
+_NEIGHBORS = ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1))
+
+
+def _shifted_ranks(values: np.ndarray, shift: int) -> np.ndarray:
+    """Для каждого из отсортированных values - ранг values + shift среди них, -1 если такого нет"""
+    if shift == 0:
+        return np.arange(len(values))
+    rank = np.minimum(np.searchsorted(values, values + shift), len(values) - 1)
+    return np.where(values[rank] == values + shift, rank, -1)
+
+
+def _close_pairs(xy: np.ndarray, separation: float):
+    """Пары точек (i < j) на расстоянии не больше separation через равномерную сетку.
+
+    xy: (N, 2). Ячейка сетки - квадрат со стороной separation, поэтому достаточно
+    сравнить точку с точками своей и 8 соседних ячеек. Возвращает (i, j, distance).
+    """
+    if len(xy) < 2:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, np.empty(0)
+    # Номера ячеек остаются float64, а ключ строится из рангов занятых столбцов и строк (< N):
+    # линейный ключ по самим номерам переполняет int64 при большом размахе и малом separation
+    cells = np.floor(xy / separation)
+    columns, column = np.unique(cells[:, 0], return_inverse=True)
+    rows, row = np.unique(cells[:, 1], return_inverse=True)
+    keys = column * len(rows) + row
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    column, row = column[order], row[order]
+
+    found_i, found_j = [], []
+    for dx, dy in _NEIGHBORS:
+        # Ключ соседней ячейки; -1, если ее столбец или строка пусты (такого ключа нет)
+        neighbor_column = _shifted_ranks(columns, dx)[column]
+        neighbor_row = _shifted_ranks(rows, dy)[row]
+        target = np.where((neighbor_column >= 0) & (neighbor_row >= 0), neighbor_column * len(rows) + neighbor_row, -1)
+        lo = np.searchsorted(sorted_keys, target, side="left")
+        hi = np.searchsorted(sorted_keys, target, side="right")
+        if dx == 0 and dy == 0:
+            # В своей ячейке - только точки после текущей в порядке сортировки
+            lo = np.arange(len(sorted_keys)) + 1
+        counts = np.maximum(hi - lo, 0)
+        total = counts.sum()
+        if not total:
+            continue
+        # Разворачиваем диапазоны [lo, hi) в пары без цикла по точкам
+        src = np.repeat(np.arange(len(sorted_keys)), counts)
+        dst = np.repeat(lo - np.cumsum(counts) + counts, counts) + np.arange(total)
+        found_i.append(order[src])
+        found_j.append(order[dst])
+
+    if not found_i:
+        return _close_pairs(xy[:0], separation)
+    i, j = np.concatenate(found_i), np.concatenate(found_j)
+    distance = np.hypot(*(xy[i] - xy[j]).T)
+    close = distance <= separation
+    i, j, distance = i[close], j[close], distance[close]
+    swap = i > j
+    i[swap], j[swap] = j[swap], i[swap]
+    return i, j, distance
+
+
+def _merge_steps(steps):
+    """Минимальное расстояние по шагам горизонта для каждой пары: (i, j, distance, step)"""
+    steps = [(i, j, d, np.full(len(i), h)) for h, (i, j, d) in enumerate(steps) if len(i)]
+    if not steps:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, np.empty(0), empty
+    i, j, distance, step = (np.concatenate(column) for column in zip(*steps))
+    # Сортируем по паре, внутри пары - по расстоянию, и берем первую запись пары
+    order = np.lexsort((distance, j, i))
+    i, j, distance, step = i[order], j[order], distance[order], step[order]
+    first = np.ones(len(i), dtype=bool)
+    first[1:] = (i[1:] != i[:-1]) | (j[1:] != j[:-1])
+    return i[first], j[first], distance[first], step[first]
+
+
+def find_conflicts(paths: np.ndarray, separation: float):
+    """Пары дронов, сближающихся на separation и меньше на одном шаге предсказания.
+
+    paths: (N, horizon, 3) предсказанные точки (x, y, t); шаги разных дронов сравниваются
+    между собой (флот считается синхронным по шагам).
+    Возвращает (i, j, distance, step, t): минимальное расстояние пары по горизонту,
+    номер шага и среднее время пары на этом шаге.
+    """
+    paths = np.asarray(paths, dtype=np.float64)
+    if paths.ndim == 2:
+        paths = paths[:, None]
+    i, j, distance, step = _merge_steps(_close_pairs(paths[:, h, :2], separation) for h in range(paths.shape[1]))
+    t = 0.5 * (paths[i, step, 2] + paths[j, step, 2])
+    return i, j, distance, step, t
+
+
+def brute_force_conflicts(paths: np.ndarray, separation: float, chunk: int = 1024):
+    """То же, что find_conflicts, полным перебором пар (O(N^2)) - для проверки и бенчмарка"""
+    paths = np.asarray(paths, dtype=np.float64)
+    if paths.ndim == 2:
+        paths = paths[:, None]
+    n = len(paths)
+    steps = []
+    for h in range(paths.shape[1]):
+        xy = paths[:, h, :2]
+        found_i, found_j, found_d = [], [], []
+        for start in range(0, n, chunk):
+            block = xy[start:start + chunk]
+            distance = np.sqrt(((block[:, None, :] - xy[None, :, :]) ** 2).sum(axis=-1))
+            rows, cols = np.nonzero(distance <= separation)
+            rows += start
+            keep = rows < cols
+            found_i.append(rows[keep])
+            found_j.append(cols[keep])
+            found_d.append(distance[rows[keep] - start, cols[keep]])
+        steps.append((np.concatenate(found_i), np.concatenate(found_j), np.concatenate(found_d)))
+    i, j, distance, step = _merge_steps(steps)
+    t = 0.5 * (paths[i, step, 2] + paths[j, step, 2])
+    return i, j, distance, step, t
@@ -0,0 +1,73 @@
+import numpy as np
+
+from app.core.config import settings
+from app.core.tracker import kalman_predict
+
+
+def window_speed(windows: np.ndarray) -> np.ndarray:
+    """Скорость в плоскости XY на последнем шаге окна: (batch_size, seq_len, 3) -> (batch_size,)"""
+    windows = np.asarray(windows, dtype=np.float64)
+    if windows.shape[1] < 2:
+        return np.zeros(len(windows))
+    step = windows[:, -1] - windows[:, -2]
+    dt = np.where(step[:, 2] > 0, step[:, 2], 1.0)
+    return np.hypot(step[:, 0], step[:, 1]) / dt
+
+
+def kinematic_predict(windows: np.ndarray) -> np.ndarray:
+    """Кинематическое предсказание следующей точки для батча окон.
+
+    windows: (batch_size, seq_len, 3) -> (batch_size, 3)
+    KINEMATIC_MODEL=kalman - фильтр Калмана по точкам окна вместо конечных разностей.
+    """
+    if settings.KINEMATIC_MODEL == "kalman":
+        return kalman_predict(windows, None, settings.KALMAN_PROCESS_NOISE, settings.KALMAN_MEASUREMENT_NOISE)
+    windows = np.asarray(windows, dtype=np.float64)
+    seq_len = windows.shape[1]
+
+    if seq_len >= 3:
+        # Берем последние 3 точки для анализа ускорения
+        p1, p2, p3 = windows[:, -3], windows[:, -2], windows[:, -1]
+        v1 = p2 - p1
+        v2 = p3 - p2
+        acceleration = v2 - v1
+        # Формула: next = current + velocity + 0.5 * acceleration
+        return p3 + v2 + 0.5 * acceleration
+
+    if seq_len == 2:
+        # Если только 2 точки, используем линейную экстраполяцию
+        p1, p2 = windows[:, -2], windows[:, -1]
+        return p2 + (p2 - p1)
+
+    # Если только 1 точка, просто копируем её и увеличиваем время на 1
+    prediction = windows[:, -1].copy()
+    prediction[:, 2] += 1.0
+    return prediction
+
+
+def kinematic_rollout(windows: np.ndarray, horizon: int) -> np.ndarray:
+    """Многошаговая кинематическая экстраполяция на horizon шагов вперед.
+
+    windows: (batch_size, seq_len, 3) -> (batch_size, horizon, 3).
+    Первый шаг совпадает с kinematic_predict.
+    """
+    if settings.KINEMATIC_MODEL == "kalman":
+        return kalman_predict(windows, horizon, settings.KALMAN_PROCESS_NOISE, settings.KALMAN_MEASUREMENT_NOISE)
+    windows = np.asarray(windows, dtype=np.float64)
+    seq_len = windows.shape[1]
+    k = np.arange(1, horizon + 1, dtype=np.float64)[None, :, None]  # (1, horizon, 1)
+
+    if seq_len >= 3:
+        p1, p2, p3 = windows[:, -3, None], windows[:, -2, None], windows[:, -1, None]
+        velocity = p3 - p2
+        acceleration = velocity - (p2 - p1)
+        # Постоянное ускорение: p(k) = p3 + k * v + 0.5 * k^2 * a
+        return p3 + k * velocity + 0.5 * k ** 2 * acceleration
+
+    if seq_len == 2:
+        p1, p2 = windows[:, -2, None], windows[:, -1, None]
+        return p2 + k * (p2 - p1)
+
+    rollout = np.repeat(windows[:, -1, None], horizon, axis=1)
+    rollout[:, :, 2] += k[:, :, 0]
+    return rollout
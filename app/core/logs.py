@@ -0,0 +1,127 @@
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+
+import numpy as np
+
+from app.core.config import settings
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+def _to_json(value):
+    # numpy-массивы из payload превращаются в списки уже в потоке записи
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+class JsonFormatter(logging.Formatter):
+    """Компактная JSON-строка на запись; поле payload из extra разворачивается в запись"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        payload = getattr(record, "payload", None)
+        if payload:
+            data.update(payload)
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return json.dumps(data, default=_to_json, ensure_ascii=False, separators=(",", ":"))
+
+
+class TextFormatter(logging.Formatter):
+    """Текстовый формат; payload из extra дописывается в конец строки как JSON"""
+
+    def __init__(self):
+        super().__init__(TEXT_FORMAT)
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        payload = getattr(record, "payload", None)
+        if payload:
+            line += " " + json.dumps(payload, default=_to_json, ensure_ascii=False, separators=(",", ":"))
+        return line
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler, который не форматирует запись в потоке запроса.
+
+    Стандартный prepare() вызывает format() до постановки в очередь; здесь
+    форматирование и запись на диск целиком выполняет поток QueueListener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def sampled(logger: logging.Logger, level: int = logging.INFO) -> bool:
+    """Писать ли запись уровня level для этого запроса (с учетом LOG_SAMPLE_RATE).
+
+    Проверяется до построения payload, чтобы при выключенном уровне ничего не форматировать.
+    """
+    if not logger.isEnabledFor(level):
+        return False
+    rate = settings.LOG_SAMPLE_RATE
+    return rate >= 1.0 or random.random() < rate
+
+
+def setup_logging(
+    level: str = None,
+    log_file: str = None,
+    use_async: bool = None,
+    use_json: bool = None,
+    force: bool = False,
+):
+    """Настроить корневой логгер: ротация файла по размеру + stdout.
+
+    use_async=True - записи идут через очередь в фоновый поток записи.
+    Как и logging.basicConfig, ничего не делает, если у корневого логгера
+    уже есть обработчики (force=True - заменить их).
+    Возвращает запущенный QueueListener (его нужно остановить при завершении) или None.
+    """
+    level = level or settings.LOG_LEVEL
+    log_file = log_file or settings.LOG_FILE
+    use_async = settings.LOG_ASYNC if use_async is None else use_async
+    use_json = settings.LOG_JSON if use_json is None else use_json
+
+    root = logging.getLogger()
+    if root.handlers and not force:
+        return None
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+
+    if os.path.dirname(log_file):
+        os.makedirs(os.path.dirname(log_file), exist_ok=True)
+    formatter = JsonFormatter() if use_json else TextFormatter()
+    handlers = [
+        logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=settings.LOG_MAX_BYTES, backupCount=settings.LOG_BACKUP_COUNT, encoding="utf-8"
+        ),
+        logging.StreamHandler(sys.stdout),
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    root.setLevel(level)
+    if not use_async:
+        for handler in handlers:
+            root.addHandler(handler)
+        return None
+
+    log_queue = queue.SimpleQueue()
+    root.addHandler(DeferredQueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -0,0 +1,164 @@
+import threading
+from bisect import bisect_left
+
+from app.core.config import settings
+
+# Границы гистограмм задержки, секунды
+LATENCY_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+)
+# Границы гистограмм размера батча
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Монотонный счетчик; строка меток форматируется один раз при создании"""
+
+    def __init__(self, labels: dict = None):
+        self.labels = _format_labels(labels or {})
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        if not settings.METRICS_ENABLED:
+            return
+        with self._lock:
+            self.value += amount
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами; observe не выделяет память"""
+
+    def __init__(self, buckets: tuple, labels: dict = None):
+        self.buckets = buckets
+        self.labels = labels or {}
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+        # Готовые строки меток для каждой границы
+        prefix = "".join(f'{key}="{value}",' for key, value in self.labels.items())
+        self._bucket_labels = ["{" + prefix + f'le="{b}"' + "}" for b in buckets] + ["{" + prefix + 'le="+Inf"}']
+        self._plain_labels = _format_labels(self.labels)
+
+    def observe(self, value: float):
+        if not settings.METRICS_ENABLED:
+            return
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+
+class MetricFamily:
+    """Метрика с фиксированным набором меток, все дочерние серии создаются заранее"""
+
+    def __init__(self, name: str, kind: str, help_text: str):
+        self.name = name
+        self.kind = kind
+        self.help = help_text
+        self.series = []
+
+    def render(self, lines: list):
+        lines.append(f"# HELP {self.name} {self.help}")
+        lines.append(f"# TYPE {self.name} {self.kind}")
+        for series in self.series:
+            if isinstance(series, Histogram):
+                with series._lock:
+                    counts, total, count = list(series.counts), series.sum, series.count
+                cumulative = 0
+                for labels, bucket_count in zip(series._bucket_labels, counts):
+                    cumulative += bucket_count
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                lines.append(f"{self.name}_sum{series._plain_labels} {_format_value(total)}")
+                lines.append(f"{self.name}_count{series._plain_labels} {count}")
+            elif isinstance(series, Counter):
+                lines.append(f"{self.name}{series.labels} {series.value}")
+            else:
+                # Gauge: (строка меток, функция текущего значения)
+                labels, read = series
+                lines.append(f"{self.name}{labels} {_format_value(read())}")
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._families = {}
+
+    def _family(self, name: str, kind: str, help_text: str) -> MetricFamily:
+        family = self._families.get(name)
+        if family is None:
+            family = self._families[name] = MetricFamily(name, kind, help_text)
+        return family
+
+    def counter(self, name: str, help_text: str, labels: dict = None) -> Counter:
+        counter = Counter(labels)
+        self._family(name, "counter", help_text).series.append(counter)
+        return counter
+
+    def histogram(self, name: str, help_text: str, buckets: tuple = LATENCY_BUCKETS, labels: dict = None) -> Histogram:
+        histogram = Histogram(buckets, labels)
+        self._family(name, "histogram", help_text).series.append(histogram)
+        return histogram
+
+    def gauge(self, name: str, help_text: str, read, labels: dict = None):
+        """Gauge, значение которого читается функцией read в момент экспорта"""
+        self._family(name, "gauge", help_text).series.append((_format_labels(labels or {}), read))
+
+    def render(self) -> str:
+        """Текстовый формат Prometheus"""
+        lines = []
+        for family in self._families.values():
+            family.render(lines)
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def _stage(name: str) -> Histogram:
+    return registry.histogram(
+        "predictor_stage_seconds", "Время стадий обработки запроса предсказания", labels={"stage": name}
+    )
+
+
+# Стадии обработки запроса
+PARSE_SECONDS = _stage("parse")
+KINEMATIC_SECONDS = _stage("kinematic")
+NORMALIZE_SECONDS = _stage("normalize")
+FORWARD_SECONDS = _stage("forward")
+DENORMALIZE_SECONDS = _stage("denormalize")
+SERIALIZE_SECONDS = _stage("serialize")
+
+BATCH_SIZE = registry.histogram(
+    "predictor_batch_size", "Число окон в одном проходе модели", buckets=BATCH_BUCKETS
+)
+NEURAL_FALLBACKS = registry.counter(
+    "predictor_neural_fallbacks_total", "Ошибки нейросети с откатом на кинематику"
+)
+NEURAL_CALLS = registry.counter("predictor_neural_calls_total", "Запросов к нейросети")
+# Проходы GRU, пропущенные из-за срока запроса: очередь заведомо не успевала или не успела
+SHED_PREDICTED = registry.counter(
+    "predictor_shed_total", "Пропущенные по сроку проходы GRU", {"reason": "queue"}
+)
+SHED_TIMEOUT = registry.counter(
+    "predictor_shed_total", "Пропущенные по сроку проходы GRU", {"reason": "timeout"}
+)
+
+
+def endpoint_counters(endpoint: str):
+    """(requests, errors) счетчики для эндпоинта"""
+    requests = registry.counter("predictor_requests_total", "Число запросов", {"endpoint": endpoint})
+    errors = registry.counter("predictor_errors_total", "Число запросов с ошибкой 5xx", {"endpoint": endpoint})
+    return requests, errors
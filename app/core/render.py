@@ -0,0 +1,208 @@
+import asyncio
+import hashlib
+import io
+import json
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Номера точек подписываются только на коротких траекториях
+ANNOTATE_MAX_POINTS = 10
+
+
+def downsample(track: np.ndarray, max_points: int) -> np.ndarray:
+    """Не больше max_points точек трека (N, 3), равномерно по индексу; первая и последняя сохраняются"""
+    if max_points < 2 or len(track) <= max_points:
+        return track
+    return track[np.linspace(0, len(track) - 1, max_points).round().astype(np.int64)]
+
+
+def render_key(track: np.ndarray, prediction, **options) -> str:
+    """Ключ картинки по содержимому: трек, предсказание (массив или описание модели) и параметры"""
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(track, dtype="<f8").tobytes())
+    if isinstance(prediction, np.ndarray):
+        digest.update(b"\0prediction\0" + np.ascontiguousarray(prediction, dtype="<f8").tobytes())
+    else:
+        digest.update(b"\0model\0" + json.dumps(prediction, sort_keys=True).encode())
+    digest.update(b"\0" + json.dumps(options, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def render_png(track: np.ndarray, prediction: np.ndarray, title: str = None, dpi: int = 100,
+               max_points: int = 500) -> bytes:
+    """PNG с траекторией (N, 3) и предсказанием (horizon, 3): XY, X(t), Y(t) и время по шагам.
+
+    Тот же график, что в examples/visualize_prediction.py. Трек прореживается до max_points
+    точек, рисуется без pyplot (своя Figure), поэтому безопасен в потоках и процессах.
+    """
+    from matplotlib.figure import Figure
+
+    track = downsample(np.asarray(track, dtype=np.float64), max_points)
+    prediction = np.asarray(prediction, dtype=np.float64).reshape(-1, 3)
+    last = track[-1]
+    # Линия предсказания начинается от последней точки трека
+    path = np.vstack([last, prediction])
+    marker_size = 8 if len(track) <= 50 else 3
+
+    fig = Figure(figsize=(15, 10))
+    if title:
+        fig.suptitle(title)
+
+    # 2D график XY
+    ax1 = fig.add_subplot(221)
+    ax1.scatter(track[:, 0], track[:, 1], c='blue', s=marker_size ** 2 * 1.5, alpha=0.8, label='Входные точки', marker='o')
+    ax1.scatter(prediction[:, 0], prediction[:, 1], c='red', s=150, alpha=0.9, label='Предсказание', marker='^')
+    ax1.plot(track[:, 0], track[:, 1], 'b--', alpha=0.6, linewidth=2)
+    ax1.plot(path[:, 0], path[:, 1], 'r-', linewidth=3, alpha=0.8)
+    if len(track) <= ANNOTATE_MAX_POINTS:
+        for i, point in enumerate(track):
+            ax1.annotate(f'{i+1}', (point[0], point[1]), xytext=(5, 5), textcoords='offset points', fontsize=10)
+    ax1.annotate('PRED', (prediction[-1, 0], prediction[-1, 1]), xytext=(5, 5), textcoords='offset points',
+                 fontsize=10, color='red')
+    ax1.set_xlabel('X (м)')
+    ax1.set_ylabel('Y (м)')
+    ax1.set_title('Траектория XY')
+    ax1.grid(True, alpha=0.3)
+    ax1.legend()
+
+    # Координаты X и Y во времени
+    for position, axis, style, name in ((222, 0, 'bo-', 'X'), (223, 1, 'go-', 'Y')):
+        ax = fig.add_subplot(position)
+        ax.plot(track[:, 2], track[:, axis], style, linewidth=2, markersize=marker_size, label=f'{name} входные')
+        ax.plot(prediction[:, 2], prediction[:, axis], 'r^', markersize=12, label=f'{name} предсказание')
+        ax.plot(path[:, 2], path[:, axis], 'r--', alpha=0.7)
+        ax.set_xlabel('Время (с)')
+        ax.set_ylabel(f'{name} (м)')
+        ax.set_title(f'Координата {name} во времени')
+        ax.grid(True, alpha=0.3)
+        ax.legend()
+
+    # Временная последовательность
+    ax4 = fig.add_subplot(224)
+    steps = np.arange(len(track))
+    future = np.arange(len(track), len(track) + len(prediction))
+    ax4.plot(steps, track[:, 2], 'co-', linewidth=2, markersize=marker_size, label='T входные')
+    ax4.plot(future, prediction[:, 2], 'r^', markersize=12, label='T предсказание')
+    ax4.plot(np.concatenate([[steps[-1]], future]), path[:, 2], 'r--', alpha=0.7)
+    ax4.set_xlabel('Шаг')
+    ax4.set_ylabel('Время (с)')
+    ax4.set_title('Временная последовательность')
+    ax4.grid(True, alpha=0.3)
+    ax4.legend()
+
+    fig.tight_layout()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=dpi, bbox_inches='tight')
+    return buffer.getvalue()
+
+
+class ImageCache:
+    """LRU-кэш готовых картинок по ключу render_key, ограниченный суммарным размером в байтах"""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._data = OrderedDict()  # key -> png
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str):
+        with self._lock:
+            png = self._data.get(key)
+            if png is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return png
+
+    def put(self, key: str, png: bytes):
+        # Картинка больше всего кэша не сохраняется, чтобы не вытеснять все остальные
+        if len(png) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.nbytes -= len(old)
+            self._data[key] = png
+            self.nbytes += len(png)
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self.nbytes -= len(evicted)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class Renderer:
+    """Отрисовка в пуле процессов с кэшем картинок.
+
+    matplotlib держит GIL на все время отрисовки (~0.1-0.3 с на картинку), поэтому она
+    идет в отдельных процессах и не блокирует ни цикл событий, ни потоки инференса.
+    Пул создается при первой отрисовке (в воркере - уже после fork) через spawn: дочерние
+    процессы не наследуют потоки и блокировки сервиса. processes=0 - рисовать в потоке.
+    """
+
+    def __init__(self, processes: int = 2, cache: ImageCache = None):
+        self.processes = processes
+        self.cache = cache
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _executor(self):
+        if self.processes <= 0:
+            return None
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def cached(self, key: str):
+        return None if self.cache is None else self.cache.get(key)
+
+    async def render(self, key: str, track: np.ndarray, prediction: np.ndarray, store: bool = True, **options) -> bytes:
+        """Отрисовать PNG в пуле и положить в кэш под ключом key (store=False - не класть)"""
+        pool = self._executor()
+        if pool is None:
+            png = await asyncio.to_thread(render_png, track, prediction, **options)
+        else:
+            png = await asyncio.wrap_future(pool.submit(render_png, track, prediction, **options))
+        if store and self.cache is not None:
+            self.cache.put(key, png)
+        return png
+
+    def render_many(self, items, **options):
+        """(key, png) для [(key, track, prediction[, свои параметры]), ...] в порядке items.
+
+        Параметры элемента (например, подпись) дополняют общие options.
+        """
+        jobs = [(item[0], item[1], item[2], dict(options, **(item[3] if len(item) > 3 else {}))) for item in items]
+        pool = self._executor()
+        if pool is None:
+            pngs = (render_png(track, prediction, **kwargs) for _, track, prediction, kwargs in jobs)
+        else:
+            futures = [pool.submit(render_png, track, prediction, **kwargs) for _, track, prediction, kwargs in jobs]
+            pngs = (future.result() for future in futures)
+        for (key, _, _, _), png in zip(jobs, pngs):
+            yield key, png
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
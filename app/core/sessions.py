@@ -0,0 +1,175 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.kinematics import kinematic_predict
+from app.core.tracker import KalmanBank
+from app.core.utils import normalize, denormalize, blend
+
+
+class StreamSessions:
+    """Состояние потоковых сессий: одна сессия на дрон.
+
+    Все сессии хранятся в общих предвыделенных массивах (слот на дрон):
+    скользящее окно последних точек и состояния энкодера gru1.
+
+    Чтобы предсказание совпадало с предсказанием по окну из window точек,
+    у каждой сессии window "смещенных" состояний энкодера: состояние s
+    сбрасывается в ноль, когда номер точки n % window == s, и после window
+    шагов содержит кодировку ровно последних window точек. Каждая новая точка
+    продвигает все состояния всех дронов тика одним батчевым шагом GRU.
+
+    При KINEMATIC_MODEL=kalman кинематическую часть дает фильтр Калмана сессии,
+    который видит всю историю дрона, а не только окно.
+    """
+
+    def __init__(self, predictor, max_sessions: int = 4096, idle_timeout_s: float = 300.0, window: int = 5):
+        self.predictor = predictor
+        self.max_sessions = max_sessions
+        self.idle_timeout_s = idle_timeout_s
+        self.window = window
+        self._lock = threading.Lock()
+        self._slots = OrderedDict()  # drone_id -> индекс слота, порядок LRU
+        self._free = list(range(max_sessions - 1, -1, -1))
+        self._last_expire = 0.0
+        self.evicted = 0
+        self.expired = 0
+
+        self.points = np.zeros((max_sessions, window, 3), dtype=np.float64)
+        self.counts = np.zeros(max_sessions, dtype=np.int64)
+        self.last_seen = np.zeros(max_sessions, dtype=np.float64)
+        self.kalman = None
+        if settings.KINEMATIC_MODEL == "kalman":
+            self.kalman = KalmanBank(max_sessions, settings.KALMAN_PROCESS_NOISE, settings.KALMAN_MEASUREMENT_NOISE)
+        # Ансамбль не умеет продвигать состояние энкодера по точке - только кинематика
+        if predictor is not None and not hasattr(predictor, "encode"):
+            predictor = self.predictor = None
+        if predictor is not None:
+            shape = (max_sessions, predictor.num_layers, window, predictor.hidden_dim)
+            self.hidden = np.zeros(shape, dtype=np.float32)
+        else:
+            self.hidden = None
+
+    def __len__(self):
+        return len(self._slots)
+
+    def update(self, drone_ids, points: np.ndarray):
+        """Добавить по одной новой точке (x, y, t) для каждого дрона.
+
+        Возвращает (predictions (batch_size, 3), counts (batch_size,)).
+        Пока окно не заполнено, строка предсказания заполнена NaN.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+
+            # Повторные точки одного дрона в тике обрабатываются по очереди
+            if len(set(drone_ids)) != len(drone_ids):
+                predictions = np.empty((len(drone_ids), 3))
+                counts = np.empty(len(drone_ids), dtype=np.int64)
+                for i, drone_id in enumerate(drone_ids):
+                    predictions[i:i + 1], counts[i:i + 1] = self._step(np.array([self._acquire(drone_id, now)]), points[i:i + 1])
+                return predictions, counts
+
+            slots = np.array([self._acquire(drone_id, now) for drone_id in drone_ids], dtype=np.int64)
+            return self._step(slots, points)
+
+    def close(self, drone_id):
+        """Удалить сессию дрона"""
+        with self._lock:
+            slot = self._slots.pop(drone_id, None)
+            if slot is not None:
+                self._free.append(slot)
+
+    def stats(self) -> dict:
+        nbytes = self.points.nbytes + self.counts.nbytes + self.last_seen.nbytes
+        if self.kalman is not None:
+            nbytes += self.kalman.nbytes
+        if self.hidden is not None:
+            nbytes += self.hidden.nbytes
+        return {
+            "active": len(self._slots),
+            "capacity": self.max_sessions,
+            "memory_bytes": nbytes,
+            "evicted": self.evicted,
+            "expired": self.expired,
+        }
+
+    def _acquire(self, drone_id, now: float) -> int:
+        slot = self._slots.get(drone_id)
+        if slot is not None:
+            self._slots.move_to_end(drone_id)
+        else:
+            if not self._free:
+                # Вытесняем самую давно неактивную сессию
+                _, old = self._slots.popitem(last=False)
+                self._free.append(old)
+                self.evicted += 1
+            slot = self._free.pop()
+            self._slots[drone_id] = slot
+            self.counts[slot] = 0
+        self.last_seen[slot] = now
+        return slot
+
+    def _expire(self, now: float):
+        # Проверяем простаивающие сессии не чаще раза в секунду
+        if now - self._last_expire < 1.0:
+            return
+        self._last_expire = now
+        deadline = now - self.idle_timeout_s
+        stale = [drone_id for drone_id, slot in self._slots.items() if self.last_seen[slot] < deadline]
+        for drone_id in stale:
+            self._free.append(self._slots.pop(drone_id))
+        self.expired += len(stale)
+
+    def _step(self, slots: np.ndarray, points: np.ndarray):
+        window = self.window
+        seen = self.counts[slots]  # сколько точек было до этой
+
+        # Сдвигаем скользящее окно и дописываем новую точку
+        self.points[slots, :-1] = self.points[slots, 1:]
+        self.points[slots, -1] = points
+        self.counts[slots] = seen + 1
+        if self.kalman is not None:
+            # Новая сессия в слоте начинает фильтр заново
+            self.kalman.reset(slots[seen == 0])
+            self.kalman.update(slots, points)
+
+        if self.hidden is not None:
+            # Сбрасываем состояние, которое начинается с этой точки
+            self.hidden[slots, :, seen % window] = 0.0
+
+            # Один шаг энкодера для всех смещенных состояний всех дронов тика
+            batch = len(slots)
+            layers, hidden_dim = self.predictor.num_layers, self.predictor.hidden_dim
+            h = self.hidden[slots].transpose(1, 0, 2, 3).reshape(layers, batch * window, hidden_dim)
+            x = np.repeat(normalize(points).astype(np.float32), window, axis=0)[:, None, :]
+            h = self.predictor.encode(x, np.ascontiguousarray(h))
+            self.hidden[slots] = h.reshape(layers, batch, window, hidden_dim).transpose(1, 0, 2, 3)
+
+        predictions = np.full((len(slots), 3), np.nan)
+        ready = seen + 1 >= window
+        if not ready.any():
+            return predictions, seen + 1
+
+        ready_slots = slots[ready]
+        if self.kalman is not None:
+            kinematic = self.kalman.predict(ready_slots)
+        else:
+            kinematic = kinematic_predict(self.points[ready_slots])
+        if self.hidden is None:
+            predictions[ready] = kinematic
+            return predictions, seen + 1
+
+        # Полное окно закодировано в состоянии, начатом window - 1 точек назад
+        full = (seen[ready] + 1) % window
+        h_full = np.ascontiguousarray(self.hidden[ready_slots, :, full].transpose(1, 0, 2))
+        neural = denormalize(self.predictor.decode(h_full)[:, -1])
+
+        valid = np.isfinite(neural).all(axis=1, keepdims=True)
+        predictions[ready] = np.where(valid, blend(kinematic, neural, self.points[ready_slots]), kinematic)
+        return predictions, seen + 1
@@ -0,0 +1,177 @@
+import numpy as np
+
+# Начальная неопределенность скорости и ускорения нового дрона
+_INITIAL_VELOCITY_VAR = 1e4
+_INITIAL_ACCELERATION_VAR = 1e4
+
+
+class KalmanBank:
+    """Банк фильтров Калмана с постоянным ускорением, по фильтру на слот.
+
+    Состояние хранится в общих массивах (struct-of-arrays): для каждого слота
+    (позиция, скорость, ускорение) по осям X и Y и общая для обеих осей ковариация 3x3 -
+    оси независимы, а шумы одинаковы, поэтому ковариации осей совпадают.
+    Время t - ось измерений: шаг фильтра использует фактический интервал между точками.
+    """
+
+    def __init__(self, capacity: int, process_noise: float = 1.0, measurement_noise: float = 0.5):
+        self.process_noise = process_noise
+        self.measurement_var = measurement_noise ** 2
+        self.state = np.zeros((capacity, 2, 3))  # (слот, ось, [p, v, a])
+        self.cov = np.zeros((capacity, 3, 3))
+        self.last_t = np.zeros(capacity)
+        self.last_dt = np.zeros(capacity)
+        self.initialized = np.zeros(capacity, dtype=bool)
+
+    @property
+    def capacity(self) -> int:
+        return len(self.state)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.state, self.cov, self.last_t, self.last_dt, self.initialized))
+
+    def resize(self, capacity: int):
+        """Увеличить число слотов (состояние существующих слотов сохраняется)"""
+        for name in ("state", "cov", "last_t", "last_dt", "initialized"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def reset(self, slots: np.ndarray):
+        """Освободить слоты: следующая точка инициализирует фильтр заново"""
+        self.initialized[slots] = False
+
+    def update(self, slots: np.ndarray, points: np.ndarray):
+        """Один батчевый шаг predict/update для слотов с новыми точками (x, y, t).
+
+        Слоты в одном вызове должны быть различны.
+        """
+        slots = np.asarray(slots, dtype=np.int64)
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        fresh = ~self.initialized[slots]
+        if fresh.any():
+            self._init(slots[fresh], points[fresh])
+        old = ~fresh
+        if not old.any():
+            return
+        slots, points = slots[old], points[old]
+
+        # Прогноз на фактический интервал; неположительный интервал - без прогноза
+        dt = np.maximum(points[:, 2] - self.last_t[slots], 0.0)
+        F = _transition(dt)
+        state = np.einsum("nij,naj->nai", F, self.state[slots])
+        cov = F @ self.cov[slots] @ F.transpose(0, 2, 1) + self.process_noise * _process_cov(dt)
+
+        # Коррекция по измеренной позиции (H = [1, 0, 0])
+        s = cov[:, 0, 0] + self.measurement_var
+        gain = cov[:, :, 0] / s[:, None]  # (n, 3)
+        innovation = points[:, :2] - state[:, :, 0]  # (n, 2)
+        state += gain[:, None, :] * innovation[:, :, None]
+        cov -= gain[:, :, None] * cov[:, None, 0, :]
+
+        self.state[slots] = state
+        self.cov[slots] = cov
+        self.last_dt[slots] = np.where(dt > 0, dt, self.last_dt[slots])
+        self.last_t[slots] = points[:, 2]
+
+    def predict(self, slots: np.ndarray, horizon: int = None) -> np.ndarray:
+        """Экстраполяция на следующую точку через последний интервал времени.
+
+        (n, 3) или (n, horizon, 3) при заданном horizon.
+        """
+        slots = np.asarray(slots, dtype=np.int64)
+        steps = np.arange(1, (horizon or 1) + 1, dtype=np.float64)
+        dt = self.last_dt[slots, None] * steps  # (n, horizon)
+        state = self.state[slots]  # (n, 2, 3)
+        p, v, a = state[:, None, :, 0], state[:, None, :, 1], state[:, None, :, 2]
+        xy = p + v * dt[..., None] + 0.5 * a * dt[..., None] ** 2
+        t = self.last_t[slots, None] + dt
+        out = np.concatenate([xy, t[..., None]], axis=-1)
+        return out if horizon else out[:, 0]
+
+    def _init(self, slots: np.ndarray, points: np.ndarray):
+        self.state[slots] = 0.0
+        self.state[slots, :, 0] = points[:, :2]
+        self.cov[slots] = np.diag([self.measurement_var, _INITIAL_VELOCITY_VAR, _INITIAL_ACCELERATION_VAR])
+        self.last_t[slots] = points[:, 2]
+        self.last_dt[slots] = 0.0
+        self.initialized[slots] = True
+
+
+def _transition(dt: np.ndarray) -> np.ndarray:
+    F = np.zeros((len(dt), 3, 3))
+    F[:, 0, 0] = F[:, 1, 1] = F[:, 2, 2] = 1.0
+    F[:, 0, 1] = F[:, 1, 2] = dt
+    F[:, 0, 2] = 0.5 * dt ** 2
+    return F
+
+
+def _process_cov(dt: np.ndarray) -> np.ndarray:
+    # Белый шум рывка (производной ускорения) с единичной интенсивностью
+    d2, d3, d4, d5 = dt ** 2, dt ** 3, dt ** 4, dt ** 5
+    Q = np.empty((len(dt), 3, 3))
+    Q[:, 0, 0] = d5 / 20
+    Q[:, 0, 1] = Q[:, 1, 0] = d4 / 8
+    Q[:, 0, 2] = Q[:, 2, 0] = d3 / 6
+    Q[:, 1, 1] = d3 / 3
+    Q[:, 1, 2] = Q[:, 2, 1] = d2 / 2
+    Q[:, 2, 2] = dt
+    return Q
+
+
+class FleetTracker:
+    """Трекер флота: drone_id -> слот банка фильтров.
+
+    Слоты освобождаются и переиспользуются без выделения памяти на дрон; при
+    заполнении банк увеличивается вдвое.
+    """
+
+    def __init__(self, capacity: int = 1024, process_noise: float = 1.0, measurement_noise: float = 0.5):
+        self.bank = KalmanBank(capacity, process_noise, measurement_noise)
+        self._slots = {}
+        self._free = list(range(capacity - 1, -1, -1))
+
+    def __len__(self):
+        return len(self._slots)
+
+    def update(self, drone_ids, points: np.ndarray) -> np.ndarray:
+        """Добавить по точке (x, y, t) для дронов тика; возвращает предсказания (batch_size, 3)"""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        if len(set(drone_ids)) != len(drone_ids):
+            # Повторные точки одного дрона в тике - по очереди
+            return np.concatenate([self.update([d], points[i:i + 1]) for i, d in enumerate(drone_ids)])
+        slots = np.array([self._acquire(drone_id) for drone_id in drone_ids], dtype=np.int64)
+        self.bank.update(slots, points)
+        return self.bank.predict(slots)
+
+    def remove(self, drone_id):
+        slot = self._slots.pop(drone_id, None)
+        if slot is not None:
+            self.bank.reset([slot])
+            self._free.append(slot)
+
+    def _acquire(self, drone_id) -> int:
+        slot = self._slots.get(drone_id)
+        if slot is None:
+            if not self._free:
+                capacity = self.bank.capacity
+                self.bank.resize(2 * capacity)
+                self._free = list(range(2 * capacity - 1, capacity - 1, -1))
+            slot = self._slots[drone_id] = self._free.pop()
+        return slot
+
+
+def kalman_predict(windows: np.ndarray, horizon: int = None, process_noise: float = 1.0,
+                   measurement_noise: float = 0.5) -> np.ndarray:
+    """Фильтр Калмана по каждому окну (batch_size, seq_len, 3) и экстраполяция.
+
+    (batch_size, 3) или (batch_size, horizon, 3) при заданном horizon.
+    """
+    windows = np.asarray(windows, dtype=np.float64)
+    bank = KalmanBank(len(windows), process_noise, measurement_noise)
+    slots = np.arange(len(windows))
+    for step in range(windows.shape[1]):
+        bank.update(slots, windows[:, step])
+    return bank.predict(slots, horizon)
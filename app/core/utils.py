@@ -1,5 +1,6 @@
 import numpy as np
 from app.core.config import settings
+from app.core.kinematics import window_speed
 
 def normalize(arr: np.ndarray) -> np.ndarray:
     """Нормализация массива (batch_size, seq_len, features) или (seq_len, features)"""
@@ -12,3 +13,23 @@ def denormalize(arr: np.ndarray) -> np.ndarray:
     mean = settings.mean_array
     std = settings.std_array
     return arr * std + mean
+
+def kinematic_weight(windows: np.ndarray = None, ndim: int = 2):
+    """Вес кинематики: общий или по режиму скорости каждого окна.
+
+    По окнам (batch_size, seq_len, 3) возвращает веса формы (batch_size, 1, ...) с ndim осями,
+    чтобы они транслировались на предсказания (batch_size, 3) или (batch_size, horizon, 3).
+    """
+    bins = settings.BLEND_SPEED_BINS
+    if windows is None or not bins:
+        return settings.KINEMATIC_WEIGHT
+    weights = np.asarray(settings.BLEND_SPEED_WEIGHTS)[np.searchsorted(bins, window_speed(windows))]
+    return weights.reshape((-1,) + (1,) * (ndim - 1))
+
+def blend(kinematic: np.ndarray, neural: np.ndarray, windows: np.ndarray = None) -> np.ndarray:
+    """Взвешенное объединение кинематического и нейросетевого предсказаний.
+
+    windows - входные окна; нужны, если веса заданы по режимам скорости (BLEND_SPEED_BINS).
+    """
+    weight = kinematic_weight(windows, np.ndim(kinematic))
+    return weight * kinematic + (1.0 - weight) * neural
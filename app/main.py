@@ -1,20 +1,18 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 import logging
-import sys
 
-from app.api.predict import router as predict_router
+from app.api.predict import router as predict_router, scheduler, cache
+from app.api.stream import router as stream_router
+from app.api.conflicts import router as conflicts_router
+from app.api.render import router as render_router, renderer
 from app.core.config import settings
+from app.core.logs import setup_logging
+from app.core import metrics
 
-# Настройка логирования
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler("logs/app.log"),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+# Настройка логирования: запись в файл и stdout выполняет фоновый поток
+log_listener = setup_logging()
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +34,9 @@ app.add_middleware(
 )
 
 app.include_router(predict_router, prefix="/predict", tags=["predict"])
+app.include_router(stream_router, prefix="/predict", tags=["stream"])
+app.include_router(conflicts_router, prefix="/predict", tags=["conflicts"])
+app.include_router(render_router, prefix="/predict", tags=["render"])
 
 @app.on_event("startup")
 async def startup_event():
@@ -44,6 +45,18 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Остановка сервиса")
+    if scheduler is not None:
+        scheduler.close()
+    renderer.close()
+    if log_listener is not None:
+        log_listener.stop()
+
+def reinit_worker():
+    """Перезапустить фоновые потоки (запись логов, планировщик) в воркере после fork"""
+    global log_listener
+    log_listener = setup_logging(force=True)
+    if scheduler is not None:
+        scheduler.restart()
 
 @app.get("/")
 async def root():
@@ -52,3 +65,20 @@ async def root():
         "version": settings.VERSION,
         "docs": "/docs"
     }
+
+# Состояние планировщика и кэша читается в момент экспорта метрик
+if scheduler is not None:
+    metrics.registry.gauge("predictor_scheduler_queue_depth", "Окон в очереди планировщика",
+                           lambda: scheduler.stats()["queue_depth"])
+if cache is not None:
+    metrics.registry.gauge("predictor_cache_hits", "Попадания в кэш предсказаний", lambda: cache.hits)
+    metrics.registry.gauge("predictor_cache_misses", "Промахи кэша предсказаний", lambda: cache.misses)
+if renderer.cache is not None:
+    metrics.registry.gauge("predictor_render_cache_hits", "Попадания в кэш картинок", lambda: renderer.cache.hits)
+    metrics.registry.gauge("predictor_render_cache_misses", "Промахи кэша картинок", lambda: renderer.cache.misses)
+    metrics.registry.gauge("predictor_render_cache_bytes", "Размер кэша картинок в байтах", lambda: renderer.cache.nbytes)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    """Метрики в текстовом формате Prometheus"""
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,159 @@
+import threading
+from math import prod
+
+import numpy as np
+
+
+def _fold_layer(arrays: dict, prefix: str, layer: int, hidden: int):
+    """Веса слоя GRU, подготовленные к инференсу: (w_ih, w_hh, b_i, b_hn).
+
+    Матрицы транспонированы (x @ W). Смещения b_ih и b_hh гейтов r, z сложены в b_i,
+    у гейта n в b_i остается b_ih, а b_hh идет отдельно (b_hn) - он стоит под множителем r.
+    Столбцы r, z умножены на 1/2: sigmoid(a) = 0.5 + 0.5 * tanh(a / 2), и множитель
+    внутри tanh уже учтен в весах (умножение на степень двойки точное).
+    """
+    w_ih = arrays[f"{prefix}.weight_ih_l{layer}"].T.astype(np.float32)
+    w_hh = arrays[f"{prefix}.weight_hh_l{layer}"].T.astype(np.float32)
+    b_ih = arrays[f"{prefix}.bias_ih_l{layer}"].astype(np.float32)
+    b_hh = arrays[f"{prefix}.bias_hh_l{layer}"].astype(np.float32)
+    b_i = b_ih.copy()
+    b_i[:2 * hidden] += b_hh[:2 * hidden]
+    for w in (w_ih, w_hh, b_i):
+        w[..., :2 * hidden] *= 0.5
+    return np.ascontiguousarray(w_ih), np.ascontiguousarray(w_hh), b_i, b_hh[2 * hidden:].copy()
+
+
+def _run_layer(gi: np.ndarray, h: np.ndarray, out: np.ndarray, w_hh: np.ndarray, b_hn: np.ndarray,
+               gh: np.ndarray, rz: np.ndarray, n: np.ndarray):
+    """Шаги одного слоя GRU без выделения памяти.
+
+    gi - входная проекция (batch_size, seq_len, 3H) или (3H,) при нулевом входе,
+    h - начальное состояние (batch_size, H) (не изменяется), out - (batch_size, seq_len, H),
+    gh, rz, n - рабочие буферы (batch_size, 3H), (batch_size, 2H), (batch_size, H).
+    """
+    hidden = n.shape[1]
+    for step in range(out.shape[1]):
+        g = gi if gi.ndim == 1 else gi[:, step]
+        np.matmul(h, w_hh, out=gh)
+        np.add(g[..., :2 * hidden], gh[:, :2 * hidden], out=rz)
+        np.tanh(rz, out=rz)
+        rz *= 0.5
+        rz += 0.5  # r, z = sigmoid
+        gh_n = gh[:, 2 * hidden:]
+        gh_n += b_hn
+        np.multiply(rz[:, :hidden], gh_n, out=n)
+        n += g[..., 2 * hidden:]
+        np.tanh(n, out=n)
+        # h' = (1 - z) * n + z * h = n + z * (h - n), сразу в выход шага
+        h_next = out[:, step]
+        np.subtract(h, n, out=h_next)
+        h_next *= rz[:, hidden:]
+        h_next += n
+        h = h_next
+
+
+class InferenceEngine:
+    """Инференс TrajectoryPredictor на NumPy без выделений памяти внутри прохода.
+
+    Интерфейс бэкенда (forward/encode/decode, нормализованные координаты). Константы
+    сложены в веса при загрузке (см. _fold_layer); вход первого слоя декодера нулевой,
+    поэтому его входная проекция - готовое смещение. Промежуточные буферы берутся из рабочей
+    области своего потока, которая растет до самого большого батча и дальше переиспользуется;
+    на вызов выделяется только возвращаемый массив.
+    """
+    name = "engine"
+
+    def __init__(self, arrays: dict):
+        self.hidden_dim = arrays["gru1.weight_hh_l0"].shape[1]
+        self.encoder = self._layers(arrays, "gru1")
+        self.decoder = self._layers(arrays, "gru2")
+        self.num_layers = len(self.encoder)
+        self.fc_weight = np.ascontiguousarray(arrays["fc.weight"].T, dtype=np.float32)
+        self.fc_bias = arrays["fc.bias"].astype(np.float32)
+        self._local = threading.local()
+
+    def _layers(self, arrays: dict, prefix: str) -> list:
+        count = sum(1 for name in arrays if name.startswith(f"{prefix}.weight_ih_l"))
+        return [_fold_layer(arrays, prefix, layer, self.hidden_dim) for layer in range(count)]
+
+    @property
+    def nbytes(self) -> int:
+        arrays = [self.fc_weight, self.fc_bias] + [a for layer in self.encoder + self.decoder for a in layer]
+        return sum(a.nbytes for a in arrays)
+
+    def _workspace(self, batch_size: int, seq_len: int, steps: int, features: int = 0) -> list:
+        """Буферы одного прохода из рабочей области текущего потока.
+
+        (gi, gh, rz, n, first, second, states, inp): gi, first, second - плоские, под
+        наибольшую из длин seq_len и steps; states - (num_layers, batch_size, H), inp - вход float32.
+        """
+        hidden, length = self.hidden_dim, max(seq_len, steps)
+        shapes = [
+            (batch_size * length * 3 * hidden,), (batch_size, 3 * hidden), (batch_size, 2 * hidden),
+            (batch_size, hidden), (batch_size * length * hidden,), (batch_size * length * hidden,),
+            (self.num_layers, batch_size, hidden), (batch_size, seq_len, features),
+        ]
+        sizes = [prod(shape) for shape in shapes]
+        arena = getattr(self._local, "arena", None)
+        if arena is None or arena.size < sum(sizes):
+            arena = self._local.arena = np.empty(max(sum(sizes), 2 * (0 if arena is None else arena.size)), np.float32)
+        buffers, offset = [], 0
+        for shape, size in zip(shapes, sizes):
+            buffers.append(arena[offset:offset + size].reshape(shape))
+            offset += size
+        return buffers
+
+    def _run(self, layers: list, x, steps: int, workspace: list) -> np.ndarray:
+        """Слои GRU подряд; x=None - нулевой вход длины steps.
+
+        Начальные состояния слоев берутся из states рабочей области, туда же пишутся итоговые.
+        Возвращает выход последнего слоя (вид на рабочую область).
+        """
+        gi, gh, rz, n, first, second, states, _ = workspace
+        batch_size, hidden = states.shape[1], self.hidden_dim
+        for layer, (w_ih, w_hh, b_i, b_hn) in enumerate(layers):
+            if x is None:
+                projection = b_i
+            else:
+                projection = gi[:batch_size * steps * 3 * hidden].reshape(batch_size, steps, 3 * hidden)
+                np.matmul(x, w_ih, out=projection)
+                projection += b_i
+            out = (first if layer % 2 == 0 else second)[:batch_size * steps * hidden].reshape(batch_size, steps, hidden)
+            _run_layer(projection, states[layer], out, w_hh, b_hn, gh, rz, n)
+            # Начальное состояние слоя больше не нужно - на его место итоговое
+            np.copyto(states[layer], out[:, -1])
+            x = out
+        return x
+
+    def _encode(self, x: np.ndarray, h0: np.ndarray, workspace: list):
+        states, inp = workspace[6], workspace[7]
+        np.copyto(inp, x)
+        if h0 is None:
+            states.fill(0.0)
+        else:
+            np.copyto(states, h0)
+        self._run(self.encoder, inp, x.shape[1], workspace)
+
+    def _decode(self, steps: int, workspace: list) -> np.ndarray:
+        out = self._run(self.decoder, None, steps, workspace)
+        result = out @ self.fc_weight
+        result += self.fc_bias
+        return result
+
+    def forward(self, x: np.ndarray, steps: int = 10) -> np.ndarray:
+        # x: (batch_size,seq_len,3) -> (batch_size, steps, 3)
+        workspace = self._workspace(x.shape[0], x.shape[1], steps, x.shape[2])
+        self._encode(x, None, workspace)
+        return self._decode(steps, workspace)
+
+    def encode(self, x: np.ndarray, h0: np.ndarray = None) -> np.ndarray:
+        # x: (batch_size,seq_len,3), h0: (num_layers,batch_size,hidden) -> encoder state of the same shape
+        workspace = self._workspace(x.shape[0], x.shape[1], 0, x.shape[2])
+        self._encode(x, h0, workspace)
+        return workspace[6].copy()
+
+    def decode(self, h: np.ndarray, steps: int = 10) -> np.ndarray:
+        # h: (num_layers,batch_size,hidden) -> decoded steps (batch_size, steps, 3)
+        workspace = self._workspace(h.shape[1], 0, steps)
+        np.copyto(workspace[6], h)
+        return self._decode(steps, workspace)
@@ -0,0 +1,178 @@
+import logging
+
+import numpy as np
+
+from app.core.config import settings
+from app.models.numpy_backend import load_arrays, read_architecture
+from app.models.predictor import load_backend
+
+logger = logging.getLogger(__name__)
+
+# Число гейтов в весах GRU PyTorch (reset, update, new) и в Linear
+_GRU_GATES = 3
+
+
+def _block_diagonal(tensors, gates: int) -> np.ndarray:
+    """Веса M моделей -> один блочно-диагональный массив с сохранением раскладки гейтов.
+
+    Матрица (gates * H, I) каждой модели попадает в строки своего блока внутри каждого
+    гейта и в свои столбцы входа; смещение (gates * H,) - в свой отрезок каждого гейта.
+    """
+    tensors = [np.asarray(t, dtype=np.float32) for t in tensors]
+    count = len(tensors)
+    rows = tensors[0].shape[0] // gates
+    if tensors[0].ndim == 1:
+        return np.concatenate([t[g * rows:(g + 1) * rows] for g in range(gates) for t in tensors])
+    cols = tensors[0].shape[1]
+    fused = np.zeros((gates * count * rows, count * cols), dtype=np.float32)
+    for g in range(gates):
+        for m, t in enumerate(tensors):
+            top = g * count * rows + m * rows
+            fused[top:top + rows, m * cols:(m + 1) * cols] = t[g * rows:(g + 1) * rows]
+    return fused
+
+
+def fuse_state_dicts(states: list) -> dict:
+    """Веса (NumPy) одного TrajectoryPredictor, который считает M моделей одинаковой формы сразу.
+
+    Вход, скрытое состояние и выход объединенной модели - конкатенация по моделям, а веса
+    блочно-диагональные, поэтому модели не влияют друг на друга и идут одним проходом GRU.
+    """
+    shapes = {read_architecture(state) for state in states}
+    if len(shapes) != 1:
+        raise ValueError(f"Модели ансамбля должны иметь одинаковые размеры, получено {sorted(shapes)}")
+    return {
+        name: _block_diagonal([state[name] for state in states], 1 if name.startswith("fc.") else _GRU_GATES)
+        for name in states[0]
+    }
+
+
+def velocities(x: np.ndarray) -> np.ndarray:
+    """Вход моделей скоростей: производная окна по шагам (batch_size, seq_len, 3)"""
+    return np.gradient(x, axis=1).astype(np.float32)
+
+
+def integrate(x: np.ndarray, steps: np.ndarray) -> np.ndarray:
+    """Смещения за шаг (batch_size, horizon, 3) модели скоростей -> позиции от последней точки окна x"""
+    return x[:, -1, None] + np.cumsum(steps, axis=1)
+
+
+class VelocityPredictor:
+    """Отдельная модель скоростей (vel_*) с интерфейсом Predictor позиций.
+
+    На вход модели идут скорости окна, ее выход - смещения за шаг, которые переводятся
+    в позиции так же, как в ансамбле. Потоковые сессии, как и ансамбль, не поддерживает.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.num_layers = backend.num_layers
+        self.hidden_dim = backend.hidden_dim
+
+    @property
+    def nbytes(self) -> int:
+        return getattr(self.backend, "nbytes", 0)
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        return self.predict_sequence(x)[:, -1]
+
+    def predict_sequence(self, x: np.ndarray, horizon: int = 10) -> np.ndarray:
+        x = np.asarray(x, dtype=np.float32)
+        return integrate(x, self.backend.forward(velocities(x), horizon))
+
+
+class EnsemblePredictor:
+    """Взвешенный ансамбль моделей позиций и скоростей с интерфейсом Predictor.
+
+    Небольшие батчи (до fused_max_batch окон) идут одним проходом объединенной
+    блочно-диагональной модели: на малых батчах проход ограничен накладными расходами,
+    а не вычислениями, поэтому он заметно дешевле двух проходов подряд. Большие батчи считаются
+    моделями по отдельности - там лишние нулевые блоки дороже второго прохода.
+    Модели скоростей предсказывают смещения за шаг, они переводятся в позиции
+    накопленной суммой от последней точки окна. Потоковые сессии ансамбль не поддерживает.
+    """
+
+    def __init__(self, fused, members: list, kinds: list, weights, fused_max_batch: int = 8):
+        self.fused = fused
+        self.members = members
+        self.kinds = kinds
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.fused_max_batch = fused_max_batch
+        self.num_layers = members[0].num_layers
+        self.hidden_dim = members[0].hidden_dim
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(backend, "nbytes", 0) for backend in [self.fused] + self.members)
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        # Как Predictor.predict: последний шаг декодера
+        return self.predict_sequence(x)[:, -1]
+
+    def predict_sequence(self, x: np.ndarray, horizon: int = 10) -> np.ndarray:
+        x = np.asarray(x, dtype=np.float32)
+        inputs = [x if kind == "pos" else velocities(x) for kind in self.kinds]
+        if len(x) <= self.fused_max_batch:
+            out = self.fused.forward(np.concatenate(inputs, axis=-1), horizon)
+            out = out.reshape(len(x), horizon, len(self.members), 3)
+        else:
+            out = np.stack([member.forward(inp, horizon) for member, inp in zip(self.members, inputs)], axis=2)
+        for m, kind in enumerate(self.kinds):
+            if kind == "vel":
+                out[:, :, m] = integrate(x, out[:, :, m])
+        return np.einsum("bhmc,m->bhc", out, self.weights)
+
+
+def _member_arrays(model_path: str) -> dict:
+    """Веса модели ансамбля массивами NumPy: для numpy/engine - из .npz, без импорта torch"""
+    if settings.BACKEND in ("numpy", "engine"):
+        return load_arrays(model_path)
+    from app.models.torch_backend import load_state
+    return {name: tensor.numpy() for name, tensor in load_state(model_path).items()}
+
+
+def _fused_backend(arrays: dict, num_layers: int, hidden_dim: int):
+    if settings.BACKEND == "numpy":
+        from app.models.numpy_backend import NumpyBackend
+        return NumpyBackend(arrays)
+    if settings.BACKEND == "engine":
+        from app.models.engine import InferenceEngine
+        return InferenceEngine(arrays)
+
+    import torch
+    from app.models.network import TrajectoryPredictor
+    from app.models.torch_backend import TorchBackend, script_model
+
+    model = TrajectoryPredictor(
+        input_dim=arrays["gru1.weight_ih_l0"].shape[1],
+        hidden_dim=hidden_dim,
+        output_dim=arrays["fc.weight"].shape[0],
+        num_layers=num_layers,
+    )
+    model.load_state_dict({name: torch.from_numpy(array) for name, array in arrays.items()})
+    model.eval()
+    if settings.BACKEND == "torchscript":
+        return TorchBackend(script_model(model), num_layers, hidden_dim, "torchscript")
+    if settings.BACKEND != "torch":
+        logger.info(f"Объединенная модель ансамбля считается eager torch (бэкенд {settings.BACKEND} не поддерживается)")
+    return TorchBackend(model)
+
+
+def load_ensemble(members: list, weights: list = None, fused_max_batch: int = 8) -> EnsemblePredictor:
+    """Загрузить ансамбль из [(kind, model_path), ...], kind - pos или vel.
+
+    weights - веса моделей (нормируются к сумме 1); пустые - поровну.
+    """
+    kinds = [kind for kind, _ in members]
+    if not weights:
+        weights = [1.0] * len(members)
+    if len(weights) != len(members):
+        raise ValueError(f"Весов ансамбля {len(weights)}, а моделей {len(members)}")
+    weights = np.asarray(weights, dtype=np.float64)
+    weights = weights / weights.sum()
+
+    states = [_member_arrays(path) for _, path in members]
+    hidden_dim, num_layers = read_architecture(states[0])
+    fused = _fused_backend(fuse_state_dicts(states), num_layers, len(states) * hidden_dim)
+    backends = [load_backend(settings.BACKEND, path) for _, path in members]
+    return EnsemblePredictor(fused, backends, kinds, weights, fused_max_batch)
@@ -1,5 +1,6 @@
 import torch
 import torch.nn as nn
+from typing import Optional
 
 class LSTMNetwork(nn.Module):
     def __init__(self, input_size, hidden_size, num_layers):
@@ -21,11 +22,20 @@ class TrajectoryPredictor(nn.Module):
         self.gru2 = nn.GRU(hidden_dim, hidden_dim, num_layers, batch_first=True)
         self.fc = nn.Linear(hidden_dim, output_dim)
     
-    def forward(self, x):
-        # x shape: (batch_size, seq_len, input_dim)
-        out, h_n = self.gru1(x)
-        # Decoder generates 10 steps, but we'll take the last one
-        dec_input = torch.zeros(x.size(0), 10, self.hidden_dim).to(x.device)
+    @torch.jit.export
+    def encode(self, x, h0: Optional[torch.Tensor] = None):
+        # x shape: (batch_size, seq_len, input_dim) -> h_n: (num_layers, batch_size, hidden_dim)
+        _, h_n = self.gru1(x, h0)
+        return h_n
+
+    @torch.jit.export
+    def decode(self, h_n, steps: int = 10):
+        # Decoder generates `steps` future points from the encoder state
+        dec_input = torch.zeros(h_n.size(1), steps, self.hidden_dim, device=h_n.device)
         out, _ = self.gru2(dec_input, h_n)
-        out = self.fc(out)  # shape: (batch_size, 10, output_dim)
-        return out
+        return self.fc(out)  # shape: (batch_size, steps, output_dim)
+
+    def forward(self, x, steps: int = 10):
+        # x shape: (batch_size, seq_len, input_dim)
+        # Decoder generates 10 steps by default, the caller picks the ones it needs
+        return self.decode(self.encode(x, None), steps)
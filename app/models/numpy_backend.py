@@ -0,0 +1,148 @@
+import os
+import sys
+
+import numpy as np
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    # Численно устойчивая сигмоида без переполнения exp
+    return 0.5 * (1.0 + np.tanh(0.5 * x))
+
+
+def read_architecture(state: dict):
+    """Определить (hidden_dim, num_layers) TrajectoryPredictor по state dict (тензоры или массивы)"""
+    hidden_dim = state["gru1.weight_hh_l0"].shape[1]
+    num_layers = sum(1 for name in state if name.startswith("gru1.weight_ih_l"))
+    return hidden_dim, num_layers
+
+
+def convert_checkpoint(model_path: str, npz_path: str) -> str:
+    """Сконвертировать state dict TrajectoryPredictor (.pth) в компактный .npz.
+
+    Нужен torch, но только один раз; дальше numpy-бэкенд читает .npz без него.
+    """
+    import torch
+
+    state = torch.load(model_path, map_location="cpu")
+    arrays = {name: tensor.detach().cpu().numpy().astype(np.float32) for name, tensor in state.items()}
+    np.savez(npz_path, **arrays)
+    return npz_path
+
+
+class NumpyGRU:
+    """Многослойный GRU (batch_first) на векторизованном NumPy, eval-режим"""
+
+    def __init__(self, arrays: dict, prefix: str):
+        self.layers = []
+        layer = 0
+        while f"{prefix}.weight_ih_l{layer}" in arrays:
+            w_ih = arrays[f"{prefix}.weight_ih_l{layer}"]
+            w_hh = arrays[f"{prefix}.weight_hh_l{layer}"]
+            b_ih = arrays[f"{prefix}.bias_ih_l{layer}"]
+            b_hh = arrays[f"{prefix}.bias_hh_l{layer}"]
+            # Транспонируем один раз при загрузке, чтобы считать x @ W
+            self.layers.append((
+                np.ascontiguousarray(w_ih.T), np.ascontiguousarray(w_hh.T), b_ih, b_hh
+            ))
+            layer += 1
+        self.num_layers = len(self.layers)
+        self.hidden_dim = self.layers[0][1].shape[0]
+
+    def __call__(self, x: np.ndarray, h0: np.ndarray = None, steps: int = None):
+        """x: (batch_size, seq_len, input_dim), h0: (num_layers, batch_size, hidden).
+
+        x=None - нулевой вход длины steps (декодер), тогда входная проекция
+        первого слоя сводится к смещению.
+        Возвращает (out (batch_size, seq_len, hidden), h_n (num_layers, batch_size, hidden)).
+        """
+        if x is None:
+            batch_size, seq_len = h0.shape[1], steps
+        else:
+            batch_size, seq_len = x.shape[0], x.shape[1]
+        hidden = self.hidden_dim
+        h_n = np.empty((self.num_layers, batch_size, hidden), dtype=np.float32)
+        layer_input = x
+
+        for layer, (w_ih, w_hh, b_ih, b_hh) in enumerate(self.layers):
+            # Входная проекция считается сразу для всех шагов
+            if layer_input is None:
+                gi = np.broadcast_to(b_ih, (batch_size, seq_len, 3 * hidden))
+            else:
+                gi = layer_input @ w_ih + b_ih  # (batch_size, seq_len, 3 * hidden)
+
+            if h0 is None:
+                h = np.zeros((batch_size, hidden), dtype=np.float32)
+            else:
+                h = h0[layer]
+
+            out = np.empty((batch_size, seq_len, hidden), dtype=np.float32)
+            for step in range(seq_len):
+                gh = h @ w_hh + b_hh
+                g = gi[:, step]
+                # Порядок гейтов PyTorch: reset, update, new
+                r = _sigmoid(g[:, :hidden] + gh[:, :hidden])
+                z = _sigmoid(g[:, hidden:2 * hidden] + gh[:, hidden:2 * hidden])
+                n = np.tanh(g[:, 2 * hidden:] + r * gh[:, 2 * hidden:])
+                h = n + z * (h - n)  # (1 - z) * n + z * h
+                out[:, step] = h
+
+            h_n[layer] = h
+            layer_input = out
+
+        return layer_input, h_n
+
+
+class NumpyBackend:
+    """Инференс TrajectoryPredictor на чистом NumPy: gru1 -> gru2 (нулевой вход) -> fc"""
+    name = "numpy"
+
+    def __init__(self, arrays: dict):
+        self.gru1 = NumpyGRU(arrays, "gru1")
+        self.gru2 = NumpyGRU(arrays, "gru2")
+        self.fc_weight = np.ascontiguousarray(arrays["fc.weight"].T)
+        self.fc_bias = arrays["fc.bias"]
+        self.num_layers = self.gru1.num_layers
+        self.hidden_dim = self.gru1.hidden_dim
+
+    @property
+    def nbytes(self) -> int:
+        """Память, занимаемая весами модели"""
+        arrays = [self.fc_weight, self.fc_bias]
+        for gru in (self.gru1, self.gru2):
+            for layer in gru.layers:
+                arrays.extend(layer)
+        return sum(a.nbytes for a in arrays)
+
+    def forward(self, x: np.ndarray, steps: int = 10) -> np.ndarray:
+        # x: (batch_size,seq_len,3) -> (batch_size, steps, 3)
+        return self.decode(self.encode(x), steps)
+
+    def encode(self, x: np.ndarray, h0: np.ndarray = None) -> np.ndarray:
+        _, h_n = self.gru1(np.asarray(x, dtype=np.float32), h0)
+        return h_n
+
+    def decode(self, h: np.ndarray, steps: int = 10) -> np.ndarray:
+        out, _ = self.gru2(None, np.asarray(h, dtype=np.float32), steps)
+        return out @ self.fc_weight + self.fc_bias
+
+
+def load_arrays(model_path: str, npz_path: str = None) -> dict:
+    """Веса модели из .npz; при отсутствии .npz он конвертируется из .pth"""
+    if npz_path is None:
+        npz_path = os.path.splitext(model_path)[0] + ".npz"
+    if not os.path.exists(npz_path):
+        convert_checkpoint(model_path, npz_path)
+    with np.load(npz_path) as data:
+        return {name: data[name] for name in data.files}
+
+
+def load_numpy_backend(model_path: str, npz_path: str = None) -> NumpyBackend:
+    """Загрузить numpy-бэкенд из .npz; при отсутствии .npz сконвертировать его из .pth"""
+    return NumpyBackend(load_arrays(model_path, npz_path))
+
+
+if __name__ == "__main__":
+    # python -m app.models.numpy_backend model.pth [model.npz]
+    src = sys.argv[1]
+    dst = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(src)[0] + ".npz"
+    print(convert_checkpoint(src, dst))
@@ -0,0 +1,96 @@
+import os
+
+import numpy as np
+
+from app.core.config import settings
+
+# Энкодер и декодер экспортируются отдельными графами, чтобы работали потоковые сессии
+ENCODER_SUFFIX = ".encoder.onnx"
+DECODER_SUFFIX = ".decoder.onnx"
+# Декодер экспортируется на полный горизонт, короткий горизонт - срез
+DECODER_STEPS = 10
+
+
+def export_onnx(model, encoder_path: str, decoder_path: str):
+    """Экспорт TrajectoryPredictor в два ONNX-графа: encode(x, h0) и decode(h)"""
+    import torch
+
+    class Encoder(torch.nn.Module):
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, x, h0):
+            return self.model.encode(x, h0)
+
+    class Decoder(torch.nn.Module):
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, h):
+            return self.model.decode(h, DECODER_STEPS)
+
+    num_layers, hidden_dim = model.gru1.num_layers, model.hidden_dim
+    x = torch.zeros(2, 5, 3)
+    h0 = torch.zeros(num_layers, 2, hidden_dim)
+    # Обертки должны быть в eval, иначе экспорт включит dropout в модели
+    torch.onnx.export(
+        Encoder(model).eval(), (x, h0), encoder_path,
+        input_names=["x", "h0"], output_names=["h"],
+        dynamic_axes={"x": {0: "batch", 1: "seq_len"}, "h0": {1: "batch"}, "h": {1: "batch"}},
+        dynamo=False,
+    )
+    torch.onnx.export(
+        Decoder(model).eval(), (h0,), decoder_path,
+        input_names=["h"], output_names=["out"],
+        dynamic_axes={"h": {1: "batch"}, "out": {0: "batch"}},
+        dynamo=False,
+    )
+    model.eval()
+
+
+class OnnxBackend:
+    """Инференс через ONNX Runtime (CPU)"""
+    name = "onnx"
+
+    def __init__(self, encoder_path: str, decoder_path: str):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if settings.TORCH_NUM_THREADS:
+            options.intra_op_num_threads = settings.TORCH_NUM_THREADS
+        providers = ["CPUExecutionProvider"]
+        # Оценка памяти весов по размеру графов
+        self.nbytes = os.path.getsize(encoder_path) + os.path.getsize(decoder_path)
+        self.encoder = ort.InferenceSession(encoder_path, options, providers=providers)
+        self.decoder = ort.InferenceSession(decoder_path, options, providers=providers)
+        # h0: (num_layers, batch, hidden)
+        h0_shape = self.encoder.get_inputs()[1].shape
+        self.num_layers, self.hidden_dim = int(h0_shape[0]), int(h0_shape[2])
+
+    def forward(self, x: np.ndarray, steps: int = 10) -> np.ndarray:
+        return self.decode(self.encode(x), steps)
+
+    def encode(self, x: np.ndarray, h0: np.ndarray = None) -> np.ndarray:
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        if h0 is None:
+            h0 = np.zeros((self.num_layers, x.shape[0], self.hidden_dim), dtype=np.float32)
+        return self.encoder.run(None, {"x": x, "h0": np.ascontiguousarray(h0, dtype=np.float32)})[0]
+
+    def decode(self, h: np.ndarray, steps: int = 10) -> np.ndarray:
+        if steps > DECODER_STEPS:
+            raise ValueError(f"ONNX-декодер экспортирован на {DECODER_STEPS} шагов")
+        out = self.decoder.run(None, {"h": np.ascontiguousarray(h, dtype=np.float32)})[0]
+        return out[:, :steps]
+
+
+def load_onnx_backend(model_path: str) -> OnnxBackend:
+    """Загрузить ONNX-графы рядом с .pth; при их отсутствии экспортировать из .pth (нужен torch)"""
+    stem = os.path.splitext(model_path)[0]
+    encoder_path, decoder_path = stem + ENCODER_SUFFIX, stem + DECODER_SUFFIX
+    if not (os.path.exists(encoder_path) and os.path.exists(decoder_path)):
+        from app.models.torch_backend import build_model
+        export_onnx(build_model(model_path), encoder_path, decoder_path)
+    return OnnxBackend(encoder_path, decoder_path)
@@ -1,32 +1,111 @@
-import torch
+import logging
+
 import numpy as np
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("torch", "numpy", "engine", "torchscript", "quantized", "onnx")
+
+# Допустимое отклонение от eager модели (в нормализованных единицах)
+TOLERANCES = {
+    "numpy": 1e-4,
+    "engine": 1e-4,
+    "torchscript": 1e-4,
+    "onnx": 1e-4,
+    "quantized": 5e-2,
+}
+
 class Predictor:
-    def __init__(self, model):
-        self.model = model
-        self.model.eval()
+    """Инференс TrajectoryPredictor поверх выбранного бэкенда (см. BACKENDS)"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.num_layers = backend.num_layers
+        self.hidden_dim = backend.hidden_dim
+
+    @property
+    def nbytes(self) -> int:
+        return getattr(self.backend, "nbytes", 0)
 
     def predict(self, x: np.ndarray) -> np.ndarray:
-        # x: (1,5,3) - input sequence of 5 points with x,y,t coordinates
-        with torch.no_grad():
-            inp = torch.from_numpy(x).float()
-            out = self.model(inp)  # shape: (1, 10, 3)
-            # Take the last predicted point (or first, depending on model design)
-            return out[:, -1, :].numpy()  # shape: (1, 3)
-
-def load_model():
-    from app.models.network import TrajectoryPredictor
-    
-    # Create model with parameters matching the trained model
-    model = TrajectoryPredictor(
-        input_dim=3, 
-        hidden_dim=settings.HIDDEN_SIZE, 
-        output_dim=3, 
-        num_layers=settings.NUM_LAYERS,
-        dropout=0.5
-    )
-    
-    # Load the trained weights
-    model.load_state_dict(torch.load(settings.MODEL_PATH, map_location=settings.DEVICE))
-    return Predictor(model)
+        # x: (batch_size,5,3) - input sequences of 5 points with x,y,t coordinates
+        out = self.backend.forward(x)  # shape: (batch_size, 10, 3)
+        # Take the last predicted point (or first, depending on model design)
+        return out[:, -1, :]  # shape: (batch_size, 3)
+
+    def predict_sequence(self, x: np.ndarray, horizon: int = 10) -> np.ndarray:
+        # x: (batch_size,5,3) -> all decoded steps (batch_size, horizon, 3)
+        # The decoder loop is trimmed to `horizon` steps, so short horizons are cheaper
+        return self.backend.forward(x, horizon)
+
+    def encode(self, x: np.ndarray, h0: np.ndarray = None) -> np.ndarray:
+        # x: (batch_size,seq_len,3), h0: (num_layers,batch_size,hidden) -> encoder state of the same shape
+        return self.backend.encode(x, h0)
+
+    def decode(self, h: np.ndarray, horizon: int = 10) -> np.ndarray:
+        # h: (num_layers,batch_size,hidden) -> decoded steps (batch_size, horizon, 3)
+        return self.backend.decode(h, horizon)
+
+def load_backend(name: str, model_path: str, hidden_dim: int = None, num_layers: int = None):
+    """Создать бэкенд инференса по имени из BACKENDS"""
+    # torch импортируется только для torch-бэкендов, numpy-бэкенд стартует без него
+    if name == "numpy":
+        from app.models.numpy_backend import load_numpy_backend
+        npz_path = settings.NPZ_PATH if model_path == settings.MODEL_PATH else None
+        return load_numpy_backend(model_path, npz_path)
+
+    if name == "engine":
+        from app.models.engine import InferenceEngine
+        from app.models.numpy_backend import load_arrays
+        npz_path = settings.NPZ_PATH if model_path == settings.MODEL_PATH else None
+        return InferenceEngine(load_arrays(model_path, npz_path))
+
+    if name == "onnx":
+        from app.models.onnx_backend import load_onnx_backend
+        return load_onnx_backend(model_path)
+
+    if name in ("torch", "torchscript", "quantized"):
+        from app.models.torch_backend import load_torch_backend
+        return load_torch_backend(name, model_path, hidden_dim, num_layers, settings.DEVICE)
+
+    raise ValueError(f"Неизвестный бэкенд инференса: {name}")
+
+def verify_backend(backend, reference, atol: float, batch_size: int = 64) -> float:
+    """Сравнить бэкенд с эталонным (eager) на случайных нормализованных окнах.
+
+    Возвращает максимальную абсолютную ошибку, при превышении atol - ValueError.
+    """
+    x = np.random.default_rng(0).normal(size=(batch_size, 5, 3)).astype(np.float32)
+    error = float(np.abs(backend.forward(x) - reference.forward(x)).max())
+    if not error <= atol:
+        raise ValueError(f"Бэкенд {backend.name}: ошибка {error:.2e} больше допуска {atol:.2e}")
+    return error
+
+def load_model(model_path: str = None):
+    """Загрузить модель выбранным бэкендом (settings.BACKEND).
+
+    Без model_path берется глобальная модель MODEL_PATH с HIDDEN_SIZE/NUM_LAYERS,
+    иначе размеры определяются по самому чекпоинту.
+    """
+    if model_path is None:
+        model_path, hidden_dim, num_layers = settings.MODEL_PATH, settings.HIDDEN_SIZE, settings.NUM_LAYERS
+    else:
+        hidden_dim, num_layers = None, None
+
+    backend = load_backend(settings.BACKEND, model_path, hidden_dim, num_layers)
+
+    # Оптимизированные бэкенды проверяются против eager модели; engine - против numpy-бэкенда,
+    # чтобы стартовать без torch (numpy-бэкенд сам совпадает с eager, см. тесты)
+    if settings.BACKEND_VERIFY and settings.BACKEND not in ("torch", "numpy"):
+        reference_name = "numpy" if settings.BACKEND == "engine" else "torch"
+        reference = load_backend(reference_name, model_path, hidden_dim, num_layers)
+        atol = settings.BACKEND_TOLERANCE or TOLERANCES[settings.BACKEND]
+        try:
+            error = verify_backend(backend, reference, atol)
+            logger.info(f"Бэкенд {settings.BACKEND} прошел проверку точности: ошибка {error:.2e}")
+        except ValueError as e:
+            logger.error(f"{e}, используем {reference.name}")
+            backend = reference
+
+    return Predictor(backend)
@@ -0,0 +1,150 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from app.core.config import settings
+from app.models.predictor import load_model
+
+logger = logging.getLogger(__name__)
+
+# Имя модели в API -> чекпоинт в MODELS_DIR
+SHIPPED_MODELS = {
+    "pos_64": "mix_pos_max_norm_64.pth",
+    "pos_128": "mix_pos_max_norm_128.pth",
+    "vel_64": "mix_vel_max_norm_64.pth",
+    "vel_128": "mix_vel_max_norm_128.pth",
+}
+
+# Глобальная модель из MODEL_PATH / HIDDEN_SIZE / NUM_LAYERS
+DEFAULT_MODEL = "default"
+# Ансамбль ENSEMBLE_MODELS; путь в реестре - список (kind, путь) моделей
+ENSEMBLE_MODEL = "ensemble"
+
+
+def is_velocity_model(name: str) -> bool:
+    """Модель предсказывает скорости (vel_*), а не позиции"""
+    return name.startswith("vel")
+
+
+class ModelRegistry:
+    """Реестр моделей с ленивой загрузкой, прогревом и LRU-вытеснением по бюджету памяти.
+
+    Модель загружается при первом обращении и сразу прогревается фиктивным батчем.
+    Если суммарная память весов превышает бюджет, вытесняются давно не использованные
+    модели; модель по умолчанию не вытесняется.
+    """
+
+    def __init__(self, paths: dict, default: str, memory_budget_bytes: int, warmup_batch: int = 8):
+        self.paths = paths
+        self.default = default
+        self.memory_budget_bytes = memory_budget_bytes
+        self.warmup_batch = warmup_batch
+        self._lock = threading.Lock()
+        self._loading = {}  # name -> Lock, чтобы одна модель не грузилась дважды
+        self._models = OrderedDict()  # name -> Predictor, порядок LRU
+        self._info = {}  # name -> время загрузки, прогрева, память
+        self.evictions = 0
+
+    def names(self):
+        return list(self.paths)
+
+    def get(self, name: str = None):
+        """Вернуть Predictor модели, при необходимости загрузив ее"""
+        name = name or self.default
+        if name not in self.paths:
+            raise KeyError(f"Неизвестная модель: {name}")
+
+        with self._lock:
+            predictor = self._models.get(name)
+            if predictor is not None:
+                self._models.move_to_end(name)
+                self._info[name]["last_used"] = time.time()
+                return predictor
+            loading = self._loading.setdefault(name, threading.Lock())
+
+        with loading:
+            with self._lock:
+                predictor = self._models.get(name)
+            if predictor is None:
+                predictor = self._load(name)
+        return predictor
+
+    def stats(self) -> dict:
+        with self._lock:
+            resident = {name: dict(self._info[name]) for name in self._models}
+            used = sum(info["memory_bytes"] for info in resident.values())
+        return {
+            "available": self.names(),
+            "default": self.default,
+            "resident": resident,
+            "memory_bytes": used,
+            "memory_budget_bytes": self.memory_budget_bytes,
+            "evictions": self.evictions,
+        }
+
+    def _load(self, name: str):
+        start = time.perf_counter()
+        if name == ENSEMBLE_MODEL:
+            # Ансамбль импортируется при первой загрузке, а не при старте сервиса
+            from app.models.ensemble import load_ensemble
+            predictor = load_ensemble(self.paths[name], settings.ENSEMBLE_WEIGHTS, settings.ENSEMBLE_FUSED_MAX_BATCH)
+        else:
+            predictor = load_model(None if name == DEFAULT_MODEL else self.paths[name])
+            if is_velocity_model(name):
+                # Модель скоростей отдает смещения за шаг: переводим в позиции, как в ансамбле
+                from app.models.ensemble import VelocityPredictor
+                predictor = VelocityPredictor(predictor.backend)
+        load_time = time.perf_counter() - start
+
+        # Прогрев: первый реальный запрос не должен платить за разовую инициализацию
+        start = time.perf_counter()
+        dummy = np.zeros((self.warmup_batch, 5, 3), dtype=np.float32)
+        predictor.predict(dummy)
+        predictor.predict(dummy[:1])
+        warmup_time = time.perf_counter() - start
+
+        with self._lock:
+            self._models[name] = predictor
+            self._info[name] = {
+                "load_time_s": load_time,
+                "warmup_time_s": warmup_time,
+                "memory_bytes": predictor.nbytes,
+                "last_used": time.time(),
+            }
+            self._evict(keep=name)
+        logger.info(f"Модель {name} загружена за {load_time:.3f} с, прогрев {warmup_time:.3f} с")
+        return predictor
+
+    def _evict(self, keep: str):
+        used = sum(info["memory_bytes"] for info in self._info.values())
+        for name in list(self._models):
+            if used <= self.memory_budget_bytes:
+                break
+            if name in (keep, self.default):
+                continue
+            self._models.pop(name)
+            used -= self._info.pop(name)["memory_bytes"]
+            self.evictions += 1
+            logger.info(f"Модель {name} вытеснена из памяти")
+
+
+def create_registry() -> ModelRegistry:
+    paths = {DEFAULT_MODEL: settings.MODEL_PATH}
+    for name, filename in SHIPPED_MODELS.items():
+        path = os.path.join(settings.MODELS_DIR, filename)
+        if os.path.exists(path):
+            paths[name] = path
+    if settings.ENSEMBLE_MODELS and all(name in paths for name in settings.ENSEMBLE_MODELS):
+        paths[ENSEMBLE_MODEL] = [
+            ("vel" if is_velocity_model(name) else "pos", paths[name]) for name in settings.ENSEMBLE_MODELS
+        ]
+    return ModelRegistry(
+        paths,
+        default=settings.DEFAULT_MODEL,
+        memory_budget_bytes=int(settings.MODEL_MEMORY_BUDGET_MB * 1024 * 1024),
+        warmup_batch=settings.MODEL_WARMUP_BATCH,
+    )
@@ -0,0 +1,282 @@
+import logging
+import math
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+import numpy as np
+
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+def _smooth(average: float, value: float, smoothing: float = 0.2) -> float:
+    """Экспоненциальное сглаживание; первое наблюдение берется как есть"""
+    return value if not average else average + smoothing * (value - average)
+
+
+class DeadlineExceeded(Exception):
+    """Проход модели не успевает к сроку запроса.
+
+    waited=False - отказ сразу по оценке очереди, True - срок истек во время ожидания.
+    """
+
+    def __init__(self, message: str, waited: bool = False):
+        super().__init__(message)
+        self.waited = waited
+
+
+class InferenceLimiter:
+    """Ограничение числа одновременных проходов модели и оценка их длительности.
+
+    max_concurrent=0 - без ограничения. Длительность прохода сглаживается (EWMA) и
+    используется, чтобы заранее отказаться от прохода, который не успеет к сроку.
+    Счетчики обращений к модели и пропущенных проходов ведутся здесь же, независимо
+    от METRICS_ENABLED: по ним /predict/health показывает долю пропусков.
+    """
+
+    def __init__(self, max_concurrent: int = 0, smoothing: float = 0.2):
+        self.max_concurrent = max_concurrent
+        self.smoothing = smoothing
+        self.forward_s = 0.0
+        self.calls = 0
+        self.shed_queue = 0  # отказ сразу по оценке очереди
+        self.shed_timeout = 0  # срок истек во время ожидания
+        self._stats_lock = threading.Lock()
+        self._semaphore = threading.BoundedSemaphore(max_concurrent) if max_concurrent > 0 else None
+
+    def run(self, fn, *args, deadline: float = None):
+        """fn(*args) в свободном слоте; deadline - срок по time.monotonic()"""
+        timeout = None
+        if deadline is not None:
+            timeout = deadline - time.monotonic() - self.forward_s
+            if timeout <= 0:
+                raise DeadlineExceeded("проход модели не успевает к сроку")
+        if self._semaphore is not None and not self._semaphore.acquire(timeout=timeout):
+            raise DeadlineExceeded("нет свободного слота инференса до срока", waited=True)
+        try:
+            if deadline is not None and time.monotonic() + self.forward_s > deadline:
+                raise DeadlineExceeded("проход модели не успевает к сроку", waited=True)
+            start = time.perf_counter()
+            out = fn(*args)
+            self.observe(time.perf_counter() - start)
+            return out
+        finally:
+            if self._semaphore is not None:
+                self._semaphore.release()
+
+    def observe(self, seconds: float):
+        self.forward_s = _smooth(self.forward_s, seconds, self.smoothing)
+
+    def count_call(self):
+        """Учесть обращение к модели (одно на запрос, а не на проход)"""
+        with self._stats_lock:
+            self.calls += 1
+
+    def count_shed(self, error: DeadlineExceeded):
+        """Учесть пропущенный по сроку проход"""
+        with self._stats_lock:
+            if error.waited:
+                self.shed_timeout += 1
+            else:
+                self.shed_queue += 1
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            calls, shed_queue, shed_timeout = self.calls, self.shed_queue, self.shed_timeout
+        return {
+            "forward_ms": self.forward_s * 1000.0,
+            "neural_calls": calls,
+            "shed_queue": shed_queue,
+            "shed_timeout": shed_timeout,
+            "shed_rate": (shed_queue + shed_timeout) / calls if calls else 0.0,
+        }
+
+
+class InferenceScheduler:
+    """Динамический micro-batching между API и Predictor.
+
+    Запросы складываются в очередь, фоновый поток собирает их в один батч
+    (до max_batch окон или max_wait_ms ожидания) и выполняет один проход модели.
+    Результат каждой части батча возвращается ожидающему запросу через Future.
+    """
+
+    def __init__(self, predictor, max_batch: int = 64, max_wait_ms: float = 2.0, limiter: InferenceLimiter = None):
+        self.predictor = predictor
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.limiter = limiter
+        # Сглаженная длительность одного батча - для оценки ожидания в очереди
+        self._forward_s = 0.0
+        self._busy = False
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        # Статистика для настройки max_batch / max_wait_ms
+        self._batches = 0
+        self._items = 0
+        self._last_batch_size = 0
+        self._max_batch_seen = 0
+        self._flushes_full = 0
+        self._flushes_timeout = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="inference-scheduler", daemon=True)
+        self._thread.start()
+
+    def submit(self, x: np.ndarray, predictor=None) -> Future:
+        """Поставить окна (n, seq_len, 3) в очередь, результат (n, 3) придет в Future.
+
+        predictor - модель для этих окон (по умолчанию модель планировщика);
+        окна разных моделей или разной длины из одного сбора выполняются отдельными батчами.
+        """
+        predictor = predictor or self.predictor
+        future = Future()
+        if self._closed:
+            # После остановки планировщика считаем синхронно
+            try:
+                future.set_result(predictor.predict(x))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        self._queue.put((x, future, predictor))
+        return future
+
+    def predict(self, x: np.ndarray, predictor=None, timeout: float = None, deadline: float = None) -> np.ndarray:
+        """Синхронный интерфейс, совместимый с Predictor.predict.
+
+        deadline - срок по time.monotonic(): если очередь заведомо не успевает, окна в нее
+        не ставятся; если результат не пришел к сроку, окна снимаются с очереди.
+        В обоих случаях - DeadlineExceeded.
+        """
+        if deadline is None:
+            return self.submit(x, predictor).result(timeout=timeout)
+        if time.monotonic() + self.estimate_wait() > deadline:
+            raise DeadlineExceeded("очередь инференса не успевает к сроку")
+        future = self.submit(x, predictor)
+        try:
+            return future.result(timeout=max(deadline - time.monotonic(), 0.0))
+        except FutureTimeout:
+            # До Python 3.11 Future.result бросает concurrent.futures.TimeoutError, а не встроенный
+            future.cancel()
+            raise DeadlineExceeded("результат инференса не пришел к сроку", waited=True)
+
+    def estimate_wait(self) -> float:
+        """Оценка времени до результата для нового запроса: батчи впереди, свой батч и сбор"""
+        with self._lock:
+            busy = self._busy
+        ahead = math.ceil((self._queue.qsize() + 1) / self.max_batch)
+        return (ahead + busy) * self._forward_s + self.max_wait
+
+    def restart(self):
+        """Новый фоновый поток и очередь в дочернем процессе после fork (потоки fork не переживают)"""
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._busy = False
+        if not self._closed:
+            self._thread = threading.Thread(target=self._run, name="inference-scheduler", daemon=True)
+            self._thread.start()
+
+    def close(self):
+        """Остановить фоновый поток после обработки уже поставленных запросов"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout=1.0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            batches = self._batches
+            return {
+                "queue_depth": self._queue.qsize(),
+                "batches": batches,
+                "items": self._items,
+                "mean_batch_size": self._items / batches if batches else 0.0,
+                "last_batch_size": self._last_batch_size,
+                "max_batch_size": self._max_batch_seen,
+                "flushes_full": self._flushes_full,
+                "flushes_timeout": self._flushes_timeout,
+                "max_batch": self.max_batch,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "forward_ms": self._forward_s * 1000.0,
+            }
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+
+            batch = [first]
+            size = len(first[0])
+            stop = False
+            deadline = time.monotonic() + self.max_wait
+            while size < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        item = self._queue.get(timeout=remaining)
+                    else:
+                        item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+                size += len(item[0])
+
+            self._flush(batch, size)
+            if stop:
+                return
+
+    def _flush(self, batch, size: int):
+        # Запросы, снятые по сроку, в модель не идут
+        batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        size = sum(len(item[0]) for item in batch)
+        with self._lock:
+            self._busy = True
+            self._batches += 1
+            self._items += size
+            self._last_batch_size = size
+            self._max_batch_seen = max(self._max_batch_seen, size)
+            if size >= self.max_batch:
+                self._flushes_full += 1
+            else:
+                self._flushes_timeout += 1
+
+        # Группируем окна по моделям и длине окна, сохраняя порядок
+        groups = {}
+        for item in batch:
+            groups.setdefault((id(item[2]), item[0].shape[1]), []).append(item)
+
+        for group in groups.values():
+            predictor = group[0][2]
+            metrics.BATCH_SIZE.observe(sum(len(x) for x, _, _ in group))
+            x = group[0][0] if len(group) == 1 else np.concatenate([x for x, _, _ in group])
+            start = time.perf_counter()
+            try:
+                if self.limiter is not None:
+                    out = self.limiter.run(predictor.predict, x)
+                else:
+                    out = predictor.predict(x)
+            except Exception as e:
+                logger.warning(f"Ошибка пакетного инференса ({size} окон): {e}")
+                for _, future, _ in group:
+                    future.set_exception(e)
+                continue
+            finally:
+                self._forward_s = _smooth(self._forward_s, time.perf_counter() - start)
+
+            offset = 0
+            for part, future, _ in group:
+                future.set_result(out[offset:offset + len(part)])
+                offset += len(part)
+
+        with self._lock:
+            self._busy = False
@@ -0,0 +1,122 @@
+import os
+
+import torch
+import torch.nn as nn
+import numpy as np
+from app.core.config import settings
+from app.models.network import TrajectoryPredictor
+from app.models.numpy_backend import read_architecture
+
+# Суффиксы артефактов рядом с исходным .pth
+TORCHSCRIPT_SUFFIX = ".torchscript.pt"
+QUANTIZED_SUFFIX = ".int8.pt"
+
+
+def load_state(model_path: str, device: str = "cpu") -> dict:
+    """State dict из .pth; на CPU тензоры отображаются из файла (mmap) без копии в памяти процесса.
+
+    Страницы весов берутся из page cache и общие для всех процессов, загрузивших тот же файл.
+    Старый (не zip) формат чекпоинта mmap не поддерживает - он читается целиком.
+    """
+    if device == "cpu":
+        try:
+            return torch.load(model_path, map_location=device, mmap=True)
+        except RuntimeError:
+            pass
+    return torch.load(model_path, map_location=device)
+
+
+def build_model(model_path: str, hidden_dim: int = None, num_layers: int = None, device: str = "cpu") -> TrajectoryPredictor:
+    """Создать TrajectoryPredictor и загрузить веса из .pth.
+
+    Не заданные hidden_dim / num_layers берутся из самого чекпоинта.
+    """
+    state = load_state(model_path, device)
+    stored_hidden, stored_layers = read_architecture(state)
+
+    # Create model with parameters matching the trained model
+    model = TrajectoryPredictor(
+        input_dim=3,
+        hidden_dim=hidden_dim or stored_hidden,
+        output_dim=3,
+        num_layers=num_layers or stored_layers,
+        dropout=0.5
+    )
+
+    # Load the trained weights; assign=True keeps the mmap'ed tensors instead of copying them
+    model.load_state_dict(state, assign=True)
+    model.eval()
+    return model
+
+
+def script_model(model: nn.Module):
+    """TorchScript + freeze, encode/decode остаются доступны для потоковых сессий"""
+    scripted = torch.jit.script(model.eval())
+    return torch.jit.freeze(scripted, preserved_attrs=["encode", "decode"])
+
+
+def quantize_model(model: TrajectoryPredictor):
+    """Динамическая int8-квантизация GRU и Linear слоев"""
+    quantized = torch.ao.quantization.quantize_dynamic(model.eval(), {nn.GRU, nn.Linear}, dtype=torch.qint8)
+    return torch.jit.script(quantized)
+
+
+class TorchBackend:
+    """PyTorch инференс TrajectoryPredictor (eager, TorchScript или int8)"""
+
+    def __init__(self, model, num_layers: int = None, hidden_dim: int = None, name: str = "torch"):
+        self.model = model
+        self.model.eval()
+        # У замороженных TorchScript модулей атрибутов нет, размеры передаются явно
+        self.num_layers = num_layers or model.gru1.num_layers
+        self.hidden_dim = hidden_dim or model.hidden_dim
+        self.name = name
+
+    @property
+    def nbytes(self) -> int:
+        """Память, занимаемая весами модели"""
+        return sum(t.numel() * t.element_size() for t in self.model.state_dict().values() if torch.is_tensor(t))
+
+    def forward(self, x: np.ndarray, steps: int = 10) -> np.ndarray:
+        # x: (batch_size,seq_len,3) -> (batch_size, steps, 3)
+        with torch.inference_mode():
+            inp = torch.from_numpy(x).float()
+            return self.model(inp, steps).numpy()
+
+    def encode(self, x: np.ndarray, h0: np.ndarray = None) -> np.ndarray:
+        # x: (batch_size,seq_len,3), h0: (num_layers,batch_size,hidden) -> encoder state of the same shape
+        with torch.inference_mode():
+            inp = torch.from_numpy(x).float()
+            h = None if h0 is None else torch.from_numpy(h0).float()
+            return self.model.encode(inp, h).numpy()
+
+    def decode(self, h: np.ndarray, steps: int = 10) -> np.ndarray:
+        # h: (num_layers,batch_size,hidden) -> decoded steps (batch_size, steps, 3)
+        with torch.inference_mode():
+            return self.model.decode(torch.from_numpy(h).float(), steps).numpy()
+
+
+def load_torch_backend(kind: str, model_path: str, hidden_dim: int = None, num_layers: int = None, device: str = "cpu") -> TorchBackend:
+    """Загрузить torch-бэкенд: torch (eager), torchscript или quantized.
+
+    Для torchscript/quantized используется готовый артефакт рядом с .pth,
+    а если его нет - он строится из eager модели на лету.
+    """
+    # Число потоков torch - настройка процесса, общая для всех моделей
+    if settings.TORCH_NUM_THREADS:
+        torch.set_num_threads(settings.TORCH_NUM_THREADS)
+    model = build_model(model_path, hidden_dim, num_layers, device)
+    hidden_dim, num_layers = model.hidden_dim, model.gru1.num_layers
+    if kind == "torch":
+        return TorchBackend(model)
+
+    stem = os.path.splitext(model_path)[0]
+    if kind == "torchscript":
+        path, build = stem + TORCHSCRIPT_SUFFIX, script_model
+    elif kind == "quantized":
+        path, build = stem + QUANTIZED_SUFFIX, quantize_model
+    else:
+        raise ValueError(f"Неизвестный torch-бэкенд: {kind}")
+
+    compiled = torch.jit.load(path, map_location=device) if os.path.exists(path) else build(model)
+    return TorchBackend(compiled, num_layers, hidden_dim, kind)
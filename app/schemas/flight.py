@@ -1,29 +1,135 @@
-from pydantic import BaseModel
-from typing import List
+from contextvars import ContextVar
+from time import perf_counter
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional
 import numpy as np
+from app.core.metrics import PARSE_SECONDS
+
+# Признак того, что валидация идет внутри уже измеряемой схемы (элементы батча)
+_parsing = ContextVar("_parsing", default=False)
 
 class Point(BaseModel):
     x: float
     y: float
     t: float
 
-class SequenceIn(BaseModel):
+class TimedRequest(BaseModel):
+    """Схема тела запроса: время валидации попадает в метрику стадии parse"""
+
+    @model_validator(mode="wrap")
+    @classmethod
+    def _time_parse(cls, data, handler):
+        if _parsing.get():
+            return handler(data)
+        token = _parsing.set(True)
+        start = perf_counter()
+        try:
+            return handler(data)
+        finally:
+            PARSE_SECONDS.observe(perf_counter() - start)
+            _parsing.reset(token)
+
+class SequenceIn(TimedRequest):
     points: List[Point]
+    # Имя модели из реестра (pos_64, pos_128, vel_64, vel_128); по умолчанию DEFAULT_MODEL
+    model: Optional[str] = None
+    # Срок ответа; не успевающий проход GRU пропускается (по умолчанию DEADLINE_MS)
+    deadline_ms: Optional[float] = Field(None, gt=0)
 
     def to_numpy(self) -> np.ndarray:
-        # возвращает shape (1,5,3) для GRU модели
+        # возвращает shape (1,seq_len,3) для GRU модели
         arr = np.array([[p.x, p.y, p.t] for p in self.points], dtype=float)
-        return arr.reshape(1, 5, 3)
+        return arr.reshape(1, -1, 3)
 
 class PointOut(BaseModel):
     x: float
     y: float
     t: float
+    # Только кинематика: проход GRU пропущен, чтобы успеть к сроку запроса
+    degraded: bool = False
 
     @classmethod
-    def from_array(cls, arr: np.ndarray):
+    def from_array(cls, arr: np.ndarray, degraded: bool = False):
         # arr может быть shape (3,) или (1,3) - берем последнюю точку из предсказания
         if len(arr.shape) == 2:
             # Если предсказание последовательности, берем последнюю точку
             arr = arr[-1]
-        return cls(x=float(arr[0]), y=float(arr[1]), t=float(arr[2]))
+        return cls(x=float(arr[0]), y=float(arr[1]), t=float(arr[2]), degraded=degraded)
+
+class BatchSequenceIn(TimedRequest):
+    items: List[SequenceIn]
+    # Одна модель на весь батч, чтобы сохранить один проход GRU
+    model: Optional[str] = None
+    deadline_ms: Optional[float] = Field(None, gt=0)
+
+class BatchItemOut(BaseModel):
+    # Для ошибочного элемента координаты не заполняются, а error содержит причину
+    x: Optional[float] = None
+    y: Optional[float] = None
+    t: Optional[float] = None
+    error: Optional[str] = None
+
+class BatchPointOut(BaseModel):
+    results: List[BatchItemOut]
+    degraded: bool = False
+
+class HorizonIn(SequenceIn):
+    # Сколько шагов декодера вернуть (декодер модели обучен на 10 шагов)
+    horizon: int = Field(10, ge=1, le=10)
+
+class TrajectoryOut(BaseModel):
+    points: List[PointOut]
+    degraded: bool = False
+
+    @classmethod
+    def from_array(cls, arr: np.ndarray, degraded: bool = False):
+        # arr shape (horizon, 3)
+        return cls(points=[PointOut(x=row[0], y=row[1], t=row[2]) for row in arr.tolist()], degraded=degraded)
+
+class ConflictIn(BatchSequenceIn):
+    # Минимально допустимое расстояние между дронами в плоскости XY
+    separation: float = Field(..., gt=0)
+    # 1 - только следующая точка, иначе шаги декодера до horizon
+    horizon: int = Field(1, ge=1, le=10)
+
+class ConflictPairOut(BaseModel):
+    # Номера траекторий в запросе, i < j
+    i: int
+    j: int
+    # Минимальное расстояние пары по горизонту, шаг и среднее время пары на нем
+    distance: float
+    step: int
+    t: float
+
+class ConflictOut(BaseModel):
+    conflicts: List[ConflictPairOut]
+    degraded: bool = False
+
+class RenderIn(TimedRequest):
+    # Трек дрона; длинные треки прореживаются до RENDER_MAX_POINTS точек на графике
+    points: List[Point]
+    # Готовое предсказание (одна точка или траектория); без него считается моделью
+    # по последним WINDOW_MAX_POINTS точкам трека
+    prediction: Optional[List[Point]] = None
+    model: Optional[str] = None
+    horizon: int = Field(10, ge=1, le=10)
+    title: Optional[str] = Field(None, max_length=200)
+    deadline_ms: Optional[float] = Field(None, gt=0)
+
+class StreamPointIn(Point):
+    drone_id: str
+
+class StreamTickIn(BaseModel):
+    # Новые точки дронов за один тик телеметрии, по одной на дрон
+    points: List[StreamPointIn]
+
+class StreamPredictionOut(BaseModel):
+    drone_id: str
+    # Пока у дрона меньше 5 точек, координаты не заполняются
+    x: Optional[float] = None
+    y: Optional[float] = None
+    t: Optional[float] = None
+    count: int
+
+class StreamTickOut(BaseModel):
+    predictions: List[StreamPredictionOut]
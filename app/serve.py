@@ -0,0 +1,163 @@
+"""Запуск сервиса в нескольких процессах-воркерах с общими весами моделей.
+
+python -m app.serve [--workers 4] [--threads 1] [--affinity] [--host 0.0.0.0] [--port 8000]
+
+Родительский процесс один раз импортирует приложение (torch, модель по умолчанию и
+модели из --preload загружаются и прогреваются), открывает сокет и только потом
+порождает воркеры через fork. Веса читаются из .pth через mmap и после fork не
+копируются: страницы общие для всех воркеров. Каждый воркер получает свое число
+потоков torch/OpenMP и, с --affinity, свое ядро. Упавший воркер перезапускается.
+"""
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+
+
+def _parse_args():
+    # Значения по умолчанию - из настроек (WORKERS, WORKER_THREADS, WORKER_AFFINITY);
+    # настройки читаются здесь, до импорта torch
+    from app.core.config import settings
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=settings.WORKERS)
+    parser.add_argument("--threads", type=int, default=settings.WORKER_THREADS,
+                        help="потоков torch/OpenMP на воркер (по умолчанию ядра поровну между воркерами)")
+    parser.add_argument("--affinity", action="store_true", default=settings.WORKER_AFFINITY,
+                        help="привязать воркер i к ядру i (по кругу)")
+    parser.add_argument("--preload", nargs="*", default=[], help="модели реестра, загружаемые до fork")
+    parser.add_argument("--log-level", default="warning", help="уровень логов uvicorn")
+    return parser.parse_args()
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _capture_path(path, workers: int):
+    """CAPTURE_PATH для workers воркеров: общий файл без {pid} воркеры затирали бы друг у друга,
+    поэтому при нескольких воркерах к пути добавляется .{pid}"""
+    if path and workers > 1 and "{pid}" not in path:
+        return path + ".{pid}"
+    return path
+
+
+def _run_worker(index: int, sock: socket.socket, args, cpus: list):
+    """Тело воркера после fork; процесс завершается здесь же"""
+    import uvicorn
+    from app.core.config import settings
+    from app.main import app, reinit_worker
+
+    if args.affinity:
+        os.sched_setaffinity(0, {cpus[index % len(cpus)]})
+    # Свое число потоков - только после fork; модели, загружаемые воркером позже (реестр),
+    # тоже получат его. Без torch-бэкенда (numpy, engine) torch не импортируется
+    os.environ["OMP_NUM_THREADS"] = str(args.threads)
+    os.environ["MKL_NUM_THREADS"] = str(args.threads)
+    settings.TORCH_NUM_THREADS = args.threads
+    if "torch" in sys.modules:
+        import torch
+        torch.set_num_threads(args.threads)
+    reinit_worker()
+
+    config = uvicorn.Config(app, log_level=args.log_level, lifespan="on")
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+
+
+def main():
+    args = _parse_args()
+    cpus = sorted(os.sched_getaffinity(0))
+    args.workers = max(args.workers, 1)
+    args.threads = args.threads or max(len(cpus) // args.workers, 1)
+
+    # Пулы потоков OpenMP/MKL создаются при первом параллельном участке и не переживают fork:
+    # родитель загружает и прогревает модели в один поток, воркеры выставляют свое число
+    # потоков после fork. OMP/MKL читают переменные при загрузке библиотек, до импорта torch,
+    # а TORCH_NUM_THREADS применяется при загрузке torch-бэкенда.
+    from app.core.config import settings
+
+    os.environ["OMP_NUM_THREADS"] = "1"
+    os.environ["MKL_NUM_THREADS"] = "1"
+    settings.TORCH_NUM_THREADS = 1
+    capture_path = settings.CAPTURE_PATH
+    settings.CAPTURE_PATH = _capture_path(capture_path, args.workers)
+
+    from app.api.predict import registry
+    from app.main import app  # noqa: F401 - загрузка модели по умолчанию до fork
+
+    logger = logging.getLogger("app.serve")
+    if settings.CAPTURE_PATH != capture_path:
+        logger.warning(f"CAPTURE_PATH без {{pid}} при {args.workers} воркерах: пишем в {settings.CAPTURE_PATH}")
+    for name in args.preload:
+        registry.get(name)
+
+    sock = _bind(args.host, args.port)
+    # Объекты, созданные до fork, не трогаются сборщиком мусора в воркерах,
+    # чтобы их страницы оставались общими
+    gc.collect()
+    gc.freeze()
+
+    workers = {}  # pid -> номер воркера
+    stopping = False
+
+    def spawn(index: int):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 0
+            try:
+                _run_worker(index, sock, args, cpus)
+            except BaseException:
+                logger.exception(f"Воркер {index} завершился с ошибкой")
+                code = 1
+            finally:
+                os._exit(code)
+        workers[pid] = index
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for index in range(args.workers):
+        spawn(index)
+    logger.warning(
+        f"Запущено воркеров: {args.workers}, потоков на воркер: {args.threads}, "
+        f"привязка к ядрам: {args.affinity}, http://{args.host}:{args.port}"
+    )
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        index = workers.pop(pid, None)
+        if index is not None and not stopping:
+            logger.warning(f"Воркер {index} (pid {pid}) завершился со статусом {status}, перезапуск")
+            spawn(index)
+    sock.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
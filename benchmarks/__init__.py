@@ -0,0 +1,7 @@
+"""Набор бенчмарков сервиса предсказания.
+
+python -m benchmarks --suites micro e2e --output results.json --baseline baseline.json
+
+micro - normalize/denormalize, кинематика, Predictor.predict по размерам батча и моделям 64/128;
+e2e   - нагрузка через ASGI-клиент FastAPI в процессе или на локальный uvicorn.
+"""
@@ -0,0 +1,80 @@
+import argparse
+import os
+import platform
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+# Модель загружается при импорте app.api.predict, поэтому окружение задается заранее
+os.environ.setdefault("MODEL_PATH", "app/models/GRU_With_Mix_Dataset_MaxNorm/mix_pos_max_norm_64.pth")
+# Стоимость логирования измеряет benchmarks/bench_logging.py; здесь записи на каждый запрос не пишутся
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from benchmarks import baseline, e2e, micro
+
+SUITES = ("micro", "e2e")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Бенчмарки сервиса предсказания")
+    parser.add_argument("--suites", nargs="+", choices=SUITES, default=list(SUITES))
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=list(micro.BATCH_SIZES))
+    parser.add_argument("--models", nargs="+", default=list(micro.MODELS))
+    parser.add_argument("--repeat", type=int, default=200, help="вызовов на микробенчмарк")
+    parser.add_argument("--requests", type=int, default=500, help="запросов на e2e-сценарий")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--scenarios", nargs="+", choices=list(e2e.SCENARIOS), default=list(e2e.SCENARIOS))
+    parser.add_argument("--target", choices=("asgi", "uvicorn", "url"), default="asgi",
+                        help="asgi - в процессе, uvicorn - локальный сервер, url - уже запущенный сервис")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--output", help="сохранить результаты в JSON")
+    parser.add_argument("--baseline", help="JSON с базовыми результатами для сравнения")
+    parser.add_argument("--threshold", type=float, default=0.2, help="допустимый рост метрики (0.2 = +20%%)")
+    parser.add_argument("--metric", default="p50_ms", choices=("p50_ms", "p95_ms", "p99_ms", "mean_ms"))
+    args = parser.parse_args()
+
+    results = {}
+    if "micro" in args.suites:
+        results.update(micro.run(args.batch_sizes, args.models, args.repeat))
+    if "e2e" in args.suites:
+        if args.target == "asgi":
+            results.update(e2e.run_asgi(args.scenarios, args.requests, args.concurrency))
+        elif args.target == "uvicorn":
+            results.update(e2e.run_uvicorn(args.scenarios, args.requests, args.concurrency))
+        else:
+            results.update(e2e.run_http(args.url, args.scenarios, args.requests, args.concurrency))
+
+    for name, row in results.items():
+        print(f"{name:<40} p50={row['p50_ms']:.3f} мс  p95={row['p95_ms']:.3f} мс  "
+              f"p99={row['p99_ms']:.3f} мс  {row['throughput']:.0f}/с")
+
+    if args.output:
+        from app.core.config import settings
+        report = {
+            "meta": {
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "cpu_count": os.cpu_count(),
+                "backend": settings.BACKEND,
+            },
+            "results": results,
+        }
+        baseline.save(args.output, report)
+
+    if args.baseline:
+        rows = baseline.compare(results, baseline.load(args.baseline)["results"], args.threshold, args.metric)
+        regressions = [row for row in rows if row[4]]
+        for name, reference, current, ratio, regressed in rows:
+            mark = "РЕГРЕССИЯ" if regressed else "ok"
+            print(f"{name:<40} {reference:.3f} -> {current:.3f} мс ({ratio:.2f}x) {mark}")
+        if regressions:
+            print(f"Регрессий: {len(regressions)} (порог +{args.threshold:.0%} по {args.metric})")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
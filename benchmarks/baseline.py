@@ -0,0 +1,28 @@
+import json
+
+
+def save(path: str, report: dict):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(results: dict, baseline: dict, threshold: float = 0.2, metric: str = "p50_ms") -> list:
+    """Сравнить результаты с базовыми.
+
+    Регрессия - рост метрики больше чем на threshold (0.2 = +20%).
+    Бенчмарки, которых нет в одном из отчетов, пропускаются.
+    Возвращает список (имя, базовое значение, текущее, отношение, регрессия) для общих бенчмарков.
+    """
+    rows = []
+    for name, current in results.items():
+        reference = baseline.get(name)
+        if reference is None or not reference.get(metric):
+            continue
+        ratio = current[metric] / reference[metric]
+        rows.append((name, reference[metric], current[metric], ratio, ratio > 1.0 + threshold))
+    return rows
@@ -0,0 +1,96 @@
+"""Сравнение бэкендов инференса: время холодного старта и задержка по размерам батча.
+
+python benchmarks/bench_backends.py [--backends torch numpy onnx] [--batch-sizes 1 8 64 256]
+
+Бэкенды, которые не удалось загрузить (например, без onnxruntime), пропускаются.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.models.predictor import BACKENDS, Predictor, load_backend
+
+DEFAULT_MODEL = "app/models/GRU_With_Mix_Dataset_MaxNorm/mix_pos_max_norm_64.pth"
+
+STARTUP_SNIPPET = """
+import time
+start = time.perf_counter()
+from app.models.predictor import load_model
+load_model()
+print(time.perf_counter() - start)
+"""
+
+
+def measure_startup(backend: str, model_path: str, hidden: int, layers: int) -> float:
+    """Время import + load_model в чистом процессе, секунды"""
+    env = dict(os.environ, BACKEND=backend, MODEL_PATH=model_path, HIDDEN_SIZE=str(hidden), NUM_LAYERS=str(layers))
+    result = subprocess.run(
+        [sys.executable, "-c", STARTUP_SNIPPET], cwd=ROOT, env=env,
+        capture_output=True, text=True, check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def measure_latency(predictor, batch_size: int, repeat: int) -> dict:
+    x = np.random.default_rng(0).normal(size=(batch_size, 5, 3)).astype(np.float32)
+    for _ in range(10):
+        predictor.predict(x)
+    timings = np.empty(repeat)
+    for i in range(repeat):
+        start = time.perf_counter()
+        predictor.predict(x)
+        timings[i] = time.perf_counter() - start
+    return {
+        "batch_size": batch_size,
+        "p50_ms": float(np.percentile(timings, 50) * 1000),
+        "p99_ms": float(np.percentile(timings, 99) * 1000),
+        "windows_per_s": float(batch_size / timings.mean()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS))
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 8, 64, 256])
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--hidden", type=int, default=64)
+    parser.add_argument("--layers", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    eager = load_backend("torch", args.model, args.hidden, args.layers)
+    x = np.random.default_rng(0).normal(size=(64, 5, 3)).astype(np.float32)
+    reference = eager.forward(x)
+
+    report = {}
+    for backend in args.backends:
+        # Бэкенд берется как есть, без отката на eager, ошибка просто записывается в отчет
+        try:
+            predictor = Predictor(load_backend(backend, args.model, args.hidden, args.layers))
+        except Exception as e:
+            print(f"{backend}: пропущен ({e})")
+            continue
+        report[backend] = {
+            "max_abs_error": float(np.abs(predictor.backend.forward(x) - reference).max()),
+            "startup_s": measure_startup(backend, args.model, args.hidden, args.layers),
+            "latency": [measure_latency(predictor, b, args.repeat) for b in args.batch_sizes],
+        }
+        print(f"{backend}: старт {report[backend]['startup_s']:.3f} с, "
+              f"ошибка относительно eager {report[backend]['max_abs_error']:.2e}")
+        for row in report[backend]["latency"]:
+            print(f"  batch={row['batch_size']:>4}  p50={row['p50_ms']:.3f} мс  "
+                  f"p99={row['p99_ms']:.3f} мс  {row['windows_per_s']:.0f} окон/с")
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Поиск конфликтов: равномерная сетка против полного перебора пар.
+
+python benchmarks/bench_conflicts.py [--sizes 1000 5000 10000 20000] [--horizon 10]
+
+Флот равномерно распределен по квадрату с постоянной плотностью дронов, поэтому
+число конфликтов растет линейно, а полный перебор - квадратично. Перебор
+запускается только до --brute-max дронов.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.core.conflicts import brute_force_conflicts, find_conflicts
+
+
+def make_fleet(n: int, horizon: int, density: float, seed: int = 0) -> np.ndarray:
+    """(n, horizon, 3) траектории на квадрате площадью n / density"""
+    rng = np.random.default_rng(seed)
+    side = np.sqrt(n / density)
+    xy = rng.uniform(0, side, size=(n, 1, 2)) + np.cumsum(rng.normal(0, 2, size=(n, horizon, 2)), axis=1)
+    t = np.broadcast_to(np.arange(horizon, dtype=np.float64)[None, :, None], (n, horizon, 1))
+    return np.concatenate([xy, t], axis=-1)
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 5000, 10000, 20000])
+    parser.add_argument("--horizon", type=int, default=10)
+    parser.add_argument("--separation", type=float, default=10.0)
+    parser.add_argument("--density", type=float, default=1e-3, help="дронов на единицу площади")
+    parser.add_argument("--brute-max", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    report = []
+    for n in args.sizes:
+        paths = make_fleet(n, args.horizon, args.density)
+        conflicts = find_conflicts(paths, args.separation)
+        row = {
+            "drones": n,
+            "conflicts": int(len(conflicts[0])),
+            "grid_ms": best_of(lambda: find_conflicts(paths, args.separation), args.repeat) * 1000,
+        }
+        if n <= args.brute_max:
+            brute = brute_force_conflicts(paths, args.separation)
+            assert all(np.allclose(a, b) for a, b in zip(conflicts, brute)), "результаты сетки и перебора различаются"
+            row["brute_ms"] = best_of(lambda: brute_force_conflicts(paths, args.separation), 1) * 1000
+        report.append(row)
+        brute_text = f"  перебор {row['brute_ms']:.1f} мс" if "brute_ms" in row else ""
+        print(f"N={n:>6}  конфликтов {row['conflicts']:>5}  сетка {row['grid_ms']:.1f} мс{brute_text}")
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
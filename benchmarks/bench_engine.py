@@ -0,0 +1,103 @@
+"""Путь нейросети одиночного запроса: бэкенды torch, numpy и engine (InferenceEngine).
+
+python benchmarks/bench_engine.py [--backends torch numpy engine] [--batch-sizes 1 8 64] [--repeat 2000]
+
+Для каждого бэкенда и размера батча измеряется путь как в _neural_predict:
+normalize -> Predictor.predict -> denormalize на окнах float64. Бэкенды вызываются по очереди
+внутри одного цикла, чтобы дрейф частоты и шум соседей по машине делились между ними поровну.
+Выводятся p50/p99 задержки и память, выделенная за вызов: NumPy - пик по tracemalloc,
+torch - сумма выделений по профилировщику torch.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.core.utils import normalize, denormalize
+from app.models.predictor import Predictor, load_backend
+from benchmarks.stats import summarize
+
+DEFAULT_MODEL = "app/models/GRU_With_Mix_Dataset_MaxNorm/mix_pos_max_norm_64.pth"
+
+
+def allocated_bytes(fn, calls: int = 20) -> float:
+    """Память, выделенная за один вызов fn(): пик NumPy (tracemalloc) плюс выделения torch"""
+    fn()
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        fn()
+        total = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+    if "torch" in sys.modules:
+        from torch.profiler import ProfilerActivity, profile
+
+        with profile(activities=[ProfilerActivity.CPU], profile_memory=True) as prof:
+            for _ in range(calls):
+                fn()
+        total += sum(max(event.self_cpu_memory_usage, 0) for event in prof.events()) / calls
+    return total
+
+
+def interleaved(calls: dict, repeat: int, warmup: int = 20) -> dict:
+    """Задержки (с) каждой функции; функции вызываются по очереди в одном цикле"""
+    timings = {name: np.empty(repeat) for name in calls}
+    for _ in range(warmup):
+        for fn in calls.values():
+            fn()
+    for i in range(repeat):
+        for name, fn in calls.items():
+            start = time.perf_counter()
+            fn()
+            timings[name][i] = time.perf_counter() - start
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--backends", nargs="+", default=["torch", "numpy", "engine"])
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 8, 64])
+    parser.add_argument("--seq-len", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    predictors = {name: Predictor(load_backend(name, args.model)) for name in args.backends}
+    reference = args.backends[0]
+    report = []
+    for batch_size in args.batch_sizes:
+        # Окна как в сервисе: float64 в координатах поля
+        rng = np.random.default_rng(batch_size)
+        windows = rng.uniform(-5, 5, size=(batch_size, 1, 3)) + np.cumsum(rng.normal(0, 0.1, size=(batch_size, args.seq_len, 3)), axis=1)
+        calls = {
+            name: (lambda predictor=predictor: denormalize(predictor.predict(normalize(windows))))
+            for name, predictor in predictors.items()
+        }
+        outputs = {name: fn() for name, fn in calls.items()}
+        timings = interleaved(calls, args.repeat)
+        for name, fn in calls.items():
+            row = dict(
+                summarize(timings[name], batch_size),
+                backend=name,
+                batch_size=batch_size,
+                allocated_bytes=allocated_bytes(fn),
+                max_error=float(np.abs(outputs[name] - outputs[reference]).max()),
+            )
+            report.append(row)
+            print(f"b={batch_size:>3} {name:>7}: p50 {row['p50_ms']:.3f} мс  p99 {row['p99_ms']:.3f} мс  "
+                  f"выделено {row['allocated_bytes'] / 1024:.1f} КБ  отклонение от {reference} {row['max_error']:.1e}")
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
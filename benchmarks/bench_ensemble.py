@@ -0,0 +1,65 @@
+"""Ансамбль pos + vel: объединенный проход против одной модели и двух проходов подряд.
+
+python benchmarks/bench_ensemble.py [--size 64] [--batch-sizes 1 8 16 64 256]
+
+Для каждого размера батча - медианная задержка (мс) одной модели позиций, двух моделей
+подряд и объединенной блочно-диагональной модели ансамбля, а также отношение объединенной
+модели к одной. По отношениям выбирается ENSEMBLE_FUSED_MAX_BATCH.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.core.config import settings
+from app.models.ensemble import load_ensemble, velocities
+from app.models.predictor import load_model
+from app.models.registry import SHIPPED_MODELS
+
+
+def median_ms(fn, repeat: int) -> float:
+    fn()  # прогрев
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", default="64", choices=["64", "128"], help="размер моделей ансамбля")
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 8, 16, 64, 256])
+    parser.add_argument("--repeat", type=int, default=300)
+    args = parser.parse_args()
+
+    paths = {kind: os.path.join(ROOT, settings.MODELS_DIR, SHIPPED_MODELS[f"{kind}_{args.size}"]) for kind in ("pos", "vel")}
+    pos, vel = load_model(paths["pos"]), load_model(paths["vel"])
+    ensemble = load_ensemble([("pos", paths["pos"]), ("vel", paths["vel"])], fused_max_batch=max(args.batch_sizes))
+
+    report = []
+    for batch_size in args.batch_sizes:
+        x = np.random.default_rng(batch_size).normal(size=(batch_size, 5, 3)).astype(np.float32)
+        row = {
+            "batch_size": batch_size,
+            "single_ms": median_ms(lambda: pos.predict(x), args.repeat),
+            "sequential_ms": median_ms(lambda: (pos.predict(x), vel.predict(velocities(x))), args.repeat),
+            "fused_ms": median_ms(lambda: ensemble.predict(x), args.repeat),
+        }
+        row["fused_vs_single"] = row["fused_ms"] / row["single_ms"]
+        report.append(row)
+        print(f"b={batch_size:>4}  одна {row['single_ms']:.3f} мс  две подряд {row['sequential_ms']:.3f} мс  "
+              f"объединенная {row['fused_ms']:.3f} мс  ({row['fused_vs_single']:.2f}x одной)")
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Задержка обработчика predict при разных настройках логирования.
+
+Режимы: sync (обработчики в потоке запроса), async (очередь + фоновый поток записи),
+off (уровень WARNING, payload не строится). Лог пишется во временный каталог,
+stdout обработчика перенаправлен в /dev/null.
+
+python benchmarks/bench_logging.py [--requests 2000]
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+# Модель загружается при импорте app.api.predict, поэтому окружение задается заранее
+os.environ.setdefault("MODEL_PATH", "app/models/GRU_With_Mix_Dataset_MaxNorm/mix_pos_max_norm_64.pth")
+os.environ.setdefault("SCHEDULER_ENABLED", "false")
+
+from app.api.predict import predict
+from app.core.logs import setup_logging
+from app.schemas.flight import SequenceIn
+
+MODES = {
+    "sync": {"level": "INFO", "use_async": False},
+    "async": {"level": "INFO", "use_async": True},
+    "off": {"level": "WARNING", "use_async": True},
+}
+
+
+def run_mode(mode: str, requests: int, log_dir: str) -> dict:
+    seq = SequenceIn(points=[{"x": float(i), "y": float(i * i), "t": float(i)} for i in range(5)])
+    stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+    try:
+        listener = setup_logging(log_file=os.path.join(log_dir, f"{mode}.log"), force=True, **MODES[mode])
+        for _ in range(50):
+            predict(seq)
+        timings = np.empty(requests)
+        for i in range(requests):
+            start = time.perf_counter()
+            predict(seq)
+            timings[i] = time.perf_counter() - start
+        if listener is not None:
+            listener.stop()
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    return {
+        "mode": mode,
+        "mean_us": float(timings.mean() * 1e6),
+        "p50_us": float(np.percentile(timings, 50) * 1e6),
+        "p99_us": float(np.percentile(timings, 99) * 1e6),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--modes", nargs="+", default=list(MODES))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as log_dir:
+        results = [run_mode(mode, args.requests, log_dir) for mode in args.modes]
+    logging.getLogger().handlers.clear()
+
+    for row in results:
+        print(f"{row['mode']:>6}: mean={row['mean_us']:.1f} мкс  p50={row['p50_us']:.1f} мкс  p99={row['p99_us']:.1f} мкс")
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Масштабирование python -m app.serve по числу воркеров и память на воркер.
+
+python benchmarks/bench_workers.py [--workers 1 2 4] [--scenario batch] [--requests 400]
+
+Для каждого числа воркеров поднимается app.serve (по потоку torch на воркер, с привязкой
+к ядрам), нагрузку дают столько же клиентских процессов (по --concurrency соединений).
+Выводятся пропускная способность (окон/с), эффективность масштабирования относительно
+одного воркера и память: RSS и PSS (доля общих страниц делится между процессами) воркеров.
+Линейный рост возможен только при числе свободных ядер не меньше воркеров + клиентов.
+"""
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from multiprocessing import Pool
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.e2e import SCENARIOS, run_http
+
+
+def _memory_kb(pid: int) -> dict:
+    """RSS и PSS процесса из /proc/<pid>/smaps_rollup, кБ"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                values[key.lower()] = int(rest.split()[0])
+    return values
+
+
+def _client(args):
+    url, scenario, requests, concurrency = args
+    row = next(iter(run_http(url, [scenario], requests, concurrency).values()))
+    windows = row["calls"] * SCENARIOS[scenario][2]
+    return windows, windows / row["throughput"], row["errors"]
+
+
+def run(workers: int, scenario: str, requests: int, concurrency: int, port: int) -> dict:
+    url = f"http://127.0.0.1:{port}"
+    env = dict(os.environ, LOG_LEVEL="WARNING")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.serve", "--workers", str(workers), "--threads", "1", "--affinity",
+         "--port", str(port)],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 120
+        while True:
+            try:
+                if httpx.get(f"{url}/predict/health").status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            if server.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError("app.serve не запустился")
+            time.sleep(0.2)
+
+        with Pool(workers) as pool:
+            jobs = [(url, scenario, requests // workers, concurrency)] * workers
+            results = pool.map(_client, jobs)
+        windows = sum(r[0] for r in results)
+        wall = max(r[1] for r in results)
+
+        children = subprocess.run(["pgrep", "-P", str(server.pid)], capture_output=True, text=True).stdout.split()
+        memory = [_memory_kb(int(pid)) for pid in children]
+        return {
+            "workers": workers,
+            "windows_per_s": windows / wall,
+            "errors": sum(r[2] for r in results),
+            "worker_rss_mb": sum(m["rss"] for m in memory) / 1024 / max(len(memory), 1),
+            "worker_pss_mb": sum(m["pss"] for m in memory) / 1024 / max(len(memory), 1),
+            "parent_pss_mb": _memory_kb(server.pid)["pss"] / 1024,
+        }
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4])
+    parser.add_argument("--scenario", default="batch", choices=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=4, help="соединений на клиентский процесс")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    print(f"Ядер доступно: {len(os.sched_getaffinity(0))}")
+    report = []
+    for workers in args.workers:
+        row = run(workers, args.scenario, args.requests, args.concurrency, args.port)
+        row["scaling"] = row["windows_per_s"] / (report[0]["windows_per_s"] * workers / report[0]["workers"]) if report else 1.0
+        report.append(row)
+        print(f"воркеров {workers}: {row['windows_per_s']:.0f} окон/с, эффективность {row['scaling']:.2f}, "
+              f"RSS {row['worker_rss_mb']:.0f} МБ / PSS {row['worker_pss_mb']:.0f} МБ на воркер, "
+              f"родитель PSS {row['parent_pss_mb']:.0f} МБ")
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+import numpy as np
+
+from benchmarks.stats import summarize
+
+POINTS = [{"x": 10.0 + i * 3.0, "y": -4.0 + i * 1.5, "t": float(i)} for i in range(5)]
+BATCH = 64
+RAW_WINDOW = np.array([[p["x"], p["y"], p["t"]] for p in POINTS], dtype="<f4").tobytes()
+
+# Эндпоинт -> (путь, тело запроса, окон в запросе)
+SCENARIOS = {
+    "predict": ("/predict/", {"points": POINTS}, 1),
+    "batch": ("/predict/batch", {"items": [{"points": POINTS}] * BATCH}, BATCH),
+    "horizon": ("/predict/horizon", {"points": POINTS, "horizon": 10}, 1),
+    "predict_raw": ("/predict/raw", RAW_WINDOW, 1),
+    "batch_raw": ("/predict/batch/raw", RAW_WINDOW * BATCH, BATCH),
+}
+RAW_HEADERS = {"content-type": "application/octet-stream"}
+
+
+async def _load(client: httpx.AsyncClient, path: str, body: dict, requests: int, concurrency: int):
+    """Замкнутый генератор нагрузки: concurrency клиентов шлют запросы друг за другом"""
+    timings = []
+    errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            if isinstance(body, bytes):
+                response = await client.post(path, content=body, headers=RAW_HEADERS)
+            else:
+                response = await client.post(path, json=body)
+            timings.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return timings, errors, time.perf_counter() - start
+
+
+async def _run_scenarios(client, scenarios, requests: int, concurrency: int, target: str) -> dict:
+    results = {}
+    for name in scenarios:
+        path, body, windows = SCENARIOS[name]
+        await _load(client, path, body, min(20, requests), 1)  # прогрев
+        timings, errors, wall = await _load(client, path, body, requests, concurrency)
+        row = summarize(timings, windows, wall)
+        row["errors"] = errors
+        results[f"e2e.{target}.{name}[c={concurrency}]"] = row
+    return results
+
+
+def run_asgi(scenarios=tuple(SCENARIOS), requests: int = 500, concurrency: int = 8) -> dict:
+    """Нагрузка через ASGI-транспорт httpx, без сети и отдельного процесса"""
+    from app.main import app
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            return await _run_scenarios(client, scenarios, requests, concurrency, "asgi")
+
+    return asyncio.run(main())
+
+
+def run_http(url: str, scenarios=tuple(SCENARIOS), requests: int = 500, concurrency: int = 8) -> dict:
+    """Нагрузка на уже запущенный сервис по HTTP"""
+    async def main():
+        async with httpx.AsyncClient(base_url=url, timeout=30.0) as client:
+            return await _run_scenarios(client, scenarios, requests, concurrency, "http")
+
+    return asyncio.run(main())
+
+
+def run_uvicorn(scenarios=tuple(SCENARIOS), requests: int = 500, concurrency: int = 8, port: int = 8765) -> dict:
+    """Поднять локальный uvicorn в отдельном процессе, нагрузить и остановить"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=root, stdout=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                if httpx.get(f"{url}/predict/health").status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            if server.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError("uvicorn не запустился")
+            time.sleep(0.2)
+        results = run_http(url, scenarios, requests, concurrency)
+    finally:
+        server.terminate()
+        server.wait()
+    return {key.replace("e2e.http.", "e2e.uvicorn."): value for key, value in results.items()}
@@ -0,0 +1,54 @@
+import os
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.kinematics import kinematic_predict
+from app.core.utils import normalize, denormalize
+from app.models.predictor import load_model
+from app.models.registry import SHIPPED_MODELS
+
+from benchmarks.stats import summarize, time_calls
+
+BATCH_SIZES = (1, 8, 64, 256, 1024)
+MODELS = ("pos_64", "pos_128")
+# Длины окна для зависимости времени прохода от длины истории (при батче SEQ_LEN_BATCH)
+SEQ_LENS = (5, 10, 20, 30)
+SEQ_LEN_BATCH = 64
+
+
+def _windows(batch_size: int, seq_len: int = 5) -> np.ndarray:
+    # Реалистичные траектории: координаты порядка сотен, t растет по шагам
+    rng = np.random.default_rng(batch_size)
+    start = rng.uniform(-500, 500, size=(batch_size, 1, 3))
+    steps = rng.normal(0, 5, size=(batch_size, seq_len, 3))
+    steps[..., 2] = 1.0
+    return start + np.cumsum(steps, axis=1)
+
+
+def run(batch_sizes=BATCH_SIZES, models=MODELS, repeat: int = 200) -> dict:
+    """Микробенчмарки отдельных стадий; пропускная способность - окон/с"""
+    results = {}
+    for batch_size in batch_sizes:
+        windows = _windows(batch_size)
+        normed = normalize(windows).astype(np.float32)
+        outputs = normed[:, -1]
+        stages = {
+            "normalize": lambda: normalize(windows),
+            "denormalize": lambda: denormalize(outputs),
+            "kinematic": lambda: kinematic_predict(windows),
+        }
+        for stage, fn in stages.items():
+            results[f"micro.{stage}[b={batch_size}]"] = summarize(time_calls(fn, repeat), batch_size)
+
+    for name in models:
+        predictor = load_model(os.path.join(settings.MODELS_DIR, SHIPPED_MODELS[name]))
+        for batch_size in batch_sizes:
+            normed = normalize(_windows(batch_size)).astype(np.float32)
+            timings = time_calls(lambda: predictor.predict(normed), repeat)
+            results[f"micro.predict.{name}[b={batch_size}]"] = summarize(timings, batch_size)
+        for seq_len in SEQ_LENS:
+            normed = normalize(_windows(SEQ_LEN_BATCH, seq_len)).astype(np.float32)
+            timings = time_calls(lambda: predictor.predict(normed), repeat)
+            results[f"micro.predict.{name}[b={SEQ_LEN_BATCH},len={seq_len}]"] = summarize(timings, SEQ_LEN_BATCH)
+    return results
@@ -0,0 +1,34 @@
+import time
+
+import numpy as np
+
+
+def summarize(timings, items_per_call: int = 1, wall_s: float = None) -> dict:
+    """p50/p95/p99 задержки (мс) и пропускная способность (элементов/с).
+
+    wall_s - общее время прогона; для конкурентной нагрузки пропускная способность
+    считается по нему, а не по сумме задержек.
+    """
+    timings = np.asarray(timings, dtype=np.float64)
+    total = float(timings.sum()) if wall_s is None else wall_s
+    p50, p95, p99 = np.percentile(timings, [50, 95, 99]) * 1000
+    return {
+        "calls": int(len(timings)),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "mean_ms": float(timings.mean() * 1000),
+        "throughput": float(len(timings) * items_per_call / total) if total > 0 else 0.0,
+    }
+
+
+def time_calls(fn, repeat: int, warmup: int = 10) -> np.ndarray:
+    """Задержка каждого из repeat вызовов fn() после прогрева, секунды"""
+    for _ in range(warmup):
+        fn()
+    timings = np.empty(repeat)
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings[i] = time.perf_counter() - start
+    return timings
@@ -0,0 +1,237 @@
+"""Оценка точности: кинематика, GRU и гибрид на наборе траекторий.
+
+Для каждого окна из 5 точек предсказываются следующие --horizon точек и считаются
+ADE (средняя ошибка по шагам), FDE (ошибка на последнем шаге) в плоскости XY
+и средняя абсолютная ошибка по осям x, y, t. Все вычисления векторизованы по окнам.
+
+Вес кинематики в гибриде подбирается перебором по сетке, глобально и, с --regimes K, отдельно
+для K режимов скорости (квантили скорости на последнем шаге окна). Перебор повторяет пару из
+/predict/: следующая точка кинематики объединяется с последним (10-м) шагом декодера
+(Predictor.predict) и сравнивается с истинной следующей точкой. Строки next_* - ошибки этой пары,
+остальные - траектория на --horizon шагов в паре шаг k с шагом k, как в /predict/horizon.
+С --write-config подобранные веса записываются в конфигурацию, которую сервис читает при старте.
+
+Данные: CSV со столбцами drone_id, x, y, t или .npy (N, 4); без --data используются
+синтетические траектории.
+
+python scripts/evaluate.py [--data flights.csv] [--model pos_64] [--regimes 3] [--write-config]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.core.config import BLEND_CONFIG, settings
+from app.core.kinematics import kinematic_rollout, window_speed
+from app.core.utils import normalize, denormalize
+from app.models.registry import SHIPPED_MODELS
+
+WINDOW = 5
+AXES = ("x", "y", "t")
+
+
+def synthetic_trajectories(drones: int = 2000, length: int = 60, seed: int = 0):
+    """Траектории с плавными поворотами, разгонами и шумом измерений: (ids, points)"""
+    rng = np.random.default_rng(seed)
+    speed = rng.uniform(0.5, 15.0, size=(drones, 1)) + np.cumsum(rng.normal(0, 0.2, size=(drones, length)), axis=1)
+    heading = rng.uniform(0, 2 * np.pi, size=(drones, 1)) + np.cumsum(
+        rng.normal(0, 0.05, size=(drones, length)) + rng.normal(0, 0.03, size=(drones, 1)), axis=1
+    )
+    speed = np.abs(speed)
+    start = rng.uniform(-1000, 1000, size=(drones, 1, 2))
+    xy = start + np.cumsum(np.stack([speed * np.cos(heading), speed * np.sin(heading)], axis=-1), axis=1)
+    xy += rng.normal(0, 0.1, size=xy.shape)
+    t = np.broadcast_to(np.arange(length, dtype=np.float64), (drones, length))
+    points = np.concatenate([xy, t[..., None]], axis=-1).reshape(-1, 3)
+    return np.repeat(np.arange(drones), length), points
+
+
+def load_trajectories(path: str):
+    """(ids, points) из CSV или .npy; точки одного дрона упорядочены по времени"""
+    if path.endswith(".npy"):
+        data = np.load(path)
+        return data[:, 0].astype(np.int64), data[:, 1:4].astype(np.float64)
+    import pandas as pd
+
+    frame = pd.read_csv(path, usecols=["drone_id", "x", "y", "t"])
+    return frame["drone_id"].to_numpy(), frame[["x", "y", "t"]].to_numpy(dtype=np.float64)
+
+
+def make_windows(ids: np.ndarray, points: np.ndarray, horizon: int):
+    """Окна (N, 5, 3) и истинные следующие точки (N, horizon, 3) по всем дронам"""
+    order = np.argsort(ids, kind="stable")
+    ids, points = ids[order], points[order]
+    span = WINDOW + horizon
+    if len(points) < span:
+        return np.empty((0, WINDOW, 3)), np.empty((0, horizon, 3))
+    # Отрезок допустим, если первая и последняя точки принадлежат одному дрону
+    starts = np.flatnonzero(ids[:-(span - 1)] == ids[span - 1:])
+    segments = sliding_window_view(points, span, axis=0).transpose(0, 2, 1)[starts]
+    return segments[:, :WINDOW], segments[:, WINDOW:]
+
+
+def neural_rollout(predictor, windows: np.ndarray, horizon: int, batch_size: int = 8192) -> np.ndarray:
+    out = np.empty((len(windows), horizon, 3))
+    for start in range(0, len(windows), batch_size):
+        part = normalize(windows[start:start + batch_size]).astype(np.float32)
+        out[start:start + batch_size] = denormalize(predictor.predict_sequence(part, horizon))
+    return out
+
+
+def neural_next(predictor, windows: np.ndarray, batch_size: int = 8192) -> np.ndarray:
+    """Выход нейросети для /predict/ (Predictor.predict, последний шаг декодера): (N, 3)"""
+    out = np.empty((len(windows), 3))
+    for start in range(0, len(windows), batch_size):
+        part = normalize(windows[start:start + batch_size]).astype(np.float32)
+        out[start:start + batch_size] = denormalize(predictor.predict(part))
+    return out
+
+
+def errors(prediction: np.ndarray, target: np.ndarray) -> dict:
+    """ADE/FDE в плоскости XY и MAE по осям"""
+    diff = prediction - target
+    distance = np.hypot(diff[..., 0], diff[..., 1])  # (N, horizon)
+    mae = np.abs(diff).mean(axis=(0, 1))
+    return {
+        "ade": float(distance.mean()),
+        "fde": float(distance[:, -1].mean()),
+        **{f"mae_{axis}": float(value) for axis, value in zip(AXES, mae)},
+    }
+
+
+def sweep(kinematic: np.ndarray, neural: np.ndarray, target: np.ndarray, grid: np.ndarray) -> np.ndarray:
+    """ADE гибрида для каждого веса кинематики из grid: (len(grid),)"""
+    # hybrid - target = (neural - target) + w * (kinematic - neural)
+    base = (neural - target)[..., :2]
+    delta = (kinematic - neural)[..., :2]
+    return np.array([np.linalg.norm(base + w * delta, axis=-1).mean() for w in grid])
+
+
+def fit_regimes(kinematic, neural, target, speeds, grid, regimes: int):
+    """Границы скоростей (квантили) и лучший вес кинематики для каждого режима"""
+    bins = np.quantile(speeds, np.linspace(0, 1, regimes + 1)[1:-1])
+    regime = np.searchsorted(bins, speeds)
+    weights = []
+    for k in range(regimes):
+        mask = regime == k
+        if not mask.any():
+            weights.append(settings.KINEMATIC_WEIGHT)
+            continue
+        weights.append(float(grid[np.argmin(sweep(kinematic[mask], neural[mask], target[mask], grid))]))
+    return bins.tolist(), weights
+
+
+def evaluate(predictor, windows, target, grid, regimes: int = 1) -> dict:
+    horizon = target.shape[1]
+    start = time.perf_counter()
+    kinematic = kinematic_rollout(windows, horizon)
+    kinematic_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    neural = neural_rollout(predictor, windows, horizon)
+    next_neural = neural_next(predictor, windows)[:, None]
+    neural_s = time.perf_counter() - start
+    # Там, где нейросеть выдала нечисловой результат, гибрид - только кинематика
+    valid = np.isfinite(neural).all(axis=(1, 2)) & np.isfinite(next_neural).all(axis=(1, 2))
+    neural = np.where(valid[:, None, None], neural, kinematic)
+    next_kinematic, next_target = kinematic[:, :1], target[:, :1]
+    next_neural = np.where(valid[:, None, None], next_neural, next_kinematic)
+
+    # Веса подбираются для пары из /predict/ (следующая точка кинематики и последний шаг декодера)
+    start = time.perf_counter()
+    ade = sweep(next_kinematic, next_neural, next_target, grid)
+    best = float(grid[np.argmin(ade)])
+    speeds = window_speed(windows)
+    bins, regime_weights = (
+        fit_regimes(next_kinematic, next_neural, next_target, speeds, grid, regimes) if regimes > 1 else ([], [])
+    )
+    sweep_s = time.perf_counter() - start
+
+    def hybrid(weight, kinematic=kinematic, neural=neural):
+        return weight * kinematic + (1.0 - weight) * neural
+
+    def next_hybrid(weight):
+        return hybrid(weight, next_kinematic, next_neural)
+
+    report = {
+        "windows": len(windows),
+        "horizon": horizon,
+        "neural_fallbacks": int((~valid).sum()),
+        "kinematic": errors(kinematic, target),
+        "gru": errors(neural, target),
+        f"hybrid_w={settings.KINEMATIC_WEIGHT:g}": errors(hybrid(settings.KINEMATIC_WEIGHT), target),
+        f"hybrid_w={best:g}": errors(hybrid(best), target),
+        "next_kinematic": errors(next_kinematic, next_target),
+        "next_gru": errors(next_neural, next_target),
+        f"next_hybrid_w={settings.KINEMATIC_WEIGHT:g}": errors(next_hybrid(settings.KINEMATIC_WEIGHT), next_target),
+        f"next_hybrid_w={best:g}": errors(next_hybrid(best), next_target),
+        "sweep": {f"{w:g}": float(value) for w, value in zip(grid, ade)},
+        "config": {"KINEMATIC_WEIGHT": best, "BLEND_SPEED_BINS": bins, "BLEND_SPEED_WEIGHTS": regime_weights},
+        "windows_per_s": {
+            "kinematic": len(windows) / kinematic_s,
+            "gru": len(windows) / neural_s,
+            "total": len(windows) / (kinematic_s + neural_s + sweep_s),
+        },
+    }
+    if bins:
+        regime_weight = np.asarray(regime_weights)[np.searchsorted(bins, speeds)][:, None, None]
+        report["next_hybrid_regimes"] = errors(next_hybrid(regime_weight), next_target)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", help="CSV или .npy с траекториями; без него - синтетические")
+    parser.add_argument("--synthetic-drones", type=int, default=2000)
+    parser.add_argument("--model", default="pos_64", help=f"{', '.join(SHIPPED_MODELS)} или путь к .pth")
+    parser.add_argument("--horizon", type=int, default=10)
+    parser.add_argument("--grid", type=int, default=21, help="число весов в сетке на [0, 1]")
+    parser.add_argument("--regimes", type=int, default=1, help="число режимов скорости (1 - один общий вес)")
+    parser.add_argument("--write-config", nargs="?", const=BLEND_CONFIG, help=f"записать веса (по умолчанию {BLEND_CONFIG})")
+    parser.add_argument("--output", help="сохранить полный отчет в JSON")
+    args = parser.parse_args()
+
+    from app.models.predictor import load_model
+
+    model_path = args.model
+    if model_path in SHIPPED_MODELS:
+        model_path = os.path.join(ROOT, settings.MODELS_DIR, SHIPPED_MODELS[model_path])
+    predictor = load_model(model_path)
+
+    ids, points = load_trajectories(args.data) if args.data else synthetic_trajectories(args.synthetic_drones)
+    windows, target = make_windows(ids, points, args.horizon)
+    report = evaluate(predictor, windows, target, np.linspace(0.0, 1.0, args.grid), args.regimes)
+
+    print(f"Окон: {report['windows']}, горизонт: {report['horizon']}, откатов на кинематику: {report['neural_fallbacks']}")
+    for name in [key for key in report if isinstance(report[key], dict) and "ade" in report[key]]:
+        row = report[name]
+        axes = "  ".join(f"{axis}={row[f'mae_{axis}']:.3f}" for axis in AXES)
+        print(f"{name:>20}: ADE={row['ade']:.3f}  FDE={row['fde']:.3f}  MAE {axes}")
+    config = report["config"]
+    print(f"Лучший вес кинематики: {config['KINEMATIC_WEIGHT']:g}")
+    if config["BLEND_SPEED_BINS"]:
+        print(f"По режимам скорости: границы {np.round(config['BLEND_SPEED_BINS'], 3).tolist()}, "
+              f"веса {config['BLEND_SPEED_WEIGHTS']}")
+    speed = report["windows_per_s"]
+    print(f"Окон/с: кинематика {speed['kinematic']:.0f}, GRU {speed['gru']:.0f}, всего {speed['total']:.0f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    if args.write_config:
+        if os.path.dirname(args.write_config):
+            os.makedirs(os.path.dirname(args.write_config), exist_ok=True)
+        with open(args.write_config, "w", encoding="utf-8") as f:
+            json.dump(config, f, indent=2)
+        print(f"Веса записаны в {args.write_config}")
+
+
+if __name__ == "__main__":
+    main()
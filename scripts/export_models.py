@@ -0,0 +1,78 @@
+"""Экспорт оптимизированных артефактов из .pth чекпоинтов.
+
+Для каждого чекпоинта рядом с ним создаются:
+  *.npz                     - веса для numpy-бэкенда
+  *.torchscript.pt          - TorchScript (script + freeze)
+  *.int8.pt                 - динамическая int8-квантизация GRU/Linear
+  *.encoder.onnx, *.decoder.onnx - графы для ONNX Runtime (если установлен onnxruntime)
+
+Каждый артефакт проверяется против eager модели с допуском из TOLERANCES.
+
+python scripts/export_models.py [чекпоинты.pth ...]
+"""
+import argparse
+import glob
+import os
+import sys
+
+import torch
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.models.numpy_backend import convert_checkpoint, load_numpy_backend
+from app.models.onnx_backend import ENCODER_SUFFIX, DECODER_SUFFIX, export_onnx, load_onnx_backend
+from app.models.predictor import TOLERANCES, verify_backend
+from app.models.torch_backend import (
+    QUANTIZED_SUFFIX, TORCHSCRIPT_SUFFIX, TorchBackend, build_model, load_torch_backend, quantize_model, script_model
+)
+
+DEFAULT_MODELS = os.path.join(ROOT, "app", "models", "GRU_With_Mix_Dataset_MaxNorm", "*.pth")
+
+
+def export_checkpoint(model_path: str) -> bool:
+    stem = os.path.splitext(model_path)[0]
+    model = build_model(model_path)
+    eager = TorchBackend(model)
+    print(f"{os.path.basename(model_path)}: hidden={model.hidden_dim}, layers={model.gru1.num_layers}")
+
+    convert_checkpoint(model_path, stem + ".npz")
+    script_model(model).save(stem + TORCHSCRIPT_SUFFIX)
+    quantize_model(model).save(stem + QUANTIZED_SUFFIX)
+    backends = {
+        "numpy": lambda: load_numpy_backend(model_path),
+        "torchscript": lambda: load_torch_backend("torchscript", model_path),
+        "quantized": lambda: load_torch_backend("quantized", model_path),
+    }
+
+    try:
+        import onnxruntime  # noqa: F401
+        export_onnx(model, stem + ENCODER_SUFFIX, stem + DECODER_SUFFIX)
+        backends["onnx"] = lambda: load_onnx_backend(model_path)
+    except ImportError:
+        print("  onnx: пропущен, onnxruntime не установлен")
+
+    ok = True
+    for name, load in backends.items():
+        try:
+            error = verify_backend(load(), eager, TOLERANCES[name])
+            print(f"  {name}: ok, ошибка {error:.2e}")
+        except ValueError as e:
+            print(f"  {name}: FAIL, {e}")
+            ok = False
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("models", nargs="*", help="пути к .pth (по умолчанию все модели из app/models)")
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    models = args.models or sorted(glob.glob(DEFAULT_MODELS))
+    results = [export_checkpoint(path) for path in models]
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
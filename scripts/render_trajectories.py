@@ -0,0 +1,97 @@
+"""Пакетная отрисовка траекторий в PNG (тот же график, что POST /predict/render).
+
+Источники:
+  --capture FILE - файл записи трафика (CAPTURE_PATH): окно и записанное предсказание;
+  --json FILE    - список объектов как тело /predict/render ({"points": [...], "prediction": [...],
+                   "model": ..., "horizon": ..., "title": ...}); без prediction траектория
+                   считается моделью по концу трека, как в сервисе.
+Картинки пишутся в --out как <ключ>.png, где ключ - хэш содержимого (render_key):
+уже отрисованные файлы пропускаются, поэтому повторный запуск дорисовывает только новое.
+Отрисовка идет в пуле из --processes процессов (0 - в текущем процессе).
+
+python scripts/render_trajectories.py --capture capture.bin --out renders/ [--processes 4] [--limit 1000]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.core.render import Renderer, render_key
+
+
+def capture_items(path: str):
+    """(трек, предсказание, подпись) для каждой записи файла трафика"""
+    from app.core.capture import ENDPOINTS, read_capture
+
+    records, models = read_capture(path)
+    for record in records:
+        title = f"{ENDPOINTS[record['endpoint']]} #{record['request']} ({models[record['model']]})"
+        yield record["window"][:record["points"]].astype(np.float64), record["prediction"].astype(np.float64), title
+
+
+def json_items(path: str):
+    """(трек, предсказание, подпись) для объектов JSON-файла; недостающие предсказания считаются моделью"""
+    from app.api.render import _predict_path
+
+    with open(path) as f:
+        items = json.load(f)
+    for item in items:
+        track = np.array([[p["x"], p["y"], p["t"]] for p in item["points"]], dtype=np.float64)
+        if item.get("prediction"):
+            prediction = np.array([[p["x"], p["y"], p["t"]] for p in item["prediction"]], dtype=np.float64)
+        else:
+            prediction, _ = _predict_path(track, item.get("model"), item.get("horizon", 10))
+        yield track, prediction, item.get("title")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--capture")
+    source.add_argument("--json")
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--dpi", type=int, default=100)
+    parser.add_argument("--max-points", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    items = capture_items(args.capture) if args.capture else json_items(args.json)
+    pending, seen, skipped = [], set(), 0
+    for index, (track, prediction, title) in enumerate(items):
+        if args.limit is not None and index >= args.limit:
+            break
+        options = {"title": title, "dpi": args.dpi, "max_points": args.max_points}
+        key = render_key(track, prediction, **options)
+        if key in seen or os.path.exists(os.path.join(args.out, f"{key}.png")):
+            skipped += 1
+            continue
+        seen.add(key)
+        pending.append((key, track, prediction, title))
+
+    renderer = Renderer(args.processes)
+    start = time.perf_counter()
+    rendered = 0
+    try:
+        jobs = [(key, track, prediction, {"title": title}) for key, track, prediction, title in pending]
+        for key, png in renderer.render_many(jobs, dpi=args.dpi, max_points=args.max_points):
+            with open(os.path.join(args.out, f"{key}.png"), "wb") as f:
+                f.write(png)
+            rendered += 1
+    finally:
+        renderer.close()
+    elapsed = time.perf_counter() - start
+    rate = rendered / elapsed if elapsed > 0 else 0.0
+    print(f"Отрисовано {rendered}, пропущено {skipped} за {elapsed:.1f} с ({rate:.1f} картинок/с, "
+          f"процессов: {args.processes})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""Воспроизведение записанного трафика (CAPTURE_PATH) через сервис.
+
+Запросы из файла записи отправляются заново в исходном темпе (--speed 1), ускоренно
+(--speed 10 - в 10 раз быстрее) или подряд без пауз (--speed 0):
+  --target inprocess - прямой вызов обработчиков app/api/predict.py в пуле потоков,
+                       как их вызывает FastAPI;
+  --target url       - HTTP-запросы к уже запущенному сервису (--url).
+Пакетные запросы воспроизводятся целиком, с той же моделью и тем же эндпоинтом.
+
+Выводятся распределения задержки по эндпоинтам, отставание от расписания и сравнение
+предсказаний с записанными. --output сохраняет предсказания воспроизведения (N, 3) float32,
+--compare сверяет их побитово с сохраненными ранее (другая версия модели или бэкенда);
+при расхождении код выхода 1.
+
+python scripts/replay_capture.py capture.bin [--speed 5] [--output new.npy] [--compare old.npy]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.core.capture import ENDPOINTS, read_capture
+from benchmarks.stats import summarize
+
+PATHS = {
+    "predict": "/predict/",
+    "predict_raw": "/predict/raw",
+    "batch": "/predict/batch",
+    "batch_raw": "/predict/batch/raw",
+}
+RAW_HEADERS = {"content-type": "application/octet-stream"}
+
+
+def group_requests(records: np.ndarray):
+    """Границы запросов [(start, stop), ...]: окна одного запроса идут подряд с одним номером"""
+    if not len(records):
+        return []
+    bounds = np.flatnonzero(np.diff(records["request"].astype(np.int64)) != 0) + 1
+    starts = np.concatenate([[0], bounds])
+    stops = np.concatenate([bounds, [len(records)]])
+    return list(zip(starts.tolist(), stops.tolist()))
+
+
+def build_request(records: np.ndarray, models: list):
+    """(эндпоинт, модель, тело, query-параметры) для записей одного запроса"""
+    endpoint = ENDPOINTS[records["endpoint"][0]]
+    model = models[records["model"][0]]
+    windows = [record["window"][:record["points"]] for record in records]
+    if endpoint.endswith("_raw"):
+        body = np.ascontiguousarray(windows, dtype="<f4").tobytes()
+        return endpoint, model, body, {"model": model, "points": int(records["points"][0])}
+    items = [{"points": [{"x": x, "y": y, "t": t} for x, y, t in window.tolist()]} for window in windows]
+    body = items[0] if endpoint == "predict" else {"items": items}
+    return endpoint, model, dict(body, model=model), {}
+
+
+def parse_response(endpoint: str, content: bytes, count: int) -> np.ndarray:
+    """Предсказания (count, 3) float32 из ответа; ошибочные элементы пакета - NaN"""
+    if endpoint.endswith("_raw"):
+        return np.frombuffer(content, dtype="<f4").reshape(count, 3)
+    data = json.loads(content)
+    rows = data["results"] if endpoint == "batch" else [data]
+    return np.array([[np.nan if row.get(axis) is None else row[axis] for axis in "xyt"] for row in rows],
+                    dtype=np.float32)
+
+
+def _inprocess_call():
+    """Функция (endpoint, body, params) -> bytes, вызывающая обработчики напрямую"""
+    from app.api import predict as api
+    from app.schemas.flight import BatchSequenceIn, SequenceIn
+
+    def call(endpoint, body, params):
+        if endpoint == "predict":
+            return api.predict(SequenceIn(**body)).body
+        if endpoint == "batch":
+            return api.predict_batch(BatchSequenceIn(**body)).body
+        handler = api.predict_raw if endpoint == "predict_raw" else api.predict_batch_raw
+        return handler(body=body, model=params["model"], deadline_ms=None, points=params["points"]).body
+
+    return call
+
+
+async def replay(records: np.ndarray, models: list, target: str, url: str, speed: float, concurrency: int):
+    """Воспроизвести запросы; возвращает (предсказания (N, 3), задержки по эндпоинтам, отставания)"""
+    requests = group_requests(records)
+    predictions = np.full((len(records), 3), np.nan, dtype=np.float32)
+    latency = {endpoint: [] for endpoint in ENDPOINTS}
+    lags = []
+    loop = asyncio.get_running_loop()
+    limit = asyncio.Semaphore(concurrency)
+
+    if target == "inprocess":
+        call = _inprocess_call()
+        pool = ThreadPoolExecutor(concurrency)
+        client = None
+    else:
+        import httpx
+        client = httpx.AsyncClient(base_url=url, timeout=30.0)
+        pool = None
+
+    async def send(start: int, stop: int, scheduled: float):
+        endpoint, _, body, params = build_request(records[start:stop], models)
+        async with limit:
+            lags.append(max(time.perf_counter() - scheduled, 0.0))
+            begin = time.perf_counter()
+            if client is None:
+                content = await loop.run_in_executor(pool, call, endpoint, body, params)
+            elif endpoint.endswith("_raw"):
+                query = {key: value for key, value in params.items()}
+                response = await client.post(PATHS[endpoint], content=body, params=query, headers=RAW_HEADERS)
+                content = response.content
+            else:
+                content = (await client.post(PATHS[endpoint], json=body)).content
+            latency[endpoint].append(time.perf_counter() - begin)
+        predictions[start:stop] = parse_response(endpoint, content, stop - start)
+
+    t0 = records["ts"][0] if len(records) else 0.0
+    origin = time.perf_counter()
+    tasks = []
+    try:
+        for start, stop in requests:
+            if speed > 0:
+                scheduled = origin + (records["ts"][start] - t0) / speed
+                await asyncio.sleep(max(scheduled - time.perf_counter(), 0.0))
+                tasks.append(asyncio.create_task(send(start, stop, scheduled)))
+            else:
+                await send(start, stop, time.perf_counter())
+        await asyncio.gather(*tasks)
+    finally:
+        if client is not None:
+            await client.aclose()
+        if pool is not None:
+            pool.shutdown()
+    return predictions, latency, lags
+
+
+def identical(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Побитовое совпадение строк (NaN с одинаковыми битами тоже совпадает)"""
+    a, b = np.ascontiguousarray(a, dtype=np.float32), np.ascontiguousarray(b, dtype=np.float32)
+    return (a.view(np.uint32) == b.view(np.uint32)).all(axis=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("capture", help="файл записи трафика")
+    parser.add_argument("--target", default="inprocess", choices=["inprocess", "url"])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--speed", type=float, default=1.0, help="ускорение относительно записи; 0 - без пауз")
+    parser.add_argument("--concurrency", type=int, default=8, help="одновременных запросов")
+    parser.add_argument("--limit", type=int, help="воспроизвести только первые N записей")
+    parser.add_argument("--output", help="сохранить предсказания воспроизведения (.npy)")
+    parser.add_argument("--compare", help="сверить побитово с предсказаниями из --output другого прогона")
+    args = parser.parse_args()
+
+    records, models = read_capture(args.capture)
+    if args.limit:
+        records = records[:args.limit]
+    requests = group_requests(records)
+    duration = records["ts"][-1] - records["ts"][0] if len(records) else 0.0
+    print(f"Записей: {len(records)}, запросов: {len(requests)}, длительность записи: {duration:.1f} с")
+
+    start = time.perf_counter()
+    predictions, latency, lags = asyncio.run(
+        replay(records, models, args.target, args.url, args.speed, args.concurrency)
+    )
+    wall = time.perf_counter() - start
+
+    print(f"Воспроизведено за {wall:.1f} с ({len(records) / wall:.0f} окон/с)")
+    for endpoint, timings in latency.items():
+        if timings:
+            row = summarize(timings)
+            print(f"{endpoint:>12}: {row['calls']} запросов  p50={row['p50_ms']:.2f} мс  "
+                  f"p95={row['p95_ms']:.2f} мс  p99={row['p99_ms']:.2f} мс")
+    if lags:
+        print(f"Отставание от расписания: p50={np.median(lags) * 1000:.2f} мс  max={max(lags) * 1000:.2f} мс")
+
+    # Окна JSON-запросов записаны в float32, поэтому точное совпадение с записью не гарантировано
+    same = identical(predictions, records["prediction"])
+    diff = np.abs(predictions - records["prediction"])
+    print(f"Совпадают с записью побитово: {int(same.sum())}/{len(same)}, "
+          f"макс. расхождение {np.nanmax(diff) if np.isfinite(diff).any() else 0.0:.3g}")
+
+    if args.output:
+        np.save(args.output, predictions)
+    if args.compare:
+        reference = np.load(args.compare)
+        if reference.shape != predictions.shape:
+            print(f"Разные формы: {reference.shape} и {predictions.shape}")
+            return 1
+        same = identical(predictions, reference)
+        print(f"Совпадают с {args.compare} побитово: {int(same.sum())}/{len(same)}")
+        if not same.all():
+            first = int(np.flatnonzero(~same)[0])
+            print(f"Первое расхождение в записи {first}: {reference[first]} -> {predictions[first]}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""Пакетный офлайн-скоринг записанных логов полетов.
+
+Лог читается потоково, кусками по --chunk-rows строк:
+  *.csv - столбцы drone_id, x, y, t (имена задаются --columns);
+  *.npy - массив (N, 4) float: drone_id (целый), x, y, t, открывается через mmap.
+Строки разных дронов могут идти вперемешку, но точки одного дрона - по времени.
+Для каждой точки, перед которой у дрона есть еще 4 точки, считается то же гибридное
+предсказание (кинематика + GRU), что и в POST /predict/, следующей точки траектории.
+
+Последние 4 точки каждого дрона переносятся в следующий кусок, поэтому память
+зависит от --chunk-rows и числа дронов, но не от размера лога.
+
+Выход - CSV: drone_id, row (номер последней точки окна во входном файле), x, y, t.
+
+python scripts/score_logs.py flights.csv predictions.csv [--workers 4] [--model pos_128]
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.core.config import settings
+from app.core.kinematics import kinematic_predict
+from app.core.utils import normalize, denormalize, blend
+from app.models.registry import SHIPPED_MODELS
+
+WINDOW = 5
+
+# Модель загружается один раз на процесс (в пуле - в initializer)
+_predictor = None
+
+
+def _init_worker(model_path: str, threads: int):
+    global _predictor
+    from app.models.predictor import load_model
+
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _predictor = load_model(model_path) if model_path else None
+
+
+def score_windows(windows: np.ndarray, predictor, batch_size: int = 4096) -> np.ndarray:
+    """Гибридное предсказание для окон (batch_size, 5, 3), как в app/api/predict.py"""
+    final = kinematic_predict(windows)
+    if predictor is None:
+        return final
+    for start in range(0, len(windows), batch_size):
+        part = windows[start:start + batch_size]
+        kinematic = final[start:start + batch_size]
+        neural = denormalize(predictor.predict(normalize(part)))
+        # Там, где нейросеть выдала нечисловой результат, оставляем только кинематику
+        valid = np.isfinite(neural).all(axis=1, keepdims=True)
+        final[start:start + batch_size] = np.where(valid, blend(kinematic, neural, part), kinematic)
+    return final
+
+
+def _score_job(points: np.ndarray, starts: np.ndarray, batch_size: int) -> np.ndarray:
+    # Окна - представление над points без копирования, копируются только выбранные
+    windows = sliding_window_view(points, WINDOW, axis=0).transpose(0, 2, 1)
+    return score_windows(windows[starts], _predictor, batch_size)
+
+
+class WindowBuilder:
+    """Склейка кусков лога в окна с переносом хвостов дронов между кусками"""
+
+    def __init__(self):
+        self.tails = {}  # drone_id -> (points (<=4, 3), rows (<=4,))
+
+    def add(self, ids: np.ndarray, points: np.ndarray, rows: np.ndarray):
+        """Возвращает (points (M, 3), starts (K,), drone_ids (K,), rows (K,)).
+
+        points - точки куска, сгруппированные по дронам, с хвостами из прошлых кусков;
+        starts - начала окон из 5 точек одного дрона; rows - номер последней точки окна.
+        """
+        order = np.argsort(ids, kind="stable")
+        ids, points, rows = ids[order], points[order], rows[order]
+        uniq, bounds = np.unique(ids, return_index=True)
+        bounds = np.append(bounds, len(ids))
+
+        parts_points, parts_rows, parts_segment = [], [], []
+        for segment, drone_id in enumerate(uniq):
+            new_points = points[bounds[segment]:bounds[segment + 1]]
+            new_rows = rows[bounds[segment]:bounds[segment + 1]]
+            tail = self.tails.get(drone_id)
+            if tail is not None:
+                new_points = np.concatenate([tail[0], new_points])
+                new_rows = np.concatenate([tail[1], new_rows])
+            self.tails[drone_id] = (new_points[-(WINDOW - 1):], new_rows[-(WINDOW - 1):])
+            parts_points.append(new_points)
+            parts_rows.append(new_rows)
+            parts_segment.append(np.full(len(new_rows), segment))
+
+        all_points = np.concatenate(parts_points)
+        all_rows = np.concatenate(parts_rows)
+        segment = np.concatenate(parts_segment)
+        # Окно допустимо, если первая и последняя точки принадлежат одному дрону
+        starts = np.flatnonzero(segment[:-(WINDOW - 1)] == segment[WINDOW - 1:]) if len(segment) >= WINDOW else \
+            np.empty(0, dtype=np.int64)
+        ends = starts + WINDOW - 1
+        return all_points, starts, uniq[segment[ends]], all_rows[ends]
+
+
+def read_chunks(path: str, chunk_rows: int, columns):
+    """Потоковое чтение лога: итератор (ids, points (n, 3), rows)"""
+    offset = 0
+    if path.endswith(".npy"):
+        data = np.load(path, mmap_mode="r")
+        for start in range(0, len(data), chunk_rows):
+            block = np.asarray(data[start:start + chunk_rows], dtype=np.float64)
+            yield block[:, 0].astype(np.int64), block[:, 1:4], np.arange(start, start + len(block))
+        return
+
+    import pandas as pd
+
+    for frame in pd.read_csv(path, usecols=columns, chunksize=chunk_rows):
+        ids = frame[columns[0]].to_numpy()
+        points = frame[columns[1:]].to_numpy(dtype=np.float64)
+        yield ids, points, np.arange(offset, offset + len(frame))
+        offset += len(frame)
+
+
+def score_file(
+    input_path: str,
+    output_path: str,
+    model_path: str = None,
+    workers: int = 0,
+    chunk_rows: int = 65536,
+    batch_size: int = 4096,
+    columns=("drone_id", "x", "y", "t"),
+    threads: int = 1,
+) -> int:
+    """Посчитать предсказания для всего лога; возвращает число записанных предсказаний.
+
+    workers=0 - считать в текущем процессе.
+    """
+    columns = list(columns)
+    builder = WindowBuilder()
+    written = 0
+
+    executor = None
+    if workers > 0:
+        executor = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(model_path, threads))
+    else:
+        _init_worker(model_path, threads)
+
+    with open(output_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([columns[0], "row", "x", "y", "t"])
+
+        def write(drone_ids, rows, predictions):
+            nonlocal written
+            writer.writerows(zip(drone_ids.tolist(), rows.tolist(), *predictions.T.tolist()))
+            written += len(rows)
+
+        # Не больше 2 кусков в работе на процесс, чтобы память не росла с размером входа
+        pending = deque()
+        try:
+            for ids, points, rows in read_chunks(input_path, chunk_rows, columns):
+                all_points, starts, drone_ids, target_rows = builder.add(ids, points, rows)
+                if not len(starts):
+                    continue
+                if executor is None:
+                    write(drone_ids, target_rows, _score_job(all_points, starts, batch_size))
+                    continue
+                pending.append((executor.submit(_score_job, all_points, starts, batch_size), drone_ids, target_rows))
+                while len(pending) >= 2 * workers:
+                    future, done_ids, done_rows = pending.popleft()
+                    write(done_ids, done_rows, future.result())
+            while pending:
+                future, done_ids, done_rows = pending.popleft()
+                write(done_ids, done_rows, future.result())
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input")
+    parser.add_argument("output")
+    parser.add_argument("--model", default="pos_64", help=f"{', '.join(SHIPPED_MODELS)}, путь к .pth или 'none'")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="процессов; 0 - в текущем процессе")
+    parser.add_argument("--chunk-rows", type=int, default=65536)
+    parser.add_argument("--batch-size", type=int, default=4096, help="окон в одном проходе модели")
+    parser.add_argument("--threads", type=int, default=1, help="потоков torch на процесс")
+    parser.add_argument("--columns", nargs=4, default=["drone_id", "x", "y", "t"], help="столбцы CSV")
+    args = parser.parse_args()
+
+    if args.model == "none":
+        model_path = None
+    elif args.model in SHIPPED_MODELS:
+        model_path = os.path.join(ROOT, settings.MODELS_DIR, SHIPPED_MODELS[args.model])
+    else:
+        model_path = args.model
+
+    start = time.perf_counter()
+    count = score_file(
+        args.input, args.output, model_path, args.workers, args.chunk_rows, args.batch_size, args.columns, args.threads
+    )
+    elapsed = time.perf_counter() - start
+    print(f"{count} предсказаний за {elapsed:.1f} с ({count / elapsed:.0f} окон/с) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+# Тесты работают с моделью из репозитория и не требуют запущенного сервера
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+os.environ.setdefault("MODEL_PATH", "app/models/GRU_With_Mix_Dataset_MaxNorm/mix_pos_max_norm_64.pth")
+os.environ.setdefault("HIDDEN_SIZE", "64")
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_configure(config):
+    # Лог тестов пишется во временный каталог pytest, а не в logs/app.log из репозитория.
+    # Настройки читаются при импорте app, поэтому путь задается до сбора тестов
+    os.environ.setdefault("LOG_FILE", str(config._tmp_path_factory.mktemp("logs") / "app.log"))
+
+
+# Старые скрипты обращаются к живому серверу на localhost:8000
+collect_ignore = ["test_api.py", "test_new_api.py", "test_viz.py"]
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from app.models.predictor import TOLERANCES, load_backend, verify_backend
+
+MODEL = "app/models/GRU_With_Mix_Dataset_MaxNorm/mix_pos_max_norm_64.pth"
+
+
+@pytest.mark.parametrize("name", ["torchscript", "onnx", "engine"])
+def test_backend_matches_eager(name):
+    if name == "onnx":
+        pytest.importorskip("onnxruntime")
+    eager = load_backend("torch", MODEL)
+    backend = load_backend(name, MODEL)
+    assert verify_backend(backend, eager, TOLERANCES[name]) <= TOLERANCES[name]
+
+    # encode/decode нужны потоковым сессиям
+    x = np.random.default_rng(1).normal(size=(4, 5, 3)).astype(np.float32)
+    h = eager.encode(x)
+    assert np.allclose(backend.encode(x), h, atol=1e-4)
+    assert np.allclose(backend.decode(h, 3), eager.decode(h, 3), atol=1e-4)
+
+
+def test_engine_reuses_workspace_across_shapes():
+    eager = load_backend("torch", MODEL)
+    engine = load_backend("engine", MODEL)
+    rng = np.random.default_rng(2)
+    # Рабочая область растет под большой батч и дальше переиспользуется меньшими
+    for batch_size, seq_len, steps in [(64, 5, 10), (1, 30, 10), (8, 12, 3), (64, 5, 10)]:
+        x = rng.normal(size=(batch_size, seq_len, 3))
+        assert np.allclose(engine.forward(x, steps), eager.forward(x.astype(np.float32), steps), atol=1e-5)
+    h0 = rng.normal(size=(engine.num_layers, 4, engine.hidden_dim)).astype(np.float32)
+    x = rng.normal(size=(4, 5, 3)).astype(np.float32)
+    assert np.allclose(engine.encode(x, h0), eager.encode(x, h0), atol=1e-5)
+
+
+def test_verify_backend_rejects_inaccurate():
+    eager = load_backend("torch", MODEL)
+
+    class Shifted:
+        name = "shifted"
+
+        def forward(self, x, steps=10):
+            return eager.forward(x, steps) + 1.0
+
+    with pytest.raises(ValueError):
+        verify_backend(Shifted(), eager, 1e-3)
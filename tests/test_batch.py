@@ -0,0 +1,170 @@
+import time
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.api import predict as predict_api
+from app.core.kinematics import kinematic_rollout
+from app.core.utils import blend, denormalize, normalize
+from app.main import app
+
+client = TestClient(app)
+
+WINDOW = [
+    {"x": 0.0, "y": 0.0, "t": 0.0},
+    {"x": 2.0, "y": 3.0, "t": 3.0},
+    {"x": 4.0, "y": 4.0, "t": 4.0},
+    {"x": 6.0, "y": 5.0, "t": 6.0},
+    {"x": 7.0, "y": 8.0, "t": 9.0},
+]
+
+
+def test_batch_matches_single():
+    single = client.post("/predict/", json={"points": WINDOW}).json()
+    response = client.post("/predict/batch", json={"items": [{"points": WINDOW}] * 3})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert len(results) == 3
+    for item in results:
+        assert item["error"] is None
+        assert np.allclose([item["x"], item["y"], item["t"]], [single["x"], single["y"], single["t"]], atol=1e-5)
+
+
+def test_batch_reports_item_errors():
+    response = client.post("/predict/batch", json={"items": [{"points": WINDOW}, {"points": WINDOW[:2]}]})
+    assert response.status_code == 200
+    ok, bad = response.json()["results"]
+    assert ok["error"] is None and ok["x"] is not None
+    assert bad["error"] and bad["x"] is None
+
+
+def test_horizon_first_step_and_trimming():
+    full = client.post("/predict/horizon", json={"points": WINDOW}).json()["points"]
+    short = client.post("/predict/horizon", json={"points": WINDOW, "horizon": 3}).json()["points"]
+    assert len(full) == 10
+    assert len(short) == 3
+    # Декодер детерминирован: урезанный горизонт совпадает с началом полного
+    for a, b in zip(full, short):
+        assert np.allclose([a["x"], a["y"], a["t"]], [b["x"], b["y"], b["t"]], atol=1e-5)
+
+
+def test_horizon_and_single_pair_different_decoder_steps():
+    windows = np.array([[[p["x"], p["y"], p["t"]] for p in WINDOW]])
+    predictor = predict_api._get_model(None)
+    kinematic = kinematic_rollout(windows, 10)
+    neural = denormalize(predictor.predict_sequence(normalize(windows), 10))
+    single = client.post("/predict/", json={"points": WINDOW}).json()
+    first = client.post("/predict/horizon", json={"points": WINDOW}).json()["points"][0]
+    # /predict/ - следующая точка кинематики с последним шагом декодера, /predict/horizon - шаг k с шагом k
+    assert np.allclose([single["x"], single["y"], single["t"]], blend(kinematic[:, 0], neural[:, -1], windows)[0], atol=1e-3)
+    assert np.allclose([first["x"], first["y"], first["t"]], blend(kinematic[:, 0], neural[:, 0], windows)[0], atol=1e-3)
+
+
+def test_horizon_rejects_too_long():
+    response = client.post("/predict/horizon", json={"points": WINDOW, "horizon": 11})
+    assert response.status_code == 422
+
+
+def _raw(windows) -> bytes:
+    return np.asarray(windows, dtype="<f4").tobytes()
+
+
+def test_raw_matches_json():
+    single = client.post("/predict/", json={"points": WINDOW}).json()
+    window = [[p["x"], p["y"], p["t"]] for p in WINDOW]
+    headers = {"content-type": "application/octet-stream"}
+
+    response = client.post("/predict/raw", content=_raw(window), headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/octet-stream"
+    assert np.allclose(np.frombuffer(response.content, "<f4"), [single["x"], single["y"], single["t"]], atol=1e-4)
+
+    bad = [[np.nan] * 3] * 5
+    response = client.post("/predict/batch/raw", content=_raw([window, bad, window]), headers=headers)
+    result = np.frombuffer(response.content, "<f4").reshape(-1, 3)
+    assert result.shape == (3, 3)
+    assert np.allclose(result[[0, 2]], [single["x"], single["y"], single["t"]], atol=1e-4)
+    assert np.isnan(result[1]).all()
+
+    assert client.post("/predict/raw", content=b"\0" * 7, headers=headers).status_code == 400
+
+
+def test_deadline_degrades_to_kinematics(monkeypatch):
+    from app.api import predict as predict_api
+
+    # Проход модели "длится" секунду - в срок 5 мс он заведомо не успевает
+    monkeypatch.setattr(predict_api.limiter, "forward_s", 1.0)
+    kinematic = client.post("/predict/batch", json={"items": [{"points": WINDOW}], "deadline_ms": 5}).json()
+    assert kinematic["degraded"] is True
+    # Чистая кинематика: последняя точка + скорость + половина ускорения
+    assert np.allclose([kinematic["results"][0][k] for k in "xyt"], [7.5, 12.0, 12.5])
+
+    response = client.post("/predict/horizon", json={"points": WINDOW, "deadline_ms": 5}).json()
+    assert response["degraded"] is True
+    assert client.post("/predict/batch", json={"items": [{"points": WINDOW}]}).json()["degraded"] is False
+
+    shedding = client.get("/predict/health").json()["shedding"]
+    assert shedding["shed_queue"] >= 2 and shedding["shed_rate"] > 0
+
+    # Доля пропусков в /predict/health не зависит от METRICS_ENABLED
+    monkeypatch.setattr(predict_api.settings, "METRICS_ENABLED", False)
+    client.post("/predict/batch", json={"items": [{"points": WINDOW}], "deadline_ms": 5})
+    after = client.get("/predict/health").json()["shedding"]
+    assert after["shed_queue"] == shedding["shed_queue"] + 1
+    assert after["neural_calls"] == shedding["neural_calls"] + 1
+
+
+class _SlowPredictor:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = 0
+
+    def predict(self, x):
+        self.calls += 1
+        time.sleep(self.delay)
+        return x[:, -1]
+
+
+def test_deadline_miss_in_scheduler_degrades(monkeypatch):
+    from app.api import predict as predict_api
+    from app.core import metrics
+    from app.models.scheduler import InferenceScheduler
+
+    predictor = _SlowPredictor(0.2)
+    scheduler = InferenceScheduler(predictor, max_batch=1, max_wait_ms=0.0)
+    monkeypatch.setattr(predict_api, "scheduler", scheduler)
+    monkeypatch.setattr(predict_api, "cache", None)
+    monkeypatch.setattr(predict_api, "_get_model", lambda name=None: predictor)
+    fallbacks, timeouts = metrics.NEURAL_FALLBACKS.value, metrics.SHED_TIMEOUT.value
+
+    # Планировщик занят, а длительность прохода еще не известна: запрос встает в очередь
+    # и не дожидается результата к сроку
+    busy = scheduler.submit(np.zeros((1, 5, 3), dtype=np.float32))
+    response = client.post("/predict/", json={"points": WINDOW, "deadline_ms": 20}).json()
+    busy.result()
+    time.sleep(0.05)
+    scheduler.close()
+
+    assert response["degraded"] is True
+    assert np.allclose([response[k] for k in "xyt"], [7.5, 12.0, 12.5])
+    assert metrics.SHED_TIMEOUT.value == timeouts + 1 and metrics.NEURAL_FALLBACKS.value == fallbacks
+    assert predictor.calls == 1  # снятое по сроку окно в модель не попало
+
+
+def test_variable_length_windows():
+    # Окно из 10 точек: те же 5 точек, перед которыми еще 5 более ранних
+    long_window = [{"x": p["x"] - 10.0, "y": p["y"] - 10.0, "t": p["t"] - 10.0} for p in WINDOW] + WINDOW
+    short = client.post("/predict/", json={"points": WINDOW}).json()
+    long = client.post("/predict/", json={"points": long_window}).json()
+    assert long.keys() == short.keys()
+
+    items = [{"points": WINDOW}, {"points": long_window}, {"points": WINDOW}, {"points": WINDOW * 7}]
+    results = client.post("/predict/batch", json={"items": items}).json()["results"]
+    for item, expected in zip(results[:3], [short, long, short]):
+        assert np.allclose([item["x"], item["y"], item["t"]], [expected["x"], expected["y"], expected["t"]], atol=1e-5)
+    # Длиннее WINDOW_MAX_POINTS - ошибка элемента
+    assert results[3]["error"] and results[3]["x"] is None
+
+    raw = np.array([[[p["x"], p["y"], p["t"]] for p in long_window]], dtype="<f4").tobytes()
+    response = client.post("/predict/batch/raw?points=10", content=raw, headers={"content-type": "application/octet-stream"})
+    assert np.allclose(np.frombuffer(response.content, dtype="<f4"), [long["x"], long["y"], long["t"]], atol=1e-4)
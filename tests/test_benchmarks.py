@@ -0,0 +1,21 @@
+import numpy as np
+
+from benchmarks.baseline import compare
+from benchmarks.stats import summarize
+
+
+def test_summarize_percentiles_and_throughput():
+    row = summarize(np.full(100, 0.002), items_per_call=10)
+    assert row["calls"] == 100
+    assert abs(row["p50_ms"] - 2.0) < 1e-9 and abs(row["p99_ms"] - 2.0) < 1e-9
+    assert abs(row["throughput"] - 5000.0) < 1e-6
+
+    # Для конкурентной нагрузки пропускная способность считается по общему времени
+    assert abs(summarize(np.full(100, 0.002), wall_s=0.1)["throughput"] - 1000.0) < 1e-6
+
+
+def test_compare_flags_only_regressions_above_threshold():
+    baseline = {"a": {"p50_ms": 1.0}, "b": {"p50_ms": 1.0}, "gone": {"p50_ms": 1.0}}
+    results = {"a": {"p50_ms": 1.1}, "b": {"p50_ms": 1.5}, "new": {"p50_ms": 9.0}}
+    rows = {name: regressed for name, _, _, _, regressed in compare(results, baseline, threshold=0.2)}
+    assert rows == {"a": False, "b": True}
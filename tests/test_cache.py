@@ -0,0 +1,72 @@
+import time
+
+import numpy as np
+
+from app.api import predict as predict_api
+from app.core.cache import PredictionCache
+
+WINDOW = np.array([[[0.0, 0.0, 0.0], [1.0, 2.0, 1.0], [2.0, 4.0, 2.0], [3.0, 6.0, 3.0], [4.0, 8.0, 4.0]]])
+
+
+def test_hit_is_shifted_to_absolute_coordinates():
+    cache = PredictionCache(tolerance=1e-3)
+    keys = cache.keys(WINDOW, "pos_64")
+    cache.store(keys, WINDOW, np.array([[5.0, 10.0, 5.0]]))
+
+    shifted = WINDOW + np.array([100.0, -50.0, 20.0])
+    prediction, hit = cache.lookup(cache.keys(shifted, "pos_64"), shifted)
+    assert hit.all()
+    assert np.allclose(prediction, [[105.0, -40.0, 25.0]])
+
+    # Другая модель - другой ключ
+    _, hit = cache.lookup(cache.keys(WINDOW, "pos_128"), WINDOW)
+    assert not hit.any()
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_ttl_and_lru_eviction():
+    cache = PredictionCache(max_size=1, ttl_s=0.05)
+    other = WINDOW * 2
+    cache.store(cache.keys(WINDOW, "m"), WINDOW, WINDOW[:, -1])
+    cache.store(cache.keys(other, "m"), other, other[:, -1])
+    assert cache.stats()["evictions"] == 1
+    assert not cache.lookup(cache.keys(WINDOW, "m"), WINDOW)[1].any()
+
+    time.sleep(0.06)
+    assert not cache.lookup(cache.keys(other, "m"), other)[1].any()
+
+
+def test_batch_sends_only_misses_to_model(monkeypatch):
+    calls = []
+    original = predict_api._hybrid_predict
+
+    def counting(windows, predictor, deadline=None):
+        calls.append(len(windows))
+        return original(windows, predictor, deadline)
+
+    monkeypatch.setattr(predict_api, "cache", PredictionCache())
+    monkeypatch.setattr(predict_api, "_hybrid_predict", counting)
+
+    first, _ = predict_api._cached_hybrid_predict(WINDOW, predict_api.model, "default")
+    windows = np.concatenate([WINDOW + 10.0, WINDOW * 3])
+    second, _ = predict_api._cached_hybrid_predict(windows, predict_api.model, "default")
+    assert calls == [1, 1]
+    assert np.allclose(second[0], first[0] + 10.0)
+
+
+def test_kinematic_fallback_is_not_cached(monkeypatch):
+    cache = PredictionCache()
+    monkeypatch.setattr(predict_api, "cache", cache)
+    windows = np.concatenate([WINDOW, WINDOW * 3])
+
+    # Модель упала: кинематика отдается, но в кэш не попадает
+    monkeypatch.setattr(predict_api, "_neural_predict", lambda *args, **kwargs: None)
+    predict_api._cached_hybrid_predict(windows, predict_api.model, "default")
+    assert cache.stats()["size"] == 0
+
+    # Нечисловой выход для одного окна: в кэш попадает только окно со смешанным выходом GRU
+    neural = np.array([[np.nan] * 3, [9.0, 9.0, 9.0]])
+    monkeypatch.setattr(predict_api, "_neural_predict", lambda *args, **kwargs: neural)
+    predict_api._cached_hybrid_predict(windows, predict_api.model, "default")
+    hit = cache.lookup(cache.keys(windows, "default"), windows)[1]
+    assert hit.tolist() == [False, True]
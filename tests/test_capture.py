@@ -0,0 +1,82 @@
+import os
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import predict as predict_api
+from app.core.capture import TrafficRecorder, read_capture
+from app.core.config import settings
+from app.main import app
+from scripts.replay_capture import build_request, group_requests, identical
+
+client = TestClient(app)
+
+
+def _windows(count: int, points: int = 5) -> np.ndarray:
+    steps = np.random.default_rng(count).normal(size=(count, points, 3))
+    return np.cumsum(steps, axis=1).astype(np.float32)
+
+
+def test_ring_wraps_and_reopens(tmp_path):
+    path = str(tmp_path / "capture.bin")
+    recorder = TrafficRecorder(path, capacity=5, max_points=8, models=["pos_64"])
+    recorder.record("batch_raw", _windows(3), np.zeros((3, 3)), "pos_64")
+    recorder.record("predict", [_windows(1, 8)[0]], np.ones((1, 3)), "vel_64", degraded=True)
+    recorder.flush()
+
+    # После перезапуска нумерация запросов продолжается, старые записи затираются
+    recorder = TrafficRecorder(path, capacity=100, max_points=8)
+    assert recorder.capacity == 5
+    recorder.record("batch", [_windows(2)[0], _windows(2, 7)[1]], np.full((2, 3), 2.0), "pos_64")
+    recorder.flush()
+
+    records, models = read_capture(path)
+    assert models == ["pos_64", "vel_64"]
+    assert records["request"].tolist() == [0, 0, 1, 2, 2]
+    assert records["points"].tolist() == [5, 5, 8, 5, 7]
+    assert records["flags"].tolist() == [0, 0, 1, 0, 0]
+    assert np.isnan(records["window"][0, 5:]).all()
+    assert group_requests(records) == [(0, 2), (2, 3), (3, 5)]
+
+    endpoint, model, body, params = build_request(records[3:5], models)
+    assert (endpoint, model) == ("batch", "pos_64")
+    assert [len(item["points"]) for item in body["items"]] == [5, 7]
+
+
+def test_model_list_must_fit_header(tmp_path):
+    path = str(tmp_path / "capture.bin")
+    long_names = [f"model_{i:03d}_" + "x" * 40 for i in range(20)]
+    with pytest.raises(ValueError):
+        TrafficRecorder(path, capacity=5, models=long_names)
+    assert not os.path.exists(path)
+
+    # Модель, не влезающая в заголовок, не записывается и не портит список уже записанных
+    recorder = TrafficRecorder(path, capacity=5, models=long_names[:8])
+    with pytest.raises(ValueError):
+        recorder.record("predict", _windows(1), np.zeros((1, 3)), long_names[8])
+    recorder.record("predict", _windows(1), np.zeros((1, 3)), long_names[0])
+    recorder.flush()
+    records, models = read_capture(path)
+    assert models == long_names[:8] and len(records) == 1
+
+
+def test_api_requests_are_captured(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CAPTURE_PATH", str(tmp_path / "capture_{pid}.bin"))
+    monkeypatch.setattr(predict_api, "recorder", None)
+    windows = _windows(4)
+
+    response = client.post("/predict/batch/raw", content=windows.tobytes(),
+                           headers={"content-type": "application/octet-stream"})
+    assert response.status_code == 200
+    predictions = np.frombuffer(response.content, dtype="<f4").reshape(4, 3)
+    response = client.post("/predict/", json={"points": [{"x": x, "y": y, "t": t} for x, y, t in windows[0].tolist()]})
+    assert response.status_code == 200
+
+    predict_api.recorder.flush()
+    records, models = read_capture(predict_api.recorder.path)
+    assert len(records) == 5
+    assert [models[m] for m in records["model"]] == [predict_api.registry.default] * 5
+    assert records["endpoint"].tolist() == [3, 3, 3, 3, 0]
+    assert np.array_equal(records["window"][:4, :5], windows)
+    assert identical(records["prediction"][:4], predictions).all()
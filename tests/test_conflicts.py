@@ -0,0 +1,58 @@
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.core.conflicts import brute_force_conflicts, find_conflicts
+from app.main import app
+
+client = TestClient(app)
+
+
+def _fleet(n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    xy = rng.uniform(-500, 500, size=(n, 1, 2)) + np.cumsum(rng.normal(0, 3, size=(n, 10, 2)), axis=1)
+    t = np.broadcast_to(np.arange(10.0)[None, :, None], (n, 10, 1))
+    return np.concatenate([xy, t], axis=-1)
+
+
+def test_grid_matches_brute_force():
+    paths = _fleet(2000)
+    grid = find_conflicts(paths, 10.0)
+    brute = brute_force_conflicts(paths, 10.0)
+    assert len(grid[0]) > 0
+    for a, b in zip(grid, brute):
+        assert np.allclose(a, b)
+    # Каждая пара один раз, с минимальным расстоянием по горизонту
+    assert (grid[0] < grid[1]).all()
+    i, j, step = grid[0][0], grid[1][0], grid[3][0]
+    assert np.isclose(grid[2][0], np.hypot(*(paths[i, :, :2] - paths[j, :, :2]).T).min())
+    assert np.isclose(grid[2][0], np.hypot(*(paths[i, step, :2] - paths[j, step, :2])))
+
+
+def test_grid_handles_large_extent_and_small_separation():
+    # Размах 3e6 при separation 1e-6: линейный ключ ячейки (3e12 * 3e12) не влез бы в int64
+    rng = np.random.default_rng(1)
+    cluster = 3e6 + rng.uniform(0, 3e-6, size=(200, 2))
+    xy = np.concatenate([cluster, [[0.0, 0.0], [-3e6, 3e6]]])
+    paths = np.concatenate([xy, np.zeros((len(xy), 1))], axis=1)[:, None]
+    grid = find_conflicts(paths, 1e-6)
+    brute = brute_force_conflicts(paths, 1e-6)
+    assert len(grid[0]) > 0
+    for a, b in zip(grid, brute):
+        assert np.allclose(a, b, rtol=1e-9, atol=0)
+
+
+def test_conflicts_endpoint():
+    def line(x0, y0):
+        return {"points": [{"x": x0 + k, "y": y0, "t": float(k)} for k in range(5)]}
+
+    items = [line(0.0, 0.0), line(0.0, 3.0), line(500.0, 500.0)]
+    response = client.post("/predict/conflicts", json={"items": items, "separation": 5.0, "horizon": 10})
+    assert response.status_code == 200
+    conflicts = response.json()["conflicts"]
+    assert [(c["i"], c["j"]) for c in conflicts] == [(0, 1)]
+    assert conflicts[0]["distance"] <= 5.0 and 0 <= conflicts[0]["step"] < 10
+
+    raw = np.array([[[p["x"], p["y"], p["t"]] for p in item["points"]] for item in items], dtype="<f4").tobytes()
+    response = client.post("/predict/conflicts/raw?separation=5", content=raw,
+                           headers={"content-type": "application/octet-stream"})
+    assert [(c["i"], c["j"]) for c in response.json()["conflicts"]] == [(0, 1)]
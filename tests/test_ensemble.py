@@ -0,0 +1,65 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+import torch
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+from app.models.ensemble import fuse_state_dicts, load_ensemble, velocities
+from app.models.predictor import load_model
+from app.models.registry import SHIPPED_MODELS
+
+client = TestClient(app)
+
+
+def _path(name: str) -> str:
+    return os.path.join(settings.MODELS_DIR, SHIPPED_MODELS[name])
+
+
+def test_fused_matches_separate_models():
+    members = [("pos", _path("pos_64")), ("vel", _path("vel_64"))]
+    fused = load_ensemble(members, [0.25, 0.75], fused_max_batch=1024)
+    separate = load_ensemble(members, [0.25, 0.75], fused_max_batch=0)
+    x = np.random.default_rng(0).normal(size=(32, 8, 3)).astype(np.float32)
+    assert np.allclose(fused.predict_sequence(x, 4), separate.predict_sequence(x, 4), atol=1e-5)
+
+    # Сборка по определению: позиции pos-модели и накопленные смещения vel-модели
+    pos, vel = load_model(_path("pos_64")), load_model(_path("vel_64"))
+    expected = 0.25 * pos.predict_sequence(x, 4) + 0.75 * (
+        x[:, -1, None] + np.cumsum(vel.predict_sequence(velocities(x), 4), axis=1)
+    )
+    assert np.allclose(fused.predict_sequence(x, 4), expected, atol=1e-5)
+    assert np.allclose(fused.predict(x), fused.predict_sequence(x)[:, -1])
+
+
+def test_fuse_rejects_different_sizes():
+    states = [torch.load(_path(name), map_location="cpu") for name in ("pos_64", "vel_128")]
+    with pytest.raises(ValueError):
+        fuse_state_dicts(states)
+
+
+def test_ensemble_endpoint():
+    window = [{"x": float(i), "y": float(2 * i), "t": float(i)} for i in range(5)]
+    response = client.post("/predict/", json={"points": window, "model": "ensemble"})
+    assert response.status_code == 200
+    assert np.isfinite([response.json()[axis] for axis in ("x", "y", "t")]).all()
+
+
+@pytest.mark.parametrize("backend", ["numpy", "engine"])
+def test_numpy_backends_start_without_torch(backend):
+    # Отдельный процесс: в процессе тестов torch уже импортирован
+    code = (
+        "import sys\n"
+        "import app.main\n"
+        "assert 'torch' not in sys.modules, 'torch импортирован при старте'\n"
+        "from app.api.predict import registry\n"
+        "registry.get('ensemble')\n"
+        "assert 'torch' not in sys.modules, 'torch импортирован при загрузке ансамбля'\n"
+    )
+    env = dict(os.environ, BACKEND=backend)
+    result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr[-2000:]
@@ -0,0 +1,103 @@
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from app.core import config
+from app.core.utils import blend
+from scripts.evaluate import evaluate, make_windows, synthetic_trajectories
+
+
+class _Oracle:
+    """Модель, которая знает истинное продолжение траектории"""
+
+    def __init__(self, target):
+        self.target = target
+
+    def predict_sequence(self, x, horizon):
+        return self.target[:len(x), :horizon]
+
+    def predict(self, x):
+        # Для /predict/ - истинная следующая точка
+        return self.target[:len(x), 0]
+
+
+def test_windows_do_not_cross_drones():
+    ids, points = synthetic_trajectories(drones=3, length=20)
+    windows, target = make_windows(ids, points, horizon=4)
+    assert windows.shape == (3 * (20 - 9 + 1), 5, 3) and target.shape == (len(windows), 4, 3)
+    # Время внутри окна и продолжения растет подряд, т.е. точки одного дрона
+    steps = np.diff(np.concatenate([windows, target], axis=1)[..., 2], axis=1)
+    assert (steps == 1.0).all()
+
+
+def test_sweep_prefers_the_better_predictor():
+    ids, points = synthetic_trajectories(drones=50, length=30)
+    windows, target = make_windows(ids, points, horizon=5)
+    report = evaluate(_Oracle(target), windows, target, np.linspace(0, 1, 11), regimes=2)
+    assert report["config"]["KINEMATIC_WEIGHT"] == 0.0
+    assert report["config"]["BLEND_SPEED_WEIGHTS"] == [0.0, 0.0]
+    assert report["gru"]["ade"] < 1e-9 < report["kinematic"]["ade"]
+    assert report["next_gru"]["ade"] < 1e-9 < report["next_kinematic"]["ade"]
+
+
+class _LastStep(_Oracle):
+    """Модель, у которой точна только траектория по шагам, а последний шаг (/predict/) - нет"""
+
+    def predict(self, x):
+        return self.target[:len(x), -1]
+
+
+def test_sweep_scores_the_predict_pairing():
+    ids, points = synthetic_trajectories(drones=50, length=30)
+    windows, target = make_windows(ids, points, horizon=5)
+    report = evaluate(_LastStep(target), windows, target, np.linspace(0, 1, 11))
+    # Траектория по шагам идеальна, но вес настраивает /predict/, где декодер отвечает не той точкой
+    assert report["gru"]["ade"] < 1e-9
+    assert report["config"]["KINEMATIC_WEIGHT"] > 0.5
+
+
+def test_blend_config_file_and_speed_regimes(tmp_path, monkeypatch):
+    path = tmp_path / "blend.json"
+    path.write_text(json.dumps({"KINEMATIC_WEIGHT": 0.4, "BLEND_SPEED_BINS": [5.0], "BLEND_SPEED_WEIGHTS": [1.0, 0.0]}))
+
+    class FileSettings(config.Settings):
+        model_config = {**config.Settings.model_config, "json_file": str(path)}
+
+    loaded = FileSettings()
+    assert loaded.KINEMATIC_WEIGHT == 0.4 and loaded.BLEND_SPEED_WEIGHTS == [1.0, 0.0]
+    # Переменные окружения важнее файла
+    monkeypatch.setenv("KINEMATIC_WEIGHT", "0.9")
+    assert FileSettings().KINEMATIC_WEIGHT == 0.9
+
+    monkeypatch.setattr(config.settings, "BLEND_SPEED_BINS", loaded.BLEND_SPEED_BINS)
+    monkeypatch.setattr(config.settings, "BLEND_SPEED_WEIGHTS", loaded.BLEND_SPEED_WEIGHTS)
+    slow = np.array([[0, 0, 0], [1, 0, 1], [2, 0, 2], [3, 0, 3], [4, 0, 4]], dtype=float)
+    windows = np.stack([slow, slow * [10, 1, 1]])  # скорость 1 и 10
+    kinematic, neural = np.zeros((2, 3)), np.ones((2, 3))
+    assert np.allclose(blend(kinematic, neural, windows), [[0, 0, 0], [1, 1, 1]])
+    assert np.allclose(blend(kinematic[0], neural[0], windows[:1]), [0, 0, 0])
+
+
+def test_blend_regimes_must_match_bins(tmp_path):
+    path = tmp_path / "blend.json"
+    path.write_text(json.dumps({"BLEND_SPEED_BINS": [2.0, 5.0], "BLEND_SPEED_WEIGHTS": [1.0, 0.0]}))
+
+    class FileSettings(config.Settings):
+        model_config = {**config.Settings.model_config, "json_file": str(path)}
+
+    with pytest.raises(ValidationError, match="BLEND_SPEED_WEIGHTS"):
+        FileSettings()
+
+
+def test_blend_config_default_is_relative_to_project_root(tmp_path):
+    # Из другого каталога сервис и scripts/evaluate.py --write-config видят тот же файл
+    env = {k: v for k, v in os.environ.items() if k != "BLEND_CONFIG"}
+    env["PYTHONPATH"] = config.ROOT
+    code = "from app.core.config import BLEND_CONFIG; print(BLEND_CONFIG)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == os.path.join(config.ROOT, "configs", "blend.json")
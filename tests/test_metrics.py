@@ -0,0 +1,32 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+POINTS = [{"x": i * 1.0, "y": i * 2.0, "t": float(i)} for i in range(5)]
+
+
+def _value(text: str, series: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(series + " "):
+            return float(line.split()[-1])
+    raise AssertionError(series)
+
+
+def test_metrics_exposes_stages_and_counters():
+    before = client.get("/metrics").text
+    requests_before = _value(before, 'predictor_requests_total{endpoint="predict"}')
+
+    assert client.post("/predict/", json={"points": POINTS}).status_code == 200
+    assert client.post("/predict/batch", json={"items": [{"points": POINTS}]}).status_code == 200
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert _value(text, 'predictor_requests_total{endpoint="predict"}') == requests_before + 1
+    for stage in ("parse", "kinematic", "normalize", "forward", "denormalize", "serialize"):
+        assert _value(text, f'predictor_stage_seconds_count{{stage="{stage}"}}') > 0
+    assert _value(text, 'predictor_batch_size_bucket{le="+Inf"}') > 0
+    assert "# TYPE predictor_stage_seconds histogram" in text
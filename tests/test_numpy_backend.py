@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from app.models.numpy_backend import load_numpy_backend
+from app.models.torch_backend import TorchBackend, build_model
+
+MODELS = "app/models/GRU_With_Mix_Dataset_MaxNorm"
+
+
+@pytest.mark.parametrize("name,hidden,layers", [
+    ("mix_pos_max_norm_64", 64, 2),
+    ("mix_pos_max_norm_128", 128, 3),
+])
+def test_numpy_matches_torch(name, hidden, layers):
+    eager = TorchBackend(build_model(f"{MODELS}/{name}.pth", hidden, layers))
+    numpy_backend = load_numpy_backend(f"{MODELS}/{name}.pth")
+    x = np.random.default_rng(0).normal(size=(16, 5, 3)).astype(np.float32)
+
+    assert np.allclose(numpy_backend.forward(x), eager.forward(x), atol=1e-5)
+    assert np.allclose(numpy_backend.forward(x, 3), eager.forward(x, 3), atol=1e-5)
+
+    # Пошаговое кодирование (потоковые сессии) тоже должно совпадать
+    h = eager.encode(x[:, :4])
+    assert np.allclose(numpy_backend.encode(x[:, 4:], h), eager.encode(x[:, 4:], h), atol=1e-5)
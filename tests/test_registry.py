@@ -0,0 +1,50 @@
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.registry import ModelRegistry, create_registry
+
+client = TestClient(app)
+
+WINDOW = [{"x": float(i), "y": float(i * i), "t": float(i)} for i in range(5)]
+
+
+def test_registry_loads_lazily_and_evicts():
+    registry = create_registry()
+    assert registry.stats()["resident"] == {}
+
+    predictor = registry.get("pos_64")
+    info = registry.stats()["resident"]["pos_64"]
+    assert info["memory_bytes"] > 0 and info["load_time_s"] > 0
+    assert registry.get("pos_64") is predictor
+
+    # Бюджет меньше одной модели: в памяти остается только последняя (и модель по умолчанию)
+    small = ModelRegistry(registry.paths, default="pos_64", memory_budget_bytes=1)
+    small.get("pos_64")
+    small.get("vel_64")
+    small.get("pos_128")
+    assert set(small.stats()["resident"]) == {"pos_64", "pos_128"}
+    assert small.stats()["evictions"] == 1
+
+
+def test_request_selects_model():
+    default = client.post("/predict/", json={"points": WINDOW}).json()
+    other = client.post("/predict/", json={"points": WINDOW, "model": "pos_128"}).json()
+    assert not np.allclose([default["x"], default["y"]], [other["x"], other["y"]])
+    assert "pos_128" in client.get("/predict/health").json()["models"]["resident"]
+
+
+def test_unknown_model_rejected():
+    response = client.post("/predict/batch", json={"items": [{"points": WINDOW}], "model": "nope"})
+    assert response.status_code == 400
+
+
+def test_velocity_model_predicts_positions():
+    # Прямая с постоянной скоростью (в нормализованных единицах): vel_64 должна продолжить ее
+    step = np.array([0.1, 0.05, 0.1], dtype=np.float32)
+    x = (np.arange(5, dtype=np.float32)[:, None] * step)[None]
+    path = create_registry().get("vel_64").predict_sequence(x, 10)[0]
+    expected = x[0, -1] + np.arange(1, 11)[:, None] * step
+    assert np.abs(path[0] - expected[0]).max() < 0.05
+    assert np.abs(path[:3] - expected[:3]).max() < 0.1
+    assert np.all(np.diff(path[:, 0]) > 0) and np.all(np.diff(path[:, 1]) > 0)
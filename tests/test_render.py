@@ -0,0 +1,72 @@
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.api import render as render_api
+from app.core.render import ImageCache, Renderer, downsample, render_key
+from app.main import app
+
+client = TestClient(app)
+
+PNG_MAGIC = b"\x89PNG"
+
+
+def _points(count: int) -> list:
+    return [{"x": float(i), "y": float(i * i) / 10, "t": float(i)} for i in range(count)]
+
+
+def test_downsample_keeps_ends_and_bound():
+    track = np.cumsum(np.ones((10001, 3)), axis=0)
+    short = downsample(track, 500)
+    assert len(short) == 500
+    assert np.array_equal(short[0], track[0]) and np.array_equal(short[-1], track[-1])
+    assert len(downsample(track[:100], 500)) == 100
+
+
+def test_image_cache_evicts_by_bytes():
+    cache = ImageCache(max_bytes=250)
+    for key in "abc":
+        cache.put(key, bytes(100))
+    # Третья картинка вытесняет самую старую; обращение к "b" делает ее свежей
+    assert cache.get("a") is None and cache.get("b") is not None
+    cache.put("d", bytes(100))
+    assert cache.get("c") is None and cache.get("b") is not None
+    cache.put("huge", bytes(1000))
+    stats = cache.stats()
+    assert stats["bytes"] <= 250 and stats["evictions"] == 2 and cache.get("huge") is None
+
+
+def test_render_endpoint_caches_by_content(monkeypatch):
+    monkeypatch.setattr(render_api, "renderer", Renderer(0, ImageCache()))
+    body = {"points": _points(2000), "prediction": _points(3), "title": "Трек"}
+    first = client.post("/predict/render", json=body)
+    assert first.status_code == 200 and first.headers["content-type"] == "image/png"
+    assert first.content.startswith(PNG_MAGIC) and first.headers["x-render-cache"] == "miss"
+    second = client.post("/predict/render", json=body)
+    assert second.headers["x-render-cache"] == "hit" and second.content == first.content
+
+    # Без предсказания траекторию считает модель; повторный запрос не запускает ни модель, ни отрисовку
+    body = {"points": _points(8), "horizon": 4}
+    assert client.post("/predict/render", json=body).headers["x-render-cache"] == "miss"
+    assert client.post("/predict/render", json=body).headers["x-render-cache"] == "hit"
+
+    assert client.post("/predict/render", json={"points": _points(1)}).status_code == 400
+    assert client.post("/predict/render", json={"points": _points(5), "model": "unknown"}).status_code == 400
+
+    # Кинематика вместо модели: тот же заголовок X-Degraded, что у бинарных эндпоинтов, и без кэша
+    monkeypatch.setattr(render_api, "_predict_path", lambda track, *args: (track[-1:] + 1.0, True))
+    body = {"points": _points(8), "horizon": 5}
+    for _ in range(2):
+        degraded = client.post("/predict/render", json=body)
+        assert degraded.headers["x-degraded"] == "1" and degraded.headers["x-render-cache"] == "miss"
+
+
+def test_render_many_in_process_pool():
+    renderer = Renderer(1)
+    track = np.array([[p["x"], p["y"], p["t"]] for p in _points(20)])
+    items = [(render_key(track, track[-1:] + i), track, track[-1:] + i, {"title": str(i)}) for i in range(2)]
+    try:
+        results = list(renderer.render_many(items, dpi=50))
+    finally:
+        renderer.close()
+    assert [key for key, _ in results] == [item[0] for item in items]
+    assert all(png.startswith(PNG_MAGIC) for _, png in results)
@@ -0,0 +1,92 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from app.models.predictor import load_model
+from app.models.scheduler import DeadlineExceeded, InferenceLimiter, InferenceScheduler
+
+
+def test_scheduler_merges_concurrent_requests():
+    predictor = load_model()
+    scheduler = InferenceScheduler(predictor, max_batch=16, max_wait_ms=20.0)
+    windows = np.random.default_rng(0).normal(size=(32, 1, 5, 3)).astype(np.float32)
+
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        results = list(pool.map(scheduler.predict, windows))
+    scheduler.close()
+
+    expected = predictor.predict(windows[:, 0])
+    assert np.allclose(np.concatenate(results), expected, atol=1e-5)
+
+    stats = scheduler.stats()
+    assert stats["items"] == 32
+    assert stats["batches"] < 32
+    assert stats["max_batch_size"] > 1
+
+
+def test_scheduler_groups_windows_by_length():
+    predictor = load_model()
+    scheduler = InferenceScheduler(predictor, max_batch=64, max_wait_ms=50.0)
+    rng = np.random.default_rng(1)
+    windows = [rng.normal(size=(1, length, 3)).astype(np.float32) for length in (5, 12, 5, 30, 12, 5)]
+
+    with ThreadPoolExecutor(max_workers=len(windows)) as pool:
+        results = list(pool.map(scheduler.predict, windows))
+    scheduler.close()
+
+    for window, result in zip(windows, results):
+        assert np.allclose(result, predictor.predict(window), atol=1e-5)
+
+
+def test_scheduler_after_close_runs_inline():
+    predictor = load_model()
+    scheduler = InferenceScheduler(predictor)
+    scheduler.close()
+    window = np.zeros((1, 5, 3), dtype=np.float32)
+    assert scheduler.predict(window).shape == (1, 3)
+
+
+class _SlowPredictor:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = []
+
+    def predict(self, x):
+        self.calls.append(len(x))
+        time.sleep(self.delay)
+        return x[:, -1]
+
+
+def test_deadline_sheds_and_skips_cancelled_windows():
+    predictor = _SlowPredictor(0.05)
+    scheduler = InferenceScheduler(predictor, max_batch=1, max_wait_ms=0.0)
+    x = np.zeros((1, 5, 3), dtype=np.float32)
+
+    # Первый проход занимает планировщик, второй запрос не дожидается результата
+    busy = scheduler.submit(x)
+    with pytest.raises(DeadlineExceeded) as error:
+        scheduler.predict(x, deadline=time.monotonic() + 0.01)
+    assert error.value.waited
+    busy.result()
+    time.sleep(0.02)
+    assert predictor.calls == [1]  # снятое по сроку окно в модель не попало
+
+    # Длительность прохода уже известна, и заведомо опоздавший запрос отклоняется сразу
+    with pytest.raises(DeadlineExceeded) as error:
+        scheduler.predict(x, deadline=time.monotonic() + 0.01)
+    assert not error.value.waited
+    assert predictor.calls == [1]
+    scheduler.close()
+
+
+def test_limiter_bounds_concurrency_and_respects_deadline():
+    limiter = InferenceLimiter(max_concurrent=1)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        slow = pool.submit(limiter.run, time.sleep, 0.05)
+        time.sleep(0.01)
+        with pytest.raises(DeadlineExceeded):
+            limiter.run(time.sleep, 0.0, deadline=time.monotonic() + 0.01)
+        slow.result()
+    assert limiter.forward_s >= 0.05
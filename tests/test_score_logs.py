@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from app.models.predictor import load_model
+from scripts.score_logs import WINDOW, score_file, score_windows
+
+MODEL_PATH = "app/models/GRU_With_Mix_Dataset_MaxNorm/mix_pos_max_norm_64.pth"
+
+
+def _log(tmp_path):
+    # Два дрона вперемешку, у дрона "b" точек меньше окна в начале куска
+    rng = np.random.default_rng(0)
+    rows = []
+    for step in range(23):
+        rows.append(("a", step * 2.0 + rng.normal(), step * 1.0, float(step)))
+        if step % 2:
+            rows.append(("b", -step * 1.0, step * 3.0 + rng.normal(), float(step)))
+    path = tmp_path / "log.csv"
+    pd.DataFrame(rows, columns=["drone_id", "x", "y", "t"]).to_csv(path, index=False)
+    return path, pd.DataFrame(rows, columns=["drone_id", "x", "y", "t"])
+
+
+def test_chunked_scoring_matches_direct_windows(tmp_path):
+    path, frame = _log(tmp_path)
+    out = tmp_path / "out.csv"
+    count = score_file(str(path), str(out), MODEL_PATH, workers=0, chunk_rows=7)
+
+    expected = []
+    predictor = load_model(MODEL_PATH)
+    for drone_id, group in frame.groupby("drone_id"):
+        points = group[["x", "y", "t"]].to_numpy()
+        windows = np.stack([points[i:i + WINDOW] for i in range(len(points) - WINDOW + 1)])
+        rows = group.index.to_numpy()[WINDOW - 1:]
+        expected.append(pd.DataFrame({"drone_id": drone_id, "row": rows}).join(
+            pd.DataFrame(score_windows(windows, predictor), columns=["x", "y", "t"])))
+    expected = pd.concat(expected).sort_values("row").reset_index(drop=True)
+
+    result = pd.read_csv(out).sort_values("row").reset_index(drop=True)
+    assert count == len(expected) == len(result)
+    assert (result["drone_id"] == expected["drone_id"]).all()
+    assert (result["row"] == expected["row"]).all()
+    assert np.allclose(result[["x", "y", "t"]], expected[["x", "y", "t"]], atol=1e-6)
@@ -0,0 +1,60 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+from app.serve import _capture_path
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WINDOW = [{"x": float(i), "y": float(2 * i), "t": float(i)} for i in range(5)]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_capture_path_per_worker():
+    assert _capture_path("captures/traffic.bin", 4) == "captures/traffic.bin.{pid}"
+    assert _capture_path("captures/traffic_{pid}.bin", 4) == "captures/traffic_{pid}.bin"
+    assert _capture_path("captures/traffic.bin", 1) == "captures/traffic.bin"
+    assert _capture_path(None, 4) is None
+
+
+def test_preforked_workers_serve_and_stop(tmp_path):
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.serve", "--workers", "2", "--threads", "1", "--port", str(port)],
+        cwd=ROOT, env=dict(os.environ, LOG_LEVEL="WARNING", CAPTURE_PATH=str(tmp_path / "capture.bin")),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                if httpx.get(f"{url}/predict/health").status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            assert server.poll() is None and time.monotonic() < deadline, "app.serve не запустился"
+            time.sleep(0.2)
+
+        workers = subprocess.run(["pgrep", "-P", str(server.pid)], capture_output=True, text=True).stdout.split()
+        assert len(workers) == 2
+
+        # /predict/ идет через планировщик: его поток должен быть перезапущен в воркере после fork
+        for _ in range(10):
+            response = httpx.post(f"{url}/predict/", json={"points": WINDOW}, timeout=10)
+            assert response.status_code == 200 and response.json()["degraded"] is False
+        # Общий CAPTURE_PATH без {pid}: каждый воркер пишет в свой файл
+        captures = os.listdir(tmp_path)
+        assert captures and set(captures) <= {f"capture.bin.{pid}" for pid in workers}
+    finally:
+        server.send_signal(signal.SIGTERM)
+        assert server.wait(timeout=30) == 0
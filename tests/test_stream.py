@@ -0,0 +1,50 @@
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_stream_matches_window_prediction():
+    track = np.cumsum(np.random.default_rng(0).normal(size=(8, 3)), axis=0)
+
+    with client.websocket_connect("/predict/stream") as ws:
+        for i, (x, y, t) in enumerate(track.tolist()):
+            ws.send_json({"points": [{"drone_id": "d1", "x": x, "y": y, "t": t}]})
+            prediction = ws.receive_json()["predictions"][0]
+            assert prediction["count"] == i + 1
+            if i < 4:
+                assert prediction["x"] is None
+                continue
+
+            window = [{"x": x, "y": y, "t": t} for x, y, t in track[i - 4:i + 1].tolist()]
+            expected = client.post("/predict/batch", json={"items": [{"points": window}]}).json()["results"][0]
+            assert np.allclose(
+                [prediction["x"], prediction["y"], prediction["t"]],
+                [expected["x"], expected["y"], expected["t"]],
+                atol=1e-4,
+            )
+
+    assert client.get("/predict/stream/stats").json()["active"] >= 1
+
+
+def test_stream_survives_processing_error(monkeypatch):
+    from app.api import stream as stream_api
+
+    original = stream_api.sessions.update
+    failing = {"left": 1}
+
+    def update(drone_ids, points):
+        if failing["left"]:
+            failing["left"] -= 1
+            raise RuntimeError("сбой бэкенда")
+        return original(drone_ids, points)
+
+    monkeypatch.setattr(stream_api.sessions, "update", update)
+    with client.websocket_connect("/predict/stream") as ws:
+        ws.send_json({"points": [{"drone_id": "e1", "x": 0.0, "y": 0.0, "t": 0.0}]})
+        assert "сбой бэкенда" in ws.receive_json()["error"]
+        # Соединение открыто, следующее сообщение обрабатывается как обычно
+        ws.send_json({"points": [{"drone_id": "e1", "x": 1.0, "y": 1.0, "t": 1.0}]})
+        assert ws.receive_json()["predictions"][0]["count"] == 1
@@ -0,0 +1,48 @@
+import numpy as np
+
+from app.core import config
+from app.core.kinematics import kinematic_predict, kinematic_rollout
+from app.core.tracker import FleetTracker, KalmanBank, kalman_predict
+
+
+def _trajectory(t: np.ndarray) -> np.ndarray:
+    # Постоянное ускорение по обеим осям
+    x = 1.0 + 2.0 * t + 0.25 * t ** 2
+    y = -3.0 + 0.5 * t - 0.1 * t ** 2
+    return np.stack([x, y, t], axis=-1)
+
+
+def test_bank_tracks_constant_acceleration_with_irregular_dt():
+    times = np.cumsum(np.random.default_rng(0).uniform(0.5, 2.0, size=30))
+    bank = KalmanBank(capacity=4, process_noise=1e-6, measurement_noise=1e-3)
+    for point in _trajectory(times):
+        bank.update([2], point[None])
+    prediction = bank.predict([2])[0]
+    last_dt = times[-1] - times[-2]
+    assert np.allclose(prediction, _trajectory(np.array([times[-1] + last_dt]))[0], atol=1e-2)
+    assert not bank.initialized[[0, 1, 3]].any()
+
+
+def test_fleet_tracker_reuses_and_grows_slots():
+    tracker = FleetTracker(capacity=2)
+    tracker.update(["a", "b"], [[0, 0, 0], [5, 5, 0]])
+    state = tracker.bank.state
+    tracker.remove("a")
+    tracker.update(["c"], [[9, 9, 0]])
+    assert tracker.bank.state is state  # слот "a" переиспользован без выделения памяти
+
+    tracker.update(["d"], [[1, 1, 0]])
+    assert tracker.bank.capacity == 4 and len(tracker) == 3
+    # Состояние существующих дронов пережило увеличение банка
+    prediction = tracker.update(["b", "b"], [[6, 5, 1], [7, 5, 2]])
+    assert prediction.shape == (2, 3) and prediction[1, 0] > 7.0
+
+
+def test_kinematic_model_setting_switches_to_kalman(monkeypatch):
+    windows = _trajectory(np.arange(5.0))[None].repeat(3, axis=0)
+    monkeypatch.setattr(config.settings, "KINEMATIC_MODEL", "kalman")
+    monkeypatch.setattr(config.settings, "KALMAN_MEASUREMENT_NOISE", 1e-3)
+    prediction = kinematic_predict(windows)
+    assert np.allclose(prediction, kalman_predict(windows, None, config.settings.KALMAN_PROCESS_NOISE, 1e-3))
+    assert np.allclose(prediction, _trajectory(np.array([5.0])), atol=0.05)
+    assert kinematic_rollout(windows, 4).shape == (3, 4, 3)